@@ -0,0 +1,146 @@
+import re
+from bisect import bisect_left, insort
+from typing import Collection, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Suggestions shown per keystroke
+MAX_SUGGESTIONS = 5
+
+# Prefixes with more used suggestions under them than this keep their best used ones ranked, updated on record()
+USED_CACHE_THRESHOLD = 64
+
+# Words from the end of the input that may start the part being completed: "compare mars and ju|"
+MAX_COMPLETED_WORDS = 6
+
+# Sorts after every character a key can hold, closing the run of keys under a prefix
+_PREFIX_END = "\U0010ffff"
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class Autocomplete:
+    """Completions for the text being typed, ranked by how often each suggestion has been used.
+
+    The prefix trie is laid out as a sorted array: the suggestions below a
+    trie node are one contiguous run, found with two binary searches. Ties
+    in usage go to the higher priority, then alphabetically, so unused
+    suggestions are ranked without scanning the run: each priority keeps
+    its own sorted positions, and the first few inside the run are the
+    best. Only suggestions that have been used are compared by count. A
+    lookup therefore costs a few bisections whether the run holds ten names
+    or a hundred thousand; prefixes with many used suggestions keep those
+    ranked.
+    """
+
+    def __init__(self, suggestions: Iterable[Tuple[str, int]], word_priorities: Optional[Collection[int]] = None):
+        # Priorities of the suggestions that may complete the last words of the input, such as object names;
+        # the rest only complete the whole input
+        self.word_priorities = frozenset(word_priorities) if word_priorities is not None else None
+        best: Dict[str, Tuple[str, int]] = {}
+        for text, priority in suggestions:
+            key = normalize(text)
+            if key and (key not in best or priority > best[key][1]):
+                best[key] = (text.strip(), priority)
+
+        self.keys = sorted(best)
+        self.texts = [best[key][0] for key in self.keys]
+        self.priorities = [best[key][1] for key in self.keys]
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self.uses = [0] * len(self.keys)
+        # Sorted positions of the suggestions that have been used at least once
+        self.used: List[int] = []
+        self.by_priority: Dict[int, List[int]] = {}
+        for i, priority in enumerate(self.priorities):
+            self.by_priority.setdefault(priority, []).append(i)
+        self.priority_order = sorted(self.by_priority, reverse=True)
+        # (prefix, priorities) -> best MAX_SUGGESTIONS used positions, for prefixes over USED_CACHE_THRESHOLD
+        self.used_top: Dict[Tuple[str, Optional[FrozenSet[int]]], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rank(self, i: int) -> Tuple[int, int, int]:
+        return -self.uses[i], -self.priorities[i], i
+
+    def complete(self, prefix: str, limit: int = MAX_SUGGESTIONS,
+                 priorities: Optional[FrozenSet[int]] = None) -> List[str]:
+        """The best `limit` suggestions starting with `prefix`, of the given priorities if any are given."""
+        prefix = prefix.lower()
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _PREFIX_END, lo)
+        if lo == hi:
+            return []
+
+        first_used, last_used = bisect_left(self.used, lo), bisect_left(self.used, hi)
+        cached = (last_used - first_used > USED_CACHE_THRESHOLD and limit <= MAX_SUGGESTIONS and
+                  self.used_top.get((prefix, priorities)))
+        if cached:
+            ranked = cached[:limit]
+        else:
+            used = [i for i in self.used[first_used:last_used]
+                    if priorities is None or self.priorities[i] in priorities]
+            ranked = sorted(used, key=self._rank)[:max(limit, MAX_SUGGESTIONS)]
+            if last_used - first_used > USED_CACHE_THRESHOLD:
+                self.used_top[(prefix, priorities)] = ranked
+            ranked = ranked[:limit]
+        for priority in self.priority_order:
+            if priorities is not None and priority not in priorities:
+                continue
+            if len(ranked) >= limit:
+                break
+            positions = self.by_priority[priority]
+            for j in range(bisect_left(positions, lo), len(positions)):
+                i = positions[j]
+                if i >= hi or len(ranked) >= limit:
+                    break
+                if not self.uses[i]:
+                    ranked.append(i)
+        return [self.texts[i] for i in ranked]
+
+    def suggest(self, text: str, limit: int = MAX_SUGGESTIONS) -> List[str]:
+        """Whole-input completions for what is typed so far.
+
+        The whole input is completed first ("tell me ab" -> "tell me about"),
+        then its last few words ("compare mars and ju" -> "compare mars and
+        Jupiter").
+        """
+        typed = _SPACES.sub(" ", text.lstrip())
+        if not typed.strip():
+            return []
+        word_starts = [match.end() for match in re.finditer(" ", typed)]
+        results: List[str] = []
+        for start in [0] + word_starts[-MAX_COMPLETED_WORDS:]:
+            part = typed[start:]
+            if not part:
+                continue
+            for completion in self.complete(part, limit, None if start == 0 else self.word_priorities):
+                suggestion = typed[:start] + completion
+                if suggestion.lower() != typed.lower() and suggestion not in results:
+                    results.append(suggestion)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def record(self, message: str) -> None:
+        """Count a sent message towards the suggestions it contains, whole or as its last words."""
+        words = normalize(message).split()
+        for start in range(len(words)):
+            key = " ".join(words[start:])
+            i = self.positions.get(key)
+            if i is None:
+                continue
+            if not self.uses[i]:
+                insort(self.used, i)
+            self.uses[i] += 1
+            # Only this suggestion's count went up, so a cached ranking needs at most it added
+            for length in range(1, len(key) + 1):
+                for priorities in (None, self.word_priorities):
+                    top = self.used_top.get((key[:length], priorities))
+                    if top is not None and (priorities is None or self.priorities[i] in priorities):
+                        if i not in top:
+                            top.append(i)
+                        top.sort(key=self._rank)
+                        del top[MAX_SUGGESTIONS:]
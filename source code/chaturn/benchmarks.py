@@ -0,0 +1,357 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+import ephemeris
+import grading
+import planet_info
+import visibility
+from main import ChatSession, Constants, DataLoader, InputParser
+from question_bank import BankCollection, MemoryBank
+from quiz_generator import QuizGenerator
+from search_index import InvertedIndex
+from small_talk import SmallTalk
+from spelling import SpellingCorrector
+
+# Where --save-baseline writes and regressions are checked against
+BASELINE_PATH = "benchmark_baseline.json"
+
+# A benchmark fails when it is this much slower per operation than its baseline
+REGRESSION_THRESHOLD = 0.25
+
+DEFAULT_SCALES = [1, 100, 10000]
+
+# Utterances a user might type; {name} is filled in with catalog objects
+UTTERANCES = [
+    "hello", "help", "list planets", "random fact", "start quiz", "thank you", "tell me a joke",
+    "tell me about mars", "tell me about {name}", "compare earth and mars",
+    "how hot is {name}", "how many moons does {name} have", "what is the diameter of {name}",
+    "how far is {name} from the sun", "which planet has sulfuric acid clouds",
+    "find objects with rings", "what are dwarf planets", "who made you", "xyzzy",
+]
+
+# Per scale unit: catalog entries are the real catalog repeated, everything else is this many items
+OPERATIONS_PER_SCALE = 20
+
+Benchmark = Callable[[int, Dict], Tuple[Callable[[], None], int]]
+
+
+def synthetic_catalog(base: Dict[str, Dict[str, str]], scale: int) -> Dict[str, Dict[str, str]]:
+    """The real catalog repeated `scale` times, each copy under new names."""
+    if scale == 1:
+        return dict(base)
+    catalog = {}
+    for copy in range(scale):
+        for entry in base.values():
+            name = f"{entry.get('name', 'object')} {copy}"
+            catalog[name.lower()] = {**entry, "name": name}
+    return catalog
+
+
+def write_catalog_files(catalog: Dict[str, Dict[str, str]], directory: str) -> Tuple[str, str]:
+    """Write a catalog as the JSON and CSV files DataLoader reads, split the way the real files are."""
+    json_path = os.path.join(directory, "astronomy.json")
+    csv_path = os.path.join(directory, "space_objects.csv")
+    entries = list(catalog.values())
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(entries[::2], f, indent=2, ensure_ascii=False)
+
+    headers = sorted({field for entry in entries[1::2] for field in entry} | {"name"})
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for entry in entries[1::2]:
+            writer.writerow([entry.get(field, "N/A") for field in headers])
+    return json_path, csv_path
+
+
+def utterance_corpus(catalog: Dict[str, Dict[str, str]], count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    names = [entry.get("name", key) for key, entry in catalog.items()]
+    return [rng.choice(UTTERANCES).format(name=rng.choice(names)) for _ in range(count)]
+
+
+def use_catalog(catalog: Dict[str, Dict[str, str]]) -> None:
+    """Make DataLoader serve an in-memory catalog and rebuild what the parser derives from it."""
+    DataLoader._astronomy_data = catalog
+    DataLoader._search_index = InvertedIndex.from_catalog(catalog)
+    InputParser._phrase_index = None
+    DataLoader._fact_pool = None
+    DataLoader._catalog_columns = None
+    DataLoader._autocomplete = None
+    DataLoader._spelling = None
+
+
+def bench_load_astronomy_data(scale: int, context: Dict):
+    json_path = context["files"][0]
+    return lambda: DataLoader.load_astronomy_data(json_path), len(context["catalog"]) // 2
+
+
+def bench_load_space_objects_data(scale: int, context: Dict):
+    csv_path = context["files"][1]
+    return lambda: DataLoader.load_space_objects_data(csv_path), len(context["catalog"]) // 2
+
+
+def bench_merge_data(scale: int, context: Dict):
+    json_data = DataLoader.load_astronomy_data(context["files"][0])
+    csv_data = DataLoader.load_space_objects_data(context["files"][1])
+    return lambda: DataLoader.merge_data(json_data, csv_data), len(json_data) + len(csv_data)
+
+
+def bench_parse_input(scale: int, context: Dict):
+    corpus = utterance_corpus(context["catalog"], OPERATIONS_PER_SCALE * scale)
+
+    def run():
+        for utterance in corpus:
+            InputParser.parse_input(utterance)
+    return run, len(corpus)
+
+
+def bench_check_answer(scale: int, context: Dict):
+    bank = context["bank"]
+    question_ids, answers = grading.synthetic_answers(bank, OPERATIONS_PER_SCALE * scale)
+    questions = {question_id: bank.get(question_id) for question_id in set(question_ids)}
+    items = [(questions[question_id], answer) for question_id, answer in zip(question_ids, answers)]
+
+    def run():
+        for question, answer in items:
+            grading.check_answer(question, answer)
+    return run, len(items)
+
+
+def bench_levenshtein_distance(scale: int, context: Dict):
+    rng = random.Random(0)
+    words = sorted({word for entry in context["base"].values()
+                    for word in entry.get("description", "").lower().split()})
+    pairs = [(rng.choice(words), rng.choice(words)) for _ in range(OPERATIONS_PER_SCALE * scale)]
+
+    def run():
+        for s1, s2 in pairs:
+            grading.levenshtein_distance(s1, s2)
+    return run, len(pairs)
+
+
+def bench_get_planet_info(scale: int, context: Dict):
+    planets = list(itertools.islice(itertools.cycle(Constants.planets), OPERATIONS_PER_SCALE * scale))
+
+    def run():
+        for planet in planets:
+            planet_info.describe_planet(planet)
+    return run, len(planets)
+
+
+def bench_compare_objects(scale: int, context: Dict, width: int = 2):
+    session = context["session"]
+    rng = random.Random(0)
+    keys = list(context["catalog"])
+    groups = [rng.sample(keys, width) for _ in range(OPERATIONS_PER_SCALE * scale)]
+
+    def run():
+        for group in groups:
+            "".join(session.compare_objects(group))
+    return run, len(groups)
+
+
+def bench_compare_objects_wide(scale: int, context: Dict):
+    return bench_compare_objects(scale, context, width=8)
+
+
+def bench_random_fact(scale: int, context: Dict):
+    session = context["session"]
+    # Build the fact pool for this catalog before timing
+    DataLoader.fact_pool()
+    draws = OPERATIONS_PER_SCALE * scale
+
+    def run():
+        for _ in range(draws):
+            session.get_random_fact()
+    return run, draws
+
+
+def bench_ephemeris(scale: int, context: Dict):
+    # One vectorized call over a span of dates, as for a closest-approach search
+    dates = ephemeris.J2000 + np.arange(OPERATIONS_PER_SCALE * scale, dtype=np.float64)
+    return lambda: ephemeris.distance_au("mars", "earth", dates), len(dates)
+
+
+def bench_visibility(scale: int, context: Dict):
+    # Nights of rise, transit and set times for every object, a year per place at a time
+    places = list(visibility.PLACES.values())
+    nights = OPERATIONS_PER_SCALE * scale
+    chunks = [(places[i % len(places)], min(365, nights - start)) for i, start in enumerate(range(0, nights, 365))]
+    first = ephemeris.calendar_date(ephemeris.J2000).date()
+
+    def run():
+        for (latitude, longitude, zone), count in chunks:
+            offset = visibility.utc_offset(ZoneInfo(zone), first)
+            visibility.night_events(visibility.night_table(latitude, longitude, first, count, offset))
+    return run, nights
+
+
+def bench_autocomplete(scale: int, context: Dict):
+    # One lookup per keystroke while typing utterances about catalog objects
+    completer = DataLoader.autocomplete()
+    rng = random.Random(0)
+    keys = list(context["catalog"])
+    prefixes = []
+    while len(prefixes) < OPERATIONS_PER_SCALE * scale:
+        utterance = rng.choice(UTTERANCES).format(name=rng.choice(keys))
+        prefixes.extend(utterance[:i] for i in range(1, len(utterance) + 1))
+
+    def run():
+        for prefix in prefixes:
+            completer.suggest(prefix)
+    return run, len(prefixes)
+
+
+def bench_spelling(scale: int, context: Dict):
+    # Utterances with one letter of every word dropped, swapped or doubled, corrected word by word
+    corrector = SpellingCorrector(*DataLoader.spelling_vocabulary())
+    rng = random.Random(0)
+    keys = list(context["catalog"])
+
+    def typo(word: str) -> str:
+        if len(word) < 4:
+            return word
+        i = rng.randrange(len(word) - 1)
+        return rng.choice([word[:i] + word[i + 1:], word[:i] + word[i + 1] + word[i] + word[i + 2:],
+                           word[:i] + word[i] + word[i:]])
+    messages = [" ".join(typo(word) for word in rng.choice(UTTERANCES).format(name=rng.choice(keys)).split())
+                for _ in range(OPERATIONS_PER_SCALE * scale)]
+
+    def run():
+        for message in messages:
+            corrector.correct(message)
+    return run, len(messages)
+
+
+def bench_small_talk(scale: int, context: Dict):
+    # The real table plus one entry per catalog object, so the table grows with the scale
+    entries = DataLoader.small_talk().entries + [
+        {"phrases": [f"what do you think of {entry.get('name', key)}"], "responses": ["Fascinating!"]}
+        for key, entry in context["catalog"].items()]
+    table = SmallTalk(entries)
+    rng = random.Random(0)
+    phrases = [phrase for entry in entries for phrase in entry["phrases"] if phrase]
+
+    def typo(phrase: str) -> str:
+        i = rng.randrange(len(phrase))
+        return phrase[:i] + phrase[i + 1:]
+    messages = [rng.choice([lambda p: p, typo, lambda p: "xyzzy " + p[::-1]])(rng.choice(phrases))
+                for _ in range(OPERATIONS_PER_SCALE * scale)]
+
+    def run():
+        for message in messages:
+            table.match(message)
+    return run, len(messages)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "load_astronomy_data": bench_load_astronomy_data,
+    "load_space_objects_data": bench_load_space_objects_data,
+    "merge_data": bench_merge_data,
+    "parse_input": bench_parse_input,
+    "check_answer": bench_check_answer,
+    "levenshtein_distance": bench_levenshtein_distance,
+    "get_planet_info": bench_get_planet_info,
+    "compare_objects": bench_compare_objects,
+    "compare_objects_wide": bench_compare_objects_wide,
+    "small_talk": bench_small_talk,
+    "random_fact": bench_random_fact,
+    "ephemeris": bench_ephemeris,
+    "visibility": bench_visibility,
+    "autocomplete": bench_autocomplete,
+    "spelling": bench_spelling,
+}
+
+
+def time_best(run: Callable[[], None], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_suite(scales: List[int], names: List[str], repeat: int) -> Dict[str, float]:
+    """Run every benchmark at every scale; returns seconds per operation keyed 'name@scale'."""
+    base = DataLoader.astronomy_data()
+    # Generated catalog questions, with a fixed seed so every run grades the same answers
+    bank = BankCollection([MemoryBank("catalog", QuizGenerator(base, seed=0).generate())])
+    results = {}
+
+    try:
+        for scale in scales:
+            catalog = synthetic_catalog(base, scale)
+            with tempfile.TemporaryDirectory() as directory:
+                context = {
+                    "base": base,
+                    "catalog": catalog,
+                    "files": write_catalog_files(catalog, directory),
+                    "bank": bank,
+                    "session": ChatSession(),
+                }
+                use_catalog(catalog)
+                for name in names:
+                    run, operations = BENCHMARKS[name](scale, context)
+                    per_operation = time_best(run, repeat) / max(operations, 1)
+                    results[f"{name}@{scale}x"] = per_operation
+                    print(f"{name:<26} {scale:>6}x  {operations:>9} ops  {per_operation * 1e6:>12.2f} µs/op",
+                          file=sys.stderr)
+    finally:
+        DataLoader.reload()
+
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Describe every result more than `threshold` slower than its baseline."""
+    regressions = []
+    for key, seconds in results.items():
+        reference = baseline.get(key)
+        if reference and seconds > reference * (1 + threshold):
+            regressions.append(f"{key}: {seconds * 1e6:.2f} µs/op vs baseline {reference * 1e6:.2f} µs/op "
+                               f"(+{(seconds / reference - 1) * 100:.0f}%)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the parser, loader, grader and renderer.")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES))
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the best is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    results = run_suite([int(s) for s in args.scales.split(",")], args.only.split(","), args.repeat)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        sys.exit(0)
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if regressions:
+        print("Regressions:\n" + "\n".join(regressions))
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} of the baseline.")
@@ -0,0 +1,92 @@
+import importlib
+import time
+from typing import Callable, Dict, Iterator, Optional, Union
+
+# A reply is either the whole text or its parts, yielded as they are produced so they can be shown early
+Reply = Union[str, Iterator[str]]
+
+# A handler takes (session, param1, param2) and returns the reply
+Handler = Callable[..., Reply]
+
+
+class LazyHandler:
+    """A command handler, imported from "module:function" the first time it is called.
+
+    Every call is timed into `calls` and `seconds`, and the import into
+    `import_seconds`, so the cost of each command is known without turning
+    profiling on. For a reply given in parts, only the time spent producing
+    the parts counts, not the time the caller spends between them.
+    """
+
+    def __init__(self, target: Union[str, Handler]):
+        self.target = target
+        self.function: Optional[Handler] = None if isinstance(target, str) else target
+        self.calls = 0
+        self.seconds = 0.0
+        self.import_seconds = 0.0
+
+    def resolve(self) -> Handler:
+        if self.function is None:
+            start = time.perf_counter()
+            module, name = self.target.split(":")
+            self.function = getattr(importlib.import_module(module), name)
+            self.import_seconds = time.perf_counter() - start
+        return self.function
+
+    def __call__(self, session, param1: str, param2: str) -> Reply:
+        function = self.resolve()
+        start = time.perf_counter()
+        reply = function(session, param1, param2)
+        self.seconds += time.perf_counter() - start
+        if isinstance(reply, str):
+            self.calls += 1
+            return reply
+        return self._timed_parts(reply)
+
+    def _timed_parts(self, parts: Iterator[str]) -> Iterator[str]:
+        try:
+            while True:
+                start = time.perf_counter()
+                part = next(parts, None)
+                self.seconds += time.perf_counter() - start
+                if part is None:
+                    return
+                yield part
+        finally:
+            self.calls += 1
+
+
+class CommandRegistry:
+    """Commands mapped to their handlers, dispatched with one dict lookup.
+
+    Handlers registered as "module:function" strings cost nothing until the
+    command is first used, so features can be added without slowing startup.
+    """
+
+    def __init__(self, fallback: Handler):
+        self.handlers: Dict[str, LazyHandler] = {}
+        self.fallback = LazyHandler(fallback)
+
+    def register(self, command: str, target: Union[str, Handler]) -> None:
+        self.handlers[command] = LazyHandler(target)
+
+    def dispatch(self, command: str, session, param1: str, param2: str) -> Reply:
+        return self.handlers.get(command, self.fallback)(session, param1, param2)
+
+    def preload(self) -> None:
+        """Import every handler module now, e.g. before forking workers that should share them."""
+        for handler in self.handlers.values():
+            handler.resolve()
+
+    def summary(self) -> str:
+        used = [(command, handler) for command, handler in self.handlers.items() if handler.calls]
+        if not used:
+            return "No commands handled yet."
+        lines = ["Handler timings:"]
+        for command, handler in sorted(used, key=lambda item: -item[1].seconds):
+            line = (f"• {command}: {handler.calls} calls, {handler.seconds * 1000 / handler.calls:.2f} ms avg, "
+                    f"{handler.seconds * 1000:.1f} ms total")
+            if handler.import_seconds:
+                line += f", imported in {handler.import_seconds * 1000:.1f} ms"
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,143 @@
+import argparse
+import datetime
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from quantities import AU_KM
+
+# Keplerian elements and their rates per Julian century, from E. M. Standish, "Keplerian Elements
+# for Approximate Positions of the Major Planets" (JPL), table 1. Columns: semi-major axis (AU),
+# eccentricity, inclination, mean longitude, longitude of perihelion, longitude of ascending
+# node (degrees). Earth is the Earth-Moon barycenter, which is within 5,000 km of Earth.
+ELEMENTS = {
+    "mercury": ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    "venus": ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    "earth": ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+              (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    "mars": ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    "jupiter": ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    "saturn": ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+               (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+    "uranus": ((19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503),
+               (-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589)),
+    "neptune": ((30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574),
+                (0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664)),
+    "pluto": ((39.48211675, 0.24882730, 17.14001206, 238.92903833, 224.06891629, 110.30393684),
+              (-0.00031596, 0.00005170, 0.00004818, 145.20780515, -0.04062942, -0.01183482)),
+}
+
+# The elements above are fitted to this span; outside it errors grow quickly
+VALID_YEARS = (1800, 2050)
+
+J2000 = 2451545.0
+J2000_DATETIME = datetime.datetime(2000, 1, 1, 12, tzinfo=datetime.timezone.utc)
+DAYS_PER_CENTURY = 36525.0
+LIGHT_SECONDS_PER_AU = 499.004784
+
+# Newton iterations for Kepler's equation; enough for eccentricities up to Pluto's
+KEPLER_ITERATIONS = 6
+
+# Years of daily Earth distances kept per body
+TABLE_CACHE_SIZE = 64
+
+Dates = Union[float, np.ndarray]
+
+
+def julian_day(moment: datetime.datetime) -> float:
+    """Julian day of a datetime; naive datetimes are taken as UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return J2000 + (moment - J2000_DATETIME).total_seconds() / 86400.0
+
+
+def calendar_date(jd: float) -> datetime.datetime:
+    """UTC datetime of a Julian day, to the second."""
+    return J2000_DATETIME + datetime.timedelta(seconds=round((float(jd) - J2000) * 86400))
+
+
+def heliocentric_positions(bodies: List[str], jd: Dates) -> np.ndarray:
+    """Ecliptic (J2000) x, y, z in AU of several bodies at several dates, shaped (bodies, dates, 3)."""
+    base = np.array([ELEMENTS[body][0] for body in bodies]).T[:, :, None]
+    rates = np.array([ELEMENTS[body][1] for body in bodies]).T[:, :, None]
+    centuries = (np.atleast_1d(np.asarray(jd, dtype=np.float64)) - J2000) / DAYS_PER_CENTURY
+    a, e, inclination, mean_longitude, perihelion, node = base + rates * centuries[None, None, :]
+
+    inclination, node = np.radians(inclination), np.radians(node)
+    argument = np.radians(perihelion) - node
+    mean_anomaly = np.radians((mean_longitude - perihelion + 180.0) % 360.0 - 180.0)
+
+    eccentric = mean_anomaly + e * np.sin(mean_anomaly)
+    for _ in range(KEPLER_ITERATIONS):
+        eccentric -= (eccentric - e * np.sin(eccentric) - mean_anomaly) / (1 - e * np.cos(eccentric))
+
+    # Position in the orbital plane, then rotated into the ecliptic frame
+    x_orbit = a * (np.cos(eccentric) - e)
+    y_orbit = a * np.sqrt(1 - e * e) * np.sin(eccentric)
+    cos_w, sin_w = np.cos(argument), np.sin(argument)
+    cos_n, sin_n = np.cos(node), np.sin(node)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    return np.stack([
+        (cos_w * cos_n - sin_w * sin_n * cos_i) * x_orbit + (-sin_w * cos_n - cos_w * sin_n * cos_i) * y_orbit,
+        (cos_w * sin_n + sin_w * cos_n * cos_i) * x_orbit + (-sin_w * sin_n + cos_w * cos_n * cos_i) * y_orbit,
+        (sin_w * sin_i) * x_orbit + (cos_w * sin_i) * y_orbit,
+    ], axis=-1)
+
+
+def heliocentric_position(body: str, jd: Dates) -> np.ndarray:
+    """Ecliptic (J2000) x, y, z of a body in AU; one row per date when `jd` is an array."""
+    position = heliocentric_positions([body], jd)[0]
+    return position if np.ndim(jd) else position[0]
+
+
+def distance_au(body: str, other: str, jd: Dates) -> Dates:
+    """Distance between two bodies in AU at one date or an array of dates."""
+    return np.linalg.norm(heliocentric_position(body, jd) - heliocentric_position(other, jd), axis=-1)
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def daily_distances(body: str, year: int) -> Tuple[float, np.ndarray]:
+    """Julian day of 1 January and the body's distance from Earth (AU) at noon UTC on every day of a year."""
+    start = julian_day(datetime.datetime(year, 1, 1, 12))
+    days = (datetime.date(year + 1, 1, 1) - datetime.date(year, 1, 1)).days
+    distances = distance_au(body, "earth", start + np.arange(days))
+    distances.flags.writeable = False
+    return start, distances
+
+
+def closest_approach(body: str, year: int) -> Tuple[datetime.datetime, float]:
+    """When in a year a body is closest to Earth, to within about an hour, and how close (AU)."""
+    start, distances = daily_distances(body, year)
+    day = int(distances.argmin())
+    # Refine hourly around the closest noon
+    hours = start + day - 1 + np.arange(49) / 24.0
+    nearby = distance_au(body, "earth", hours)
+    best = int(nearby.argmin())
+    return calendar_date(hours[best]), float(nearby[best])
+
+
+def describe_distance(au: float) -> Dict[str, float]:
+    return {"au": au, "km": au * AU_KM, "light_minutes": au * LIGHT_SECONDS_PER_AU / 60}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Planet positions and distances from Keplerian elements.")
+    parser.add_argument("body", choices=sorted(ELEMENTS))
+    parser.add_argument("--date", help="YYYY-MM-DD (default: now)")
+    parser.add_argument("--closest", type=int, metavar="YEAR", help="find the closest approach to Earth in a year")
+    args = parser.parse_args()
+
+    if args.closest:
+        moment, au = closest_approach(args.body, args.closest)
+    else:
+        moment = (datetime.datetime.fromisoformat(args.date) if args.date
+                  else datetime.datetime.now(datetime.timezone.utc))
+        au = float(distance_au(args.body, "earth", julian_day(moment)))
+    distance = describe_distance(au)
+    print(f"{args.body.title()} on {moment:%Y-%m-%d %H:%M} UTC: {distance['au']:.4f} AU, "
+          f"{distance['km'] / 1e6:.1f} million km, {distance['light_minutes']:.1f} light minutes from Earth")
@@ -0,0 +1,123 @@
+import os
+import random
+from array import array
+from collections.abc import Sequence
+from typing import Dict, Optional
+
+from question_bank import QuestionBank
+
+# Hand-written facts, one {"fact": "..."} object per line; read lazily like a question bank
+FACTS_FILE = "facts.jsonl"
+
+# (field, template) for facts generated from catalog entries; {name} and {value} are filled in
+CATALOG_FACT_TEMPLATES = [
+    ("description", "{value}"),
+    ("notable_features", "{name}: {value}"),
+    ("diameter", "{name} measures {value} across."),
+    ("mass", "{name} has a mass of {value}."),
+    ("distance_from_sun", "{name} lies {value} from the Sun."),
+    ("orbital_period", "One orbit of {name} takes {value}."),
+    ("rotation_period", "{name} turns once on its axis every {value}."),
+    ("surface_temperature", "The surface temperature of {name} is {value}."),
+    ("atmosphere", "Atmosphere of {name}: {value}."),
+    ("moons", "Moons of {name}: {value}."),
+]
+
+
+def _sentence(text: str) -> str:
+    text = text.strip()
+    return text if text.endswith((".", "!", "?")) else text + "."
+
+
+class CatalogFacts(Sequence):
+    """Facts generated on demand from catalog fields, one per (entry, template) the entry has a value for.
+
+    Only the packed (entry, template) pairs are stored, four bytes each; the
+    text is formatted when a fact is drawn.
+    """
+
+    def __init__(self, catalog: Dict[str, Dict[str, str]]):
+        self.catalog = catalog
+        self.keys = list(catalog)
+        self.pairs = array("I")
+        for i, key in enumerate(self.keys):
+            entry = catalog[key]
+            for t, (field, _) in enumerate(CATALOG_FACT_TEMPLATES):
+                value = entry.get(field)
+                if value and value != "N/A":
+                    self.pairs.append(i * len(CATALOG_FACT_TEMPLATES) + t)
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def __getitem__(self, i: int) -> str:
+        key_index, t = divmod(self.pairs[i], len(CATALOG_FACT_TEMPLATES))
+        key = self.keys[key_index]
+        entry = self.catalog[key]
+        field, template = CATALOG_FACT_TEMPLATES[t]
+        return _sentence(template.format(name=entry.get("name", key.title()), value=entry[field].strip().rstrip(".")))
+
+
+class FactPool(Sequence):
+    """The fact corpus followed by the catalog facts, seen as one sequence."""
+
+    def __init__(self, corpus: Optional[QuestionBank], catalog_facts: CatalogFacts):
+        self.corpus = corpus
+        self.catalog_facts = catalog_facts
+        self.corpus_size = len(corpus) if corpus is not None else 0
+
+    def __len__(self) -> int:
+        return self.corpus_size + len(self.catalog_facts)
+
+    def __getitem__(self, i: int) -> str:
+        if i < self.corpus_size:
+            return self.corpus[i]["fact"]
+        return self.catalog_facts[i - self.corpus_size]
+
+
+class ShuffleBag:
+    """Draw every index of a pool once, in random order, before any repeats.
+
+    This is a Fisher-Yates shuffle done one step per draw: only positions
+    that have been swapped are stored, so a draw is O(1) and the bag holds
+    at most one entry per draw made this round instead of the whole
+    permutation. Once every index has been drawn a new round starts.
+    """
+
+    def __init__(self, size: int, rng: Optional[random.Random] = None):
+        self.size = size
+        self.remaining = size
+        self.swaps: Dict[int, int] = {}
+        self.rng = rng or random.Random()
+
+    def draw(self) -> int:
+        if self.size == 0:
+            raise IndexError("draw from an empty shuffle bag")
+        if self.remaining == 0:
+            self.remaining = self.size
+            self.swaps.clear()
+        j = self.rng.randrange(self.remaining)
+        self.remaining -= 1
+        drawn = self.swaps.get(j, j)
+        # Move the last undrawn index into the drawn slot; the last slot is never read again this round
+        last = self.swaps.pop(self.remaining, self.remaining)
+        if j != self.remaining:
+            self.swaps[j] = last
+        return drawn
+
+    def to_dict(self) -> Dict:
+        return {"size": self.size, "remaining": self.remaining, "swaps": self.swaps}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ShuffleBag":
+        bag = cls(data["size"])
+        bag.remaining = data["remaining"]
+        # JSON turns the integer keys into strings
+        bag.swaps = {int(k): v for k, v in data["swaps"].items()}
+        return bag
+
+
+def load_fact_pool(catalog: Dict[str, Dict[str, str]], path: str = FACTS_FILE) -> FactPool:
+    """The corpus at `path`, if there is one, plus facts generated from the catalog."""
+    corpus = QuestionBank(path) if os.path.exists(path) else None
+    return FactPool(corpus, CatalogFacts(catalog))
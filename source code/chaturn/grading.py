@@ -0,0 +1,377 @@
+import argparse
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from quantities import ABSOLUTE_OFFSETS, parse_quantity, unit_dimension
+
+DistanceFunction = Callable[[str, str], int]
+
+# Thresholds tried in order when fuzzy-matching an answer, stricter first
+SIMILARITY_THRESHOLDS = [0.95, 0.90, 0.85]
+
+# Relative difference allowed between a numeric answer and the correct value
+NUMERIC_TOLERANCE = 0.05
+
+# Answers per task handed to a worker process
+PROCESS_CHUNK_SIZE = 20000
+
+
+def levenshtein_distance(s1: str, s2: str) -> int:
+    """Calculate the Levenshtein distance between two strings."""
+    if len(s1) < len(s2):
+        return levenshtein_distance(s2, s1)
+
+    if len(s2) == 0:
+        return len(s1)
+
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+
+    return previous_row[-1]
+
+
+def clean_text(s: str) -> str:
+    return ''.join(c.lower() for c in s if c.isalnum() or c.isspace())
+
+
+def string_similarity(s1: str, s2: str, distance: DistanceFunction = levenshtein_distance) -> float:
+    """Calculate string similarity as a ratio between 0 and 1."""
+    # Clean and normalize strings
+    s1 = clean_text(s1)
+    s2 = clean_text(s2)
+
+    # Handle empty strings
+    if not s1 and not s2:
+        return 1.0
+    if not s1 or not s2:
+        return 0.0
+
+    # Calculate Levenshtein distance
+    max_len = max(len(s1), len(s2))
+
+    # Calculate similarity ratio
+    base_similarity = 1 - (distance(s1, s2) / max_len)
+
+    # Boost score for partial matches
+    if s1 in s2 or s2 in s1:
+        base_similarity += 0.1
+
+    # Boost score for same first letter
+    if s1[0] == s2[0]:
+        base_similarity += 0.05
+
+    return min(1.0, base_similarity)
+
+
+def are_units_compatible(unit1: str, unit2: str) -> bool:
+    """Check if two units are compatible."""
+    # Normalize units
+    unit1 = unit1.lower().strip('.')
+    unit2 = unit2.lower().strip('.')
+
+    # Direct match
+    if unit1 == unit2:
+        return True
+
+    # Units measuring the same dimension can be converted into each other
+    dimension = unit_dimension(unit1)
+    return dimension is not None and dimension == unit_dimension(unit2)
+
+
+def is_answer_similar(user_answer: str, correct_answer: str, threshold: float = 0.85,
+                      distance: DistanceFunction = levenshtein_distance) -> bool:
+    """Check if the user's answer is similar enough to the correct answer."""
+    # Clean and normalize both answers
+    user_answer = user_answer.lower().strip()
+    correct_answer = correct_answer.lower().strip()
+
+    # Direct match
+    if user_answer == correct_answer:
+        return True
+
+    # Handle numeric answers with units, compared after conversion to base units
+    if any(c.isdigit() for c in correct_answer):
+        correct_quantity = parse_quantity(correct_answer)
+        # A bare number is read in the unit of the correct answer
+        user_quantity = parse_quantity(user_answer, correct_quantity.unit if correct_quantity else None)
+
+        if user_quantity is not None and correct_quantity is not None:
+            # Check if units match or are compatible
+            if (user_quantity.dimension and correct_quantity.dimension
+                    and user_quantity.dimension != correct_quantity.dimension):
+                return False
+            # Check if numbers are close (within 5% tolerance); temperatures in kelvin, since 5% of
+            # a value in °C vanishes near 0 °C
+            offset = ABSOLUTE_OFFSETS.get(correct_quantity.dimension, 0.0)
+            difference = abs(user_quantity.value - correct_quantity.value)
+            return difference <= NUMERIC_TOLERANCE * abs(correct_quantity.value + offset)
+
+    # Handle multiple acceptable answers
+    if '/' in correct_answer:
+        return any(is_answer_similar(user_answer, alt.strip(), threshold, distance)
+                   for alt in correct_answer.split('/'))
+
+    # Split into words and check each word
+    user_words = user_answer.split()
+    correct_words = correct_answer.split()
+
+    # Single word answers
+    if len(user_words) == 1 and len(correct_words) == 1:
+        return string_similarity(user_answer, correct_answer, distance) > threshold
+
+    # Multi-word answers
+    matches = 0
+    total_weight = 0
+
+    # Create word pairs for comparison
+    for u_word in user_words:
+        best_match = 0
+        for c_word in correct_words:
+            similarity = string_similarity(u_word, c_word, distance)
+            best_match = max(best_match, similarity)
+        matches += best_match
+        total_weight += 1
+
+    # Calculate weighted average similarity
+    if total_weight > 0:
+        avg_similarity = matches / total_weight
+        return avg_similarity > threshold
+
+    return False
+
+
+def check_answer(question: Dict, answer: str, distance: DistanceFunction = levenshtein_distance) -> bool:
+    """Check if the answer is correct for a traditional quiz question."""
+    # If it's a multiple choice question
+    if question["options"]:
+        # Try to match the answer with option number
+        try:
+            if answer.isdigit():
+                idx = int(answer) - 1
+                if 0 <= idx < len(question["options"]):
+                    answer = question["options"][idx]
+        except:
+            pass
+
+        # Check against all acceptable answers
+        acceptable_answers = question["answer"].lower().split('/')
+
+        # Try exact matches first
+        for acc_answer in acceptable_answers:
+            if answer.lower().strip() == acc_answer.strip():
+                return True
+
+        # Then try fuzzy matching with different thresholds
+        for threshold in SIMILARITY_THRESHOLDS:
+            for acc_answer in acceptable_answers:
+                if is_answer_similar(answer, acc_answer, threshold, distance):
+                    return True
+
+        # Finally, check if the answer is similar to any of the options
+        for option in question["options"]:
+            if is_answer_similar(answer, option, 0.85, distance):
+                # Double check if this option is a correct answer
+                if any(is_answer_similar(option, acc, 0.85, distance) for acc in acceptable_answers):
+                    return True
+
+    return False
+
+
+def levenshtein_batch(pairs: Sequence[Tuple[str, str]]):
+    """Edit distances for many string pairs at once, as a NumPy int array.
+
+    Pairs are grouped by their exact (len_a, len_b) so no padding is needed.
+    Each group runs the Wagner-Fischer recurrence one row at a time across
+    every pair in the group. The insertion step, which depends on the cell
+    to its left, becomes a running minimum: cur[j] = min over k <= j of
+    (t[k] + j - k), computed with np.minimum.accumulate.
+    """
+    import numpy as np
+
+    result = np.empty(len(pairs), dtype=np.int32)
+    groups: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for position, (a, b) in enumerate(pairs):
+        groups[(len(a), len(b))].append(position)
+
+    for (len_a, len_b), positions in groups.items():
+        positions = np.asarray(positions)
+        if len_a == 0 or len_b == 0:
+            result[positions] = len_a + len_b
+            continue
+
+        left = np.array([[ord(c) for c in pairs[p][0]] for p in positions], dtype=np.uint32)
+        right = np.array([[ord(c) for c in pairs[p][1]] for p in positions], dtype=np.uint32)
+        columns = np.arange(len_b + 1, dtype=np.int32)
+        previous = np.broadcast_to(columns, (len(positions), len_b + 1)).copy()
+
+        for i in range(len_a):
+            substitutions = previous[:, :-1] + (left[:, i:i + 1] != right)
+            deletions = previous[:, 1:] + 1
+            best = np.minimum(substitutions, deletions)
+            shifted = np.empty_like(previous)
+            shifted[:, 0] = i + 1
+            shifted[:, 1:] = best - columns[1:]
+            previous = np.minimum.accumulate(shifted, axis=1) + columns
+
+        result[positions] = previous[:, -1]
+
+    return result
+
+
+def _text_pairs(source: str, targets: List[str], pairs: Set[Tuple[str, str]]) -> None:
+    """Add the whole-string and word-by-word pairs between a source and each target."""
+    for target in targets:
+        for s1, s2 in [(source, target)] + [(w1, w2) for w1 in source.split() for w2 in target.split()]:
+            s1, s2 = clean_text(s1), clean_text(s2)
+            if s1 and s2:
+                pairs.add((s1, s2))
+
+
+def _targets(question: Dict) -> List[str]:
+    return ([alt.strip() for alt in question["answer"].lower().split('/')] +
+            [option.lower() for option in question["options"]])
+
+
+def question_pairs(question: Dict) -> Set[Tuple[str, str]]:
+    """String pairs `check_answer` may compare that depend only on the question.
+
+    Options are compared against the accepted answers, and an answer given
+    as an option number becomes that option's text.
+    """
+    pairs: Set[Tuple[str, str]] = set()
+    targets = _targets(question)
+    for option in question["options"]:
+        _text_pairs(option.lower(), targets, pairs)
+    return pairs
+
+
+def answer_pairs(question: Dict, answer: str) -> Set[Tuple[str, str]]:
+    """String pairs `check_answer` may compare between a free-text answer and the question."""
+    pairs: Set[Tuple[str, str]] = set()
+    if not (answer.isdigit() and 0 < int(answer) <= len(question["options"])):
+        _text_pairs(answer, _targets(question), pairs)
+    return pairs
+
+
+def _grade_chunk(items: List[Tuple[Dict, str]]) -> List[bool]:
+    return [check_answer(question, answer) for question, answer in items]
+
+
+def grade_batch(question_ids: Sequence[str], answers: Sequence[str], bank,
+                backend: str = "numpy", workers: Optional[int] = None) -> List[bool]:
+    """Grade many answers at once without touching any quiz session state.
+
+    `bank` resolves question ids to questions (question_bank.BankCollection).
+    Answers are normalized the way QuizManagerImpl.handle_message does
+    (lowercased and stripped), and identical (question, answer) pairs are
+    graded once. Backends: "python" grades serially, "numpy" computes every
+    edit distance in one vectorized pass before running the usual matching
+    rules, and "process" spreads the grading across a process pool.
+    """
+    if len(question_ids) != len(answers):
+        raise ValueError("question_ids and answers must have the same length")
+
+    # Deduplicate: replayed sessions and classrooms repeat the same answers a lot
+    unique: Dict[Tuple[str, str], int] = {}
+    slots = []
+    for question_id, answer in zip(question_ids, answers):
+        key = (question_id, answer.lower().strip())
+        slots.append(unique.setdefault(key, len(unique)))
+
+    questions: Dict[str, Dict] = {}
+    for question_id, _ in unique:
+        if question_id not in questions:
+            questions[question_id] = bank.get(question_id)
+    items = [(questions[question_id], answer) for question_id, answer in unique]
+
+    if backend == "python":
+        grades = _grade_chunk(items)
+    elif backend == "numpy":
+        # Collect a superset of the comparisons the matching rules can make, then
+        # compute all of their edit distances in one vectorized pass
+        pairs = set()
+        for question in questions.values():
+            pairs |= question_pairs(question)
+        for question, answer in items:
+            pairs |= answer_pairs(question, answer)
+        pairs = list(pairs)
+        distances = dict(zip(pairs, levenshtein_batch(pairs).tolist())) if pairs else {}
+
+        def lookup(s1: str, s2: str) -> int:
+            value = distances.get((s1, s2))
+            if value is None:
+                value = distances.get((s2, s1))
+            return value if value is not None else levenshtein_distance(s1, s2)
+
+        grades = [check_answer(question, answer, lookup) for question, answer in items]
+    elif backend == "process":
+        chunks = [items[i:i + PROCESS_CHUNK_SIZE] for i in range(0, len(items), PROCESS_CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            grades = [grade for chunk in pool.map(_grade_chunk, chunks) for grade in chunk]
+    else:
+        raise ValueError(f"unknown grading backend: {backend}")
+
+    return [grades[slot] for slot in slots]
+
+
+def synthetic_answers(bank, count: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """Random (question id, answer) pairs: right answers, option numbers, typos and misses."""
+    rng = random.Random(seed)
+    ids = [bank[rng.randrange(len(bank))] for _ in range(min(len(bank), 200))]
+    question_ids, answers = [], []
+    for _ in range(count):
+        question_id = rng.choice(ids)
+        question = bank.get(question_id)
+        right = question["answer"].split('/')[0]
+        kind = rng.random()
+        if kind < 0.3:
+            answer = right
+        elif kind < 0.5:
+            answer = str(rng.randint(1, len(question["options"])))
+        elif kind < 0.8 and len(right) > 3:
+            cut = rng.randrange(len(right))
+            answer = right[:cut] + right[cut + 1:]
+        else:
+            answer = rng.choice(question["options"])
+        question_ids.append(question_id)
+        answers.append(answer)
+    return question_ids, answers
+
+
+def benchmark(bank, count: int, backends: Iterable[str], workers: Optional[int] = None) -> Dict[str, float]:
+    """Grade `count` synthetic answers with each backend and return answers per second."""
+    question_ids, answers = synthetic_answers(bank, count)
+    rates = {}
+    for backend in backends:
+        start = time.perf_counter()
+        grade_batch(question_ids, answers, bank, backend=backend, workers=workers)
+        rates[backend] = count / (time.perf_counter() - start)
+    return rates
+
+
+if __name__ == "__main__":
+    from question_bank import BankCollection, load_banks
+
+    parser = argparse.ArgumentParser(description="Measure batch grading throughput.")
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--backends", default="python,numpy,process")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--banks", default="question_banks")
+    args = parser.parse_args()
+
+    banks = [bank for name, bank in load_banks(args.banks).items() if name != "personal"]
+    rates = benchmark(BankCollection(banks), args.answers, args.backends.split(","), args.workers)
+    print(json.dumps({"answers": args.answers, "cpus": os.cpu_count(),
+                      "answers_per_second": {k: round(v) for k, v in rates.items()}}, indent=2))
@@ -0,0 +1,139 @@
+import itertools
+import os
+import queue
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import customtkinter as ctk
+from PIL import Image
+
+# Thumbnails, one file per catalog object named after its key: "mars.png", "andromeda_galaxy.jpg"
+IMAGE_DIR = "images"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif")
+
+# Longest side of a thumbnail, in pixels
+THUMBNAIL_SIZE = 96
+
+# Decoded thumbnails kept in memory; at 96 px and 4 bytes per pixel a thumbnail is at most 36 KiB
+CACHE_BYTES = 8 * 1024 * 1024
+
+# Queue priorities: images someone is waiting for go before prewarmed guesses
+SHOWN, PREWARM = 0, 1
+
+ImageCallback = Callable[[ctk.CTkImage], None]
+
+
+def image_key(name: str) -> str:
+    """Catalog key for an image file name: "Andromeda_Galaxy.jpg" -> "andromeda galaxy"."""
+    return os.path.splitext(name)[0].lower().replace("_", " ").replace("-", " ")
+
+
+def decode_thumbnail(path: str, size: int = THUMBNAIL_SIZE) -> Image.Image:
+    image = Image.open(path)
+    # JPEGs can decode straight at a reduced scale, which is most of the saving on large photos
+    image.draft("RGB", (size * 2, size * 2))
+    image.thumbnail((size, size))
+    return image.convert("RGBA")
+
+
+class ImageCache:
+    """Thumbnails for catalog objects, decoded on a background thread.
+
+    The main thread never opens an image file. get() answers from an LRU of
+    CTkImage objects bounded by CACHE_BYTES; request() queues a decode and
+    calls back once drain(), run from the main loop, hands over the result.
+    prewarm() decodes images likely to be asked for next at a lower
+    priority, so they are usually cached by the time they are shown.
+    """
+
+    def __init__(self, directory: str = IMAGE_DIR, max_bytes: int = CACHE_BYTES, size: int = THUMBNAIL_SIZE):
+        self.size = size
+        self.max_bytes = max_bytes
+        self.paths: Dict[str, str] = {}
+        if os.path.isdir(directory):
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    self.paths.setdefault(image_key(entry.name), entry.path)
+
+        # Main thread only
+        self.images: "OrderedDict[str, Tuple[ctk.CTkImage, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.waiting: Dict[str, List[ImageCallback]] = {}
+        self.failed = set()
+
+        self.requests: "queue.PriorityQueue[Tuple[int, int, str]]" = queue.PriorityQueue()
+        self.decoded: "queue.Queue[Tuple[str, Optional[Image.Image]]]" = queue.Queue()
+        self.order = itertools.count()
+        self.worker: Optional[threading.Thread] = None
+
+    def has_image(self, key: str) -> bool:
+        return key in self.paths and key not in self.failed
+
+    def get(self, key: str) -> Optional[ctk.CTkImage]:
+        """The cached thumbnail of an object, or None; never decodes."""
+        cached = self.images.get(key)
+        if cached is None:
+            return None
+        self.images.move_to_end(key)
+        return cached[0]
+
+    def request(self, key: str, callback: ImageCallback) -> None:
+        """Call back with the object's thumbnail, now if it is cached, else once it has been decoded."""
+        image = self.get(key)
+        if image is not None:
+            callback(image)
+        elif self.has_image(key):
+            # A prewarm still queued behind other guesses is queued again ahead of them
+            if not self.waiting.get(key):
+                self._enqueue(SHOWN, key)
+            self.waiting.setdefault(key, []).append(callback)
+
+    def prewarm(self, keys: Iterable[str]) -> None:
+        """Decode these objects' thumbnails in the background if they are not cached yet."""
+        for key in keys:
+            if self.has_image(key) and key not in self.images and key not in self.waiting:
+                self.waiting[key] = []
+                self._enqueue(PREWARM, key)
+
+    def drain(self) -> bool:
+        """Cache decoded thumbnails and run their callbacks; True while decodes are still outstanding."""
+        while True:
+            try:
+                key, image = self.decoded.get_nowait()
+            except queue.Empty:
+                break
+            callbacks = self.waiting.pop(key, [])
+            if image is None:
+                self.failed.add(key)
+                continue
+            thumbnail = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+            self._store(key, thumbnail, image.width * image.height * 4)
+            for callback in callbacks:
+                callback(thumbnail)
+        return bool(self.waiting)
+
+    def _store(self, key: str, image: ctk.CTkImage, size: int) -> None:
+        if key in self.images:
+            self.total_bytes -= self.images.pop(key)[1]
+        self.images[key] = (image, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes and len(self.images) > 1:
+            self.total_bytes -= self.images.popitem(last=False)[1][1]
+
+    def _enqueue(self, priority: int, key: str) -> None:
+        self.requests.put((priority, next(self.order), key))
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._decode_loop, name="image-cache", daemon=True)
+            self.worker.start()
+
+    def _decode_loop(self) -> None:
+        while True:
+            _, _, key = self.requests.get()
+            try:
+                image = decode_thumbnail(self.paths[key], self.size)
+            except Exception:
+                # Any failure (a truncated file, a decompression bomb, a format PIL cannot parse) must
+                # still be posted, or the key would stay waiting and the main loop keep polling for it
+                image = None
+            self.decoded.put((key, image))
@@ -0,0 +1,205 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+from main import COMMANDS, TRADITIONAL_QUIZ_LENGTH, ChatSession, DataLoader, InputParser
+
+# Keys of a recorded transcript line: {"session": ..., "input": ...}
+SESSION_KEY = "session"
+INPUT_KEY = "input"
+
+# Share of synthetic activities of each kind
+ACTIVITY_MIX = {
+    "query": 0.45,
+    "smalltalk": 0.2,
+    "fact": 0.15,
+    "quiz": 0.2,
+}
+
+QUERIES = [
+    "tell me about {planet}", "compare {planet} and {other}", "how hot is {planet}",
+    "how many moons does {planet} have", "how far is {planet} from the sun", "what is the diameter of {planet}",
+    "which planet has sulfuric acid clouds", "find objects with rings", "list planets", "what are dwarf planets",
+]
+SMALLTALK = ["hello", "hi", "thank you", "how are you", "tell me a joke", "who made you", "help", "bye"]
+FACTS = ["random fact", "tell me a fact", "surprise me"]
+PLANETS = ["mercury", "venus", "earth", "mars", "jupiter", "saturn", "uranus", "neptune", "pluto"]
+
+PERCENTILES = [50, 95, 99]
+
+
+def synthetic_conversation(rng: random.Random, turns: int) -> List[str]:
+    """A conversation of about `turns` messages mixing queries, small talk, facts and quizzes."""
+    kinds, weights = zip(*ACTIVITY_MIX.items())
+    messages: List[str] = []
+    while len(messages) < turns:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "query":
+            planet, other = rng.sample(PLANETS, 2)
+            messages.append(rng.choice(QUERIES).format(planet=planet, other=other))
+        elif kind == "smalltalk":
+            messages.append(rng.choice(SMALLTALK))
+        elif kind == "fact":
+            messages.append(rng.choice(FACTS))
+        else:
+            # Answer some or all of a traditional quiz with option numbers, hints and skips
+            messages += ["start quiz", "1"]
+            answered = rng.randint(1, TRADITIONAL_QUIZ_LENGTH)
+            for _ in range(answered):
+                messages.append(rng.choice(["1", "2", "3", "4", "1", "2", "3", "4", "skip", "mars"]))
+                if rng.random() < 0.1:
+                    messages.append("hint")
+            if answered < TRADITIONAL_QUIZ_LENGTH:
+                messages.append("exit")
+    return messages
+
+
+def synthetic_sessions(count: int, turns: int, seed: int = 0) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    return {f"synthetic-{i}": synthetic_conversation(rng, turns) for i in range(count)}
+
+
+def load_transcripts(path: str) -> Dict[str, List[str]]:
+    """Group the user messages of a JSONL transcript log by session, in order."""
+    sessions: Dict[str, List[str]] = defaultdict(list)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get(INPUT_KEY):
+                    sessions[str(record.get(SESSION_KEY, "default"))].append(record[INPUT_KEY])
+    return dict(sessions)
+
+
+def interleave(sessions: Dict[str, List[str]]) -> Iterator[Tuple[str, str]]:
+    """Round-robin over sessions so many conversations are in flight at once."""
+    queues = [(name, iter(messages)) for name, messages in sessions.items()]
+    while queues:
+        remaining = []
+        for name, messages in queues:
+            message = next(messages, None)
+            if message is not None:
+                yield name, message
+                remaining.append((name, messages))
+        queues = remaining
+
+
+def drive(sessions: Dict[str, List[str]], rate: float) -> List[Tuple[str, float]]:
+    """Send every message to its own ChatSession and return (command, latency) samples.
+
+    With a target `rate` (messages per second) messages are sent on a fixed
+    schedule and latency is measured from the scheduled send time, so time
+    spent queued behind a slow reply is counted. A rate of 0 sends as fast
+    as replies come back.
+    """
+    samples = []
+    with tempfile.TemporaryDirectory() as progress_dir:
+        chats = {}
+        for name in sessions:
+            chat = ChatSession(user_name=name)
+            # Keep synthetic learners' review schedules out of the real progress directory
+            chat.quiz_manager.progress_dir = progress_dir
+            chats[name] = chat
+
+        start = time.perf_counter()
+        for i, (name, message) in enumerate(interleave(sessions)):
+            scheduled = start + i / rate if rate else time.perf_counter()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            chat = chats[name]
+            chat.respond(message)
+            samples.append((chat.last_command, time.perf_counter() - scheduled))
+    return samples
+
+
+def _drive_shard(args: Tuple[Dict[str, List[str]], float]) -> List[Tuple[str, float]]:
+    return drive(*args)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples: List[Tuple[str, float]], elapsed: float) -> Dict:
+    by_command: Dict[str, List[float]] = defaultdict(list)
+    for command, latency in samples:
+        by_command[command].append(latency)
+        by_command["ALL"].append(latency)
+
+    commands = {}
+    for command, latencies in sorted(by_command.items(), key=lambda item: -len(item[1])):
+        latencies.sort()
+        commands[command] = {"count": len(latencies)}
+        for p in PERCENTILES:
+            commands[command][f"p{p}_ms"] = round(percentile(latencies, p) * 1000, 3)
+
+    return {
+        "messages": len(samples),
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "commands": commands,
+    }
+
+
+def run(sessions: Dict[str, List[str]], rate: float = 0, workers: int = 1) -> Dict:
+    """Replay sessions against the message path, split across `workers` processes."""
+    # Load the catalog, quiz bank, phrase index, small-talk table, facts, spelling dictionary and handlers once, before any timing
+    DataLoader.astronomy_data()
+    InputParser.phrase_index()
+    DataLoader.small_talk()
+    DataLoader.fact_pool()
+    DataLoader.spelling()
+    COMMANDS.preload()
+
+    start = time.perf_counter()
+    if workers <= 1:
+        samples = drive(sessions, rate)
+    else:
+        names = list(sessions)
+        shards = [({name: sessions[name] for name in names[i::workers]}, rate / workers) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            samples = [sample for shard in pool.map(_drive_shard, shards) for sample in shard]
+    return summarize(samples, time.perf_counter() - start)
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"{report['messages']} messages in {report['seconds']} s: {report['throughput']} messages/s", ""]
+    header = f"{'command':<16}{'count':>8}" + "".join(f"{f'p{p} ms':>11}" for p in PERCENTILES)
+    lines.append(header)
+    for command, stats in report["commands"].items():
+        lines.append(f"{command:<16}{stats['count']:>8}" +
+                     "".join(f"{stats[f'p{p}_ms']:>11.3f}" for p in PERCENTILES))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay or synthesize conversations and measure reply latency.")
+    parser.add_argument("--replay", help="JSONL transcript log to replay instead of synthetic conversations")
+    parser.add_argument("--sessions", type=int, default=100, help="synthetic sessions")
+    parser.add_argument("--turns", type=int, default=30, help="messages per synthetic session")
+    parser.add_argument("--rate", type=float, default=0, help="target messages per second (0 = as fast as possible)")
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the sessions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.replay:
+        if not os.path.exists(args.replay):
+            sys.exit(f"No transcript log at {args.replay}")
+        conversations = load_transcripts(args.replay)
+    else:
+        conversations = synthetic_sessions(args.sessions, args.turns, args.seed)
+
+    result = run(conversations, args.rate, args.workers)
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
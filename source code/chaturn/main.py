@@ -1,13 +1,35 @@
 import customtkinter as ctk
+import itertools
 import json
 import random
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 import os
-from PIL import Image, ImageDraw, ImageTk
 import pygame
 import math
 import csv
+import re
+import threading
 import time
+import uuid
+import datetime
+from search_index import InvertedIndex, best_snippet, document_text
+from quiz_generator import QuizGenerator
+from spaced_repetition import LeitnerScheduler
+from question_bank import BankCollection, MemoryBank, QuestionBank, load_banks
+import grading
+from profiling import StageProfiler
+from transcript_log import TranscriptLogger
+from transcript_archive import TranscriptArchive, iter_format, search_file
+from shared_catalog import SharedCatalog
+from small_talk import SMALL_TALK_FILE, SmallTalk
+from facts import FACTS_FILE, FactPool, ShuffleBag, load_fact_pool
+from comparison import BAR_WIDTH, RATIO_FIELDS, CatalogColumns
+from ephemeris import ELEMENTS, describe_distance, distance_au, julian_day
+from commands import CommandRegistry, Reply
+from image_cache import ImageCache
+from stall_monitor import IDLE, StallMonitor
+from autocomplete import MAX_SUGGESTIONS, Autocomplete
+from spelling import ENGLISH_WORDS_FILE, SpellingCorrector, count_words, load_word_counts
 
 # ANSI Color codes for terminal
 class Colors:
@@ -41,7 +63,10 @@ THEMES = {
 
 # Animation configurations
 ANIMATIONS = {
-    "fade_duration": 100  # milliseconds
+    "fade_duration": 100,  # milliseconds
+    "render_chunk_lines": 8,  # lines of a bot message laid out per step
+    "render_chunk_delay": 1,  # milliseconds between steps
+    "image_poll_delay": 30  # milliseconds between checks for thumbnails decoded in the background
 }
 
 # Configure appearance
@@ -62,6 +87,11 @@ class Constants:
     CMD_EXIT_QUIZ = "EXIT_QUIZ"
     CMD_SKIP_QUESTION = "SKIP_QUESTION"
     CMD_GREETINGS = "GREETINGS"
+    CMD_SEARCH = "SEARCH"
+    CMD_ASK_ATTRIBUTE = "ASK_ATTRIBUTE"
+    CMD_HISTORY = "HISTORY"
+    CMD_EPHEMERIS = "EPHEMERIS"
+    CMD_VISIBILITY = "VISIBILITY"
 
     # Word lists
     help_words = ["help", "commands", "guide", "instructions"]
@@ -78,7 +108,38 @@ class Constants:
     ]
     exit_words = ["exit", "quit", "stop", "end", "exit quiz", "stop quiz", "end quiz"]
     greeting_words = ["hello", "hi", "hey", "greetings", "yo"]
+    search_words = ["search", "find", "which"]
+    search_verbs = ["has", "have", "with", "contains"]
+    # Separate the objects named in a comparison: "compare Mars, Earth and Titan"
+    compare_separators = re.compile(r",|&|\b(?:and|vs|versus)\b\.?")
+    # Joins the objects of a COMPARE command into its single parameter
+    compare_joiner = "|"
+    # Words of questions answered from the ephemeris: "how far is Mars from Earth today?", "when is Mars closest in 2027?"
+    closest_words = ["closest", "nearest", "opposition"]
+    ephemeris_distance_words = ["far", "distance", "away", "close"]
+    # Questions about the night sky from a place: "what can I see tonight from Cairo?"
+    visibility_phrases = [
+        "what can i see", "what can we see", "what is visible", "whats visible", "what's visible",
+        "what is in the sky", "whats in the sky", "what's in the sky", "what's up tonight", "sky tonight"
+    ]
+    visibility_place_words = ["from", "in", "at", "over", "near"]
+    visibility_fillers = ["the", "sky", "this", "on", "tonight", "tomorrow", "night", "evening"]
+    history_phrases = [
+        "what did i ask about", "what have i asked about", "when did i ask about", "did i ask about",
+        "what did i say about", "search my history for", "search history for"
+    ]
     planets = ["mars", "jupiter", "saturn", "uranus", "neptune", "venus", "mercury", "earth", "pluto"]
+    # Command phrasings offered by autocomplete, on top of the word lists above
+    suggestion_phrases = [
+        "tell me about", "list planets", "random fact", "start quiz", "traditional quiz", "personal quiz",
+        "compare", "how far is", "when is", "what can i see tonight from", "which planet has", "search for",
+        "how hot is", "how many moons does", "what is the diameter of", "list"
+    ]
+    # Ranking of autocomplete sources when usage is equal: commands, then planets, then small talk, then any object
+    suggestion_priorities = {"command": 3, "planet": 2, "small_talk": 1, "object": 0}
+    # How much each occurrence of a word counts when two corrections of a typo are equally close:
+    # the parser's own words beat words of object names
+    spelling_weights = {"parser": 10, "object": 1}
 
     categories = [
         "stars", "constellations", "moons", "dwarf planets", "galaxies",
@@ -90,74 +151,69 @@ class Constants:
         "comets", "asteroids", "nebulae"
     ]
 
-# Quiz Data
-TRADITIONAL_QUIZ = [
-    {
-        "question": "What is the name of our galaxy?",
-        "options": ["Butterfly Galaxy", "Milky Way Galaxy", "Spiral Galaxy", "Andromeda Galaxy"],
-        "answer": "Milky Way Galaxy/Milky Way/Our Galaxy"
-    },
-    {
-        "question": "What is the smallest planet in our solar system?",
-        "options": ["Mercury", "Mars", "Pluto", "Venus"],
-        "answer": "Mercury/Smallest Planet/First Planet"
-    },
-    {
-        "question": "Which planet is known as the Red Planet?",
-        "options": ["Jupiter", "Mars", "Venus", "Mercury"],
-        "answer": "Mars/Red Planet/Fourth Planet"
-    },
-    {
-        "question": "What is the largest planet in our solar system?",
-        "options": ["Neptune", "Jupiter", "Saturn", "Uranus"],
-        "answer": "Jupiter/Largest Planet/Gas Giant"
-    },
-    {
-        "question": "What is the approximate distance of Earth from the Sun?",
-        "options": ["149.6 million km", "200 million km", "100 million km", "300 million km"],
-        "answer": "149.6 million km/150 million km/1 AU"
-    },
-    {
-        "question": "Which planet is known for its beautiful rings?",
-        "options": ["Jupiter", "Mars", "Saturn", "Uranus"],
-        "answer": "Saturn/Ringed Planet/Sixth Planet"
-    },
-    {
-        "question": "What is the average surface temperature on Venus?",
-        "options": ["462°C", "100°C", "200°C", "300°C"],
-        "answer": "462/460/462 degrees"
+    # Phrases that ask about a single catalog field, most specific field first
+    attribute_synonyms = {
+        "core_temperature": ["core", "core temperature", "inside"],
+        "surface_temperature": ["hot", "cold", "warm", "temperature", "temp", "surface temperature"],
+        "orbital_period": ["year", "orbit", "orbital period", "revolve", "go around the sun"],
+        "rotation_period": ["day", "rotation", "rotate", "spin", "rotation period"],
+        "moons": ["moons", "moon", "satellites", "how many moons"],
+        "diameter": ["big", "large", "size", "diameter", "wide", "radius"],
+        "mass": ["heavy", "mass", "weigh", "weight", "massive"],
+        "distance_from_sun": ["far", "distance", "away", "close", "distance from the sun"],
+        "atmosphere": ["atmosphere", "air", "atmospheric", "breathe"],
+        "age": ["old", "age"],
+        "spectral_type": ["spectral type", "spectral class", "color"],
     }
-]
 
-PERSONAL_QUIZ = [
-    {
-        "question": "What is your favorite planet in our solar system?",
-        "options": ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune"],
-        "answer": None
-    },
-    {
-        "question": "Which celestial phenomenon would you most like to see?",
-        "options": ["Solar Eclipse", "Aurora Borealis", "Meteor Shower", "Supernova"],
-        "answer": None
-    },
-    {
-        "question": "If you could visit any place in space, where would you go?",
-        "options": ["Moon", "Mars", "Jupiter's Moons", "Saturn's Rings"],
-        "answer": None
-    },
-    {
-        "question": "Which space mission interests you the most?",
-        "options": ["Moon Landing", "Mars Colonization", "Deep Space Exploration", "Space Tourism"],
-        "answer": None
-    },
-    {
-        "question": "What aspect of astronomy fascinates you most?",
-        "options": ["Black Holes", "Alien Life", "Galaxy Formation", "Star Life Cycles"],
-        "answer": None
+    # Fields to try when the requested one is missing from an entry
+    attribute_fallbacks = {
+        "distance_from_sun": ["distance_from_earth"],
+        "moons": ["notable_features"],
     }
-]
+
+    attribute_labels = {
+        "core_temperature": "🔥 core temperature",
+        "surface_temperature": "🌡️ surface temperature",
+        "orbital_period": "🔄 year (orbital period)",
+        "rotation_period": "🌀 day (rotation period)",
+        "moons": "🌙 moons",
+        "diameter": "📏 diameter",
+        "mass": "⚖️ mass",
+        "distance_from_sun": "📍 distance from the Sun",
+        "distance_from_earth": "📍 distance from Earth",
+        "atmosphere": "💨 atmosphere",
+        "age": "⏳ age",
+        "spectral_type": "🌈 spectral type",
+        "notable_features": "🌟 notable features",
+    }
+
+# Quiz Data
+# Question banks are JSONL files in this directory; "personal" holds the personal quiz
+# and every other bank joins the traditional quiz pool alongside the catalog questions
+QUESTION_BANK_DIR = "question_banks"
+PERSONAL_BANK = "personal"
+
+# Number of questions drawn for each traditional quiz
+TRADITIONAL_QUIZ_LENGTH = 10
+# Questions drawn per question asked, so repeated question texts can be skipped
+QUIZ_DRAW_FACTOR = 3
+
+# Where each user's spaced-repetition progress is saved; without one it is kept in the session state only
+PROGRESS_DIR = "progress"
+
+# Past questions shown for "what did I ask about ..."
+HISTORY_RESULTS = 5
+
+# Quiz manager state that belongs to the running process and is not carried between processes
+SESSION_LOCAL_FIELDS = {"schedulers", "progress_dir"}
 
 class InputParser:
+    # Precomputed phrase -> ("object", catalog key) / ("attribute", field) index
+    _phrase_index = None
+    _max_phrase_length = 1
+    _field_ranks = {field: rank for rank, field in enumerate(Constants.attribute_synonyms)}
+
     @staticmethod
     def parse_input(input_str: str, is_quiz_active: bool = False) -> str:
         words = input_str.lower().split()
@@ -167,6 +223,22 @@ class InputParser:
         else:
             return InputParser.parse_regular_mode(words, input_str)
 
+    @staticmethod
+    def parse_corrected(input_str: str, corrector: SpellingCorrector) -> Tuple[str, str, str]:
+        """Parse the message, or its spelling-corrected version if that is routed to a different command.
+
+        Typos in command words would otherwise leave the message unrecognised
+        ("compair", "hlep"). When the correction routes to the same command,
+        the user's own words are kept, since they become its parameters.
+        """
+        parsed = InputParser.parse_input(input_str)
+        corrected = corrector.correct(input_str)
+        if corrected != input_str:
+            corrected_parse = InputParser.parse_input(corrected)
+            if corrected_parse[0] != parsed[0]:
+                return corrected_parse
+        return parsed
+
     @staticmethod
     def contains_any(words: List[str], target_list: List[str]) -> bool:
         return any(word in target_list for word in words)
@@ -194,8 +266,8 @@ class InputParser:
 
     @staticmethod
     def matches_compare(input_str: str) -> bool:
-        return (InputParser.contains_any(input_str.split(), Constants.compare_words) and
-                "and" in input_str.lower())
+        return (InputParser.contains_any(input_str.lower().split(), Constants.compare_words) and
+                len(Constants.compare_separators.split(input_str.lower())) > 1)
 
     @staticmethod
     def matches_category(words: List[str]) -> bool:
@@ -210,21 +282,137 @@ class InputParser:
         return any(planet in words for planet in Constants.planets)
 
     @staticmethod
-    def extract_compare_topics(input_str: str) -> Optional[Tuple[str, str]]:
-        input_str = input_str.lower()
-        
-        # Find the position of "and" or similar words
-        for word in ["and", "vs", "versus"]:
-            if word in input_str:
-                parts = input_str.split(word)
-                if len(parts) == 2:
-                    topic1 = InputParser.extract_topic(parts[0])
-                    topic2 = InputParser.extract_topic(parts[1])
-                    if topic1 and topic2:
-                        return (topic1, topic2)
-        
+    def phrase_tokens(text: str) -> List[str]:
+        return [token[:-2] if token.endswith("'s") else token.strip("'")
+                for token in re.findall(r"[a-z0-9']+", text.lower())]
+
+    @classmethod
+    def phrase_index(cls) -> Dict[Tuple[str, ...], Tuple[str, str]]:
+        if cls._phrase_index is None:
+            index = {}
+            for field, phrases in Constants.attribute_synonyms.items():
+                for phrase in phrases:
+                    index.setdefault(tuple(cls.phrase_tokens(phrase)), ("attribute", field))
+            # Object names override attribute phrases ("moon" is also an object)
+            for key in DataLoader.astronomy_data():
+                index[tuple(cls.phrase_tokens(key))] = ("object", key)
+            cls._phrase_index = index
+            cls._max_phrase_length = max(len(phrase) for phrase in index)
+        return cls._phrase_index
+
+    @classmethod
+    def match_attribute_question(cls, input_str: str) -> Optional[Tuple[str, str]]:
+        """Resolve an (object, field) pair such as ('venus', 'surface_temperature')."""
+        index = cls.phrase_index()
+        tokens = cls.phrase_tokens(input_str)
+        found_object, found_field, field_rank = None, None, len(Constants.attribute_synonyms)
+
+        i = 0
+        while i < len(tokens):
+            # Longest phrase starting at this token wins
+            for length in range(min(cls._max_phrase_length, len(tokens) - i), 0, -1):
+                match = index.get(tuple(tokens[i:i + length]))
+                if match is None:
+                    continue
+                kind, value = match
+                if kind == "object" and found_object is None:
+                    found_object = value
+                elif kind == "attribute" and cls._field_ranks[value] < field_rank:
+                    found_field, field_rank = value, cls._field_ranks[value]
+                i += length - 1
+                break
+            i += 1
+
+        if found_object and found_field:
+            return found_object, found_field
+        return None
+
+    @classmethod
+    def find_object(cls, text: str) -> Optional[str]:
+        """The first catalog object named in the text, or None."""
+        index = cls.phrase_index()
+        tokens = cls.phrase_tokens(text)
+        for i in range(len(tokens)):
+            for length in range(min(cls._max_phrase_length, len(tokens) - i), 0, -1):
+                match = index.get(tuple(tokens[i:i + length]))
+                if match is not None and match[0] == "object":
+                    return match[1]
+        return None
+
+    @staticmethod
+    def matches_search(words: List[str]) -> bool:
+        if not words:
+            return False
+        return (words[0] in Constants.search_words or
+                (words[0] == "what" and InputParser.contains_any(words, Constants.search_verbs)))
+
+    @staticmethod
+    def extract_search_query(input_str: str) -> str:
+        words = input_str.lower().split()
+        if words and words[0] in ["search", "find"]:
+            words = words[1:]
+            if words and words[0] == "for":
+                words = words[1:]
+        return " ".join(words).strip(" ?!.")
+
+    @staticmethod
+    def match_history_query(input_str: str) -> Optional[str]:
+        """The topic of a question about past conversations, or None."""
+        text = " ".join(input_str.lower().split())
+        for phrase in Constants.history_phrases:
+            if text.startswith(phrase):
+                return text[len(phrase):].strip(" ?!.")
+        return None
+
+    @staticmethod
+    def match_ephemeris_query(input_str: str) -> Optional[Tuple[str, str]]:
+        """(planet, when) for a question about where a planet is relative to Earth at some date.
+
+        `when` is "now", "tomorrow", a YYYY-MM-DD date, or "closest" followed by an optional year.
+        """
+        text = input_str.lower()
+        words = re.findall(r"[a-z0-9-]+", text)
+        bodies = [word for word in words if word in ELEMENTS and word != "earth"]
+        if not bodies:
+            return None
+        year = re.search(r"\b(1[89]\d\d|2\d\d\d)\b", text)
+        if (InputParser.contains_any(words, Constants.closest_words) and
+                ("when" in words or "earth" in words or year)):
+            return bodies[0], f"closest {year.group(1)}" if year else "closest"
+        if "earth" in words and InputParser.contains_any(words, Constants.ephemeris_distance_words):
+            date = re.search(r"\b\d{4}-\d{2}-\d{2}\b", text)
+            return bodies[0], date.group(0) if date else "tomorrow" if "tomorrow" in words else "now"
         return None
 
+    @staticmethod
+    def match_visibility_query(input_str: str) -> Optional[Tuple[str, str]]:
+        """(place, night) for a question about what is in the night sky, or None.
+
+        `place` is the text naming where from ("" if none was given); `night` is
+        "tonight", "tomorrow" or a YYYY-MM-DD date.
+        """
+        text = " ".join(input_str.lower().split())
+        if not any(phrase in text for phrase in Constants.visibility_phrases):
+            return None
+        date = re.search(r"\b\d{4}-\d{2}-\d{2}\b", text)
+        night = date.group(0) if date else "tomorrow" if "tomorrow" in text else "tonight"
+        words = re.findall(r"[a-z0-9.,'-]+", text.replace(date.group(0), "") if date else text)
+        place = ""
+        for i, word in enumerate(words):
+            if word in Constants.visibility_place_words and i + 1 < len(words):
+                place = " ".join(w for w in words[i + 1:] if w not in Constants.visibility_fillers)
+        return place.strip(" ?!.,"), night
+
+    @staticmethod
+    def extract_compare_topics(input_str: str) -> List[str]:
+        """The topics of a comparison, in order: catalog keys where they name an object, else the words used."""
+        topics = []
+        for part in Constants.compare_separators.split(input_str.lower()):
+            topic = InputParser.extract_topic(part)
+            if topic:
+                topics.append(InputParser.find_object(topic) or topic.strip(" ?!."))
+        return topics
+
     @staticmethod
     def extract_topic(input_str: str) -> str:
         def remove_prefix(text: str, remaining_prefixes: List[str]) -> str:
@@ -261,7 +449,17 @@ class InputParser:
 
     @staticmethod
     def parse_regular_mode(words: List[str], original_input: str) -> Tuple[str, str, str]:
-        # First check for quiz commands
+        # Questions about past conversations may mention anything, so they go first
+        history_query = InputParser.match_history_query(original_input)
+        if history_query is not None:
+            return Constants.CMD_HISTORY, history_query, ""
+
+        # Questions about tonight's sky name places and planets, so they come before catalog lookups
+        visibility_query = InputParser.match_visibility_query(original_input)
+        if visibility_query:
+            return Constants.CMD_VISIBILITY, visibility_query[0], visibility_query[1]
+
+        # Then check for quiz commands
         if InputParser.matches_quiz(words):
             return Constants.CMD_START_QUIZ, "", ""
             
@@ -290,6 +488,26 @@ class InputParser:
                 return ""
             return Constants.CMD_LIST_CATEGORY, find_category(), ""
             
+        # Check for where a planet is relative to Earth on some date
+        ephemeris_query = InputParser.match_ephemeris_query(original_input)
+        if ephemeris_query:
+            return Constants.CMD_EPHEMERIS, ephemeris_query[0], ephemeris_query[1]
+
+        # Check for a comparison of catalog objects before questions about any one of them;
+        # an explicit "compare" is enough to report the objects that are not in the catalog
+        explicit_compare = InputParser.contains_any(words, ["compare", "vs", "versus", "difference"])
+        if InputParser.matches_compare(original_input):
+            topics = InputParser.extract_compare_topics(original_input)
+            known = sum(topic in DataLoader.astronomy_data() for topic in topics)
+            if len(topics) >= 2 and (known >= 2 or (explicit_compare and known >= 1)):
+                return Constants.CMD_COMPARE, Constants.compare_joiner.join(topics), ""
+
+        # Check for a question about a single attribute of an object
+        attribute_question = (None if explicit_compare
+                              else InputParser.match_attribute_question(original_input))
+        if attribute_question:
+            return Constants.CMD_ASK_ATTRIBUTE, attribute_question[0], attribute_question[1]
+            
         # Check for planet information request
         if InputParser.matches_planet(words):
             def find_planet() -> str:
@@ -299,14 +517,18 @@ class InputParser:
                 return ""
             return Constants.CMD_ASK_ABOUT, find_planet(), ""
             
+        # Check for full-text search over the catalog
+        if InputParser.matches_search(words):
+            return Constants.CMD_SEARCH, InputParser.extract_search_query(original_input), ""
+            
         # Check for comparison request
         if InputParser.matches_compare(original_input):
             topics = InputParser.extract_compare_topics(original_input)
-            if topics:
-                return Constants.CMD_COMPARE, topics[0], topics[1]
+            if len(topics) >= 2:
+                return Constants.CMD_COMPARE, Constants.compare_joiner.join(topics), ""
             
-        # If no other command matches, return unknown
-        return Constants.CMD_UNKNOWN, "", ""
+        # If no other command matches, return unknown with the message for small talk
+        return Constants.CMD_UNKNOWN, original_input, ""
 
 class DataLoader:
     @staticmethod
@@ -339,7 +561,8 @@ class DataLoader:
                                 objects.append(''.join(current_object))
                                 current_object = []
                 
-                return [obj.strip() for obj in objects if obj.strip()]
+                # Drop the separating comma carried over from the previous object
+                return [obj.strip().lstrip(',').strip() for obj in objects if obj.strip()]
             
             def parse_object(obj_str: str) -> Dict[str, str]:
                 clean_str = obj_str.strip().strip('{}').strip()
@@ -406,7 +629,9 @@ class DataLoader:
                         }
                         name = object_data.get('name', 'unknown').lower()
                         if name != 'unknown':
-                            data[name] = object_data
+                            # A repeated row updates the object; its blank cells keep the earlier values
+                            filled = {k: v for k, v in object_data.items() if v}
+                            data[name] = {**data.get(name, object_data), **filled}
                 except Exception as e:
                     print(f"{Colors.Red}Warning: Skipping malformed line in CSV: {line}{Colors.Reset}")
             
@@ -433,6 +658,14 @@ class DataLoader:
     # Class variables for lazy loading
     _astronomy_data = None
     _space_objects_data = None
+    _search_index = None
+    _catalog_columns = None
+    _quiz_bank = None
+    _question_banks = None
+    _small_talk = None
+    _fact_pool = None
+    _autocomplete = None
+    _spelling = None
 
     @classmethod
     def astronomy_data(cls) -> Dict[str, Dict[str, str]]:
@@ -440,14 +673,150 @@ class DataLoader:
             json_data = cls.load_astronomy_data("astronomy.json")
             csv_data = cls.load_space_objects_data("space_objects.csv")
             cls._astronomy_data = cls.merge_data(json_data, csv_data)
+            # Build the search index at load time; on reload only changed entries are re-indexed
+            if cls._search_index is None:
+                cls._search_index = InvertedIndex.from_catalog(cls._astronomy_data)
+            else:
+                cls._search_index.sync(cls._astronomy_data)
+            # Generate the catalog quiz bank up front so starting a quiz is only a draw
+            catalog_bank = MemoryBank("catalog", QuizGenerator(cls._astronomy_data).generate())
+            scored_banks = [bank for name, bank in cls.question_banks().items() if name != PERSONAL_BANK]
+            cls._quiz_bank = BankCollection(scored_banks + [catalog_bank])
+        return cls._astronomy_data
+
+    @classmethod
+    def attach_shared_catalog(cls, path: str) -> SharedCatalog:
+        """Serve the catalog from a file written by shared_catalog.publish instead of a private copy.
+
+        Indexes already built from the catalog are kept, so attach after they are loaded.
+        """
+        cls._astronomy_data = SharedCatalog(path)
+        # Read numeric columns straight from the shared file
+        cls._catalog_columns = None
         return cls._astronomy_data
 
+    @classmethod
+    def catalog_columns(cls) -> CatalogColumns:
+        if cls._catalog_columns is None:
+            cls._catalog_columns = CatalogColumns(cls.astronomy_data())
+        return cls._catalog_columns
+
     @classmethod
     def space_objects_data(cls) -> Dict[str, Dict[str, str]]:
         if cls._space_objects_data is None:
             cls._space_objects_data = cls.load_space_objects_data("space_objects.csv")
         return cls._space_objects_data 
 
+    @classmethod
+    def search_index(cls) -> InvertedIndex:
+        cls.astronomy_data()
+        return cls._search_index
+
+    @classmethod
+    def quiz_bank(cls) -> BankCollection:
+        cls.astronomy_data()
+        return cls._quiz_bank
+
+    @classmethod
+    def question_banks(cls) -> Dict[str, QuestionBank]:
+        if cls._question_banks is None:
+            try:
+                cls._question_banks = load_banks(QUESTION_BANK_DIR)
+            except Exception as e:
+                print(f"{Colors.Red}Error loading question banks: {str(e)}{Colors.Reset}")
+                cls._question_banks = {}
+        return cls._question_banks
+
+    @classmethod
+    def small_talk(cls) -> SmallTalk:
+        if cls._small_talk is None:
+            try:
+                cls._small_talk = SmallTalk.load(SMALL_TALK_FILE)
+            except Exception as e:
+                print(f"{Colors.Red}Error loading small talk: {str(e)}{Colors.Reset}")
+                cls._small_talk = SmallTalk([])
+        return cls._small_talk
+
+    @classmethod
+    def fact_pool(cls) -> FactPool:
+        if cls._fact_pool is None:
+            try:
+                cls._fact_pool = load_fact_pool(cls.astronomy_data(), FACTS_FILE)
+            except Exception as e:
+                print(f"{Colors.Red}Error loading facts: {str(e)}{Colors.Reset}")
+                cls._fact_pool = FactPool(None, [])
+        return cls._fact_pool
+
+    @classmethod
+    def autocomplete(cls) -> Autocomplete:
+        if cls._autocomplete is None:
+            priorities = Constants.suggestion_priorities
+            commands = (Constants.suggestion_phrases + Constants.help_words + Constants.fact_words +
+                        Constants.quiz_words + Constants.history_phrases + Constants.categories +
+                        [f"list {category}" for category in Constants.categories])
+            suggestions = [(phrase, priorities["command"]) for phrase in commands]
+            suggestions += [(planet.title(), priorities["planet"]) for planet in Constants.planets]
+            suggestions += [(phrase, priorities["small_talk"])
+                            for entry in cls.small_talk().entries for phrase in entry.get("phrases", [])]
+            suggestions += [(entry.get("name", key.title()), priorities["object"])
+                            for key, entry in cls.astronomy_data().items()]
+            cls._autocomplete = Autocomplete(suggestions, word_priorities={priorities["planet"], priorities["object"]})
+        return cls._autocomplete
+
+    @classmethod
+    def spelling_vocabulary(cls) -> Tuple[Dict[str, int], Set[str]]:
+        """Weighted counts of the words typos are corrected to, parser vocabularies and object names,
+        and the other words left as typed: common English, small talk and catalog descriptions."""
+        weights = Constants.spelling_weights
+        parser_phrases = (Constants.help_words + Constants.list_words + Constants.fact_words +
+                          Constants.quiz_words + Constants.compare_words + Constants.exit_words +
+                          Constants.greeting_words + Constants.search_words + Constants.search_verbs +
+                          Constants.closest_words + Constants.ephemeris_distance_words +
+                          Constants.visibility_phrases + Constants.visibility_place_words +
+                          Constants.visibility_fillers + Constants.history_phrases + Constants.planets +
+                          Constants.suggestion_phrases + Constants.categories + Constants.celestial_objects +
+                          [phrase for phrases in Constants.attribute_synonyms.values() for phrase in phrases] +
+                          list(ELEMENTS))
+        counts = count_words(parser_phrases, weights["parser"])
+        count_words(cls.astronomy_data(), weights["object"], counts)
+        known = set(count_words(phrase for entry in cls.small_talk().entries for phrase in entry.get("phrases", [])))
+        known.update(count_words(document_text(entry) for entry in cls.astronomy_data().values()))
+        try:
+            known.update(load_word_counts(ENGLISH_WORDS_FILE))
+        except Exception as e:
+            print(f"{Colors.Red}Error loading English words: {str(e)}{Colors.Reset}")
+        return counts, known
+
+    @classmethod
+    def spelling(cls) -> SpellingCorrector:
+        if cls._spelling is None:
+            counts, known = cls.spelling_vocabulary()
+            try:
+                cls._spelling = SpellingCorrector.load(counts, known)
+            except Exception as e:
+                print(f"{Colors.Red}Error loading spelling dictionary: {str(e)}{Colors.Reset}")
+                cls._spelling = SpellingCorrector(counts, known)
+        return cls._spelling
+
+    @classmethod
+    def reload(cls) -> Dict[str, Dict[str, str]]:
+        """Re-read the data files and update derived indexes incrementally."""
+        cls._astronomy_data = None
+        cls._space_objects_data = None
+        cls._catalog_columns = None
+        InputParser._phrase_index = None
+        # Pick up new or edited question banks
+        for bank in (cls._question_banks or {}).values():
+            bank.close()
+        cls._question_banks = None
+        cls._small_talk = None
+        cls._autocomplete = None
+        cls._spelling = None
+        if cls._fact_pool is not None and cls._fact_pool.corpus is not None:
+            cls._fact_pool.corpus.close()
+        cls._fact_pool = None
+        return cls.astronomy_data()
+
 class AnalyticsImpl:
     def __init__(self):
         self.command_counts = {}
@@ -483,146 +852,62 @@ class QuizManagerImpl:
         self.wrong_answers = []
         self.response_times = []
         self.start_time = None
+        self.schedulers = {}
+        self.progress_dir = PROGRESS_DIR
+
+    def scheduler(self) -> LeitnerScheduler:
+        """Spaced-repetition state for the current user, loaded on first use."""
+        if self.user_name not in self.schedulers:
+            scheduler = LeitnerScheduler(DataLoader.quiz_bank())
+            path = self.progress_path() if self.progress_dir else None
+            if path and os.path.exists(path):
+                try:
+                    with open(path, 'r') as file:
+                        scheduler.load_dict(json.load(file))
+                except Exception as e:
+                    print(f"{Colors.Red}Error loading quiz progress: {str(e)}{Colors.Reset}")
+            self.schedulers[self.user_name] = scheduler
+        return self.schedulers[self.user_name]
+
+    def progress_path(self) -> str:
+        safe_name = "".join(c if c.isalnum() else "_" for c in self.user_name.lower())
+        return os.path.join(self.progress_dir, f"{safe_name}.json")
+
+    def save_progress(self) -> None:
+        """Persist the current user's review schedule."""
+        if not self.progress_dir:
+            return
+        try:
+            os.makedirs(self.progress_dir, exist_ok=True)
+            # Written aside and renamed over, so a reader never sees half a file
+            path = self.progress_path()
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as file:
+                json.dump(self.scheduler().to_dict(), file)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"{Colors.Red}Error saving quiz progress: {str(e)}{Colors.Reset}")
+
+    def end_quiz(self) -> None:
+        self.is_quiz_active = False
+        if self.quiz_type == "traditional":
+            self.save_progress()
 
     def levenshtein_distance(self, s1: str, s2: str) -> int:
         """Calculate the Levenshtein distance between two strings."""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        return grading.levenshtein_distance(s1, s2)
 
     def string_similarity(self, s1: str, s2: str) -> float:
         """Calculate string similarity as a ratio between 0 and 1."""
-        # Clean and normalize strings
-        s1 = ''.join(c.lower() for c in s1 if c.isalnum() or c.isspace())
-        s2 = ''.join(c.lower() for c in s2 if c.isalnum() or c.isspace())
-        
-        # Handle empty strings
-        if not s1 and not s2:
-            return 1.0
-        if not s1 or not s2:
-            return 0.0
-            
-        # Calculate Levenshtein distance
-        distance = self.levenshtein_distance(s1, s2)
-        max_len = max(len(s1), len(s2))
-        
-        # Calculate similarity ratio
-        base_similarity = 1 - (distance / max_len)
-        
-        # Boost score for partial matches
-        if s1 in s2 or s2 in s1:
-            base_similarity += 0.1
-            
-        # Boost score for same first letter
-        if s1[0] == s2[0]:
-            base_similarity += 0.05
-            
-        return min(1.0, base_similarity)
+        return grading.string_similarity(s1, s2)
 
     def is_answer_similar(self, user_answer: str, correct_answer: str, threshold: float = 0.85) -> bool:
         """Check if the user's answer is similar enough to the correct answer."""
-        # Clean and normalize both answers
-        user_answer = user_answer.lower().strip()
-        correct_answer = correct_answer.lower().strip()
-        
-        # Direct match
-        if user_answer == correct_answer:
-            return True
-            
-        # Handle numeric answers with units
-        if any(c.isdigit() for c in correct_answer):
-            # Extract numbers and units
-            def extract_number_and_unit(text):
-                import re
-                number_match = re.search(r'(\d+\.?\d*)', text)
-                unit_match = re.search(r'([a-zA-Z°]+)', text)
-                number = float(number_match.group(1)) if number_match else None
-                unit = unit_match.group(1).lower() if unit_match else None
-                return number, unit
-                
-            user_num, user_unit = extract_number_and_unit(user_answer)
-            correct_num, correct_unit = extract_number_and_unit(correct_answer)
-            
-            if user_num is not None and correct_num is not None:
-                # Check if numbers are close (within 5% tolerance)
-                number_match = abs(user_num - correct_num) / correct_num < 0.05
-                # Check if units match or are compatible
-                unit_match = True
-                if user_unit and correct_unit:
-                    unit_match = self.are_units_compatible(user_unit, correct_unit)
-                return number_match and unit_match
-
-        # Handle multiple acceptable answers
-        if '/' in correct_answer:
-            return any(self.is_answer_similar(user_answer, alt.strip(), threshold) 
-                      for alt in correct_answer.split('/'))
-
-        # Split into words and check each word
-        user_words = user_answer.split()
-        correct_words = correct_answer.split()
-        
-        # Single word answers
-        if len(user_words) == 1 and len(correct_words) == 1:
-            return self.string_similarity(user_answer, correct_answer) > threshold
-        
-        # Multi-word answers
-        matches = 0
-        total_weight = 0
-        
-        # Create word pairs for comparison
-        for u_word in user_words:
-            best_match = 0
-            for c_word in correct_words:
-                similarity = self.string_similarity(u_word, c_word)
-                best_match = max(best_match, similarity)
-            matches += best_match
-            total_weight += 1
-            
-        # Calculate weighted average similarity
-        if total_weight > 0:
-            avg_similarity = matches / total_weight
-            return avg_similarity > threshold
-            
-        return False
+        return grading.is_answer_similar(user_answer, correct_answer, threshold)
 
     def are_units_compatible(self, unit1: str, unit2: str) -> bool:
         """Check if two units are compatible."""
-        # Define unit compatibility groups
-        unit_groups = {
-            'distance': {'km', 'kilometers', 'kilometer', 'kms', 'au', 'astronomical units', 'light years', 'ly'},
-            'temperature': {'c', 'celsius', '°c', 'k', 'kelvin', '°k', 'f', 'fahrenheit', '°f'},
-            'time': {'s', 'seconds', 'sec', 'min', 'minutes', 'h', 'hours', 'hr', 'hrs', 'days', 'years', 'yr', 'yrs'},
-            'mass': {'kg', 'kilograms', 'g', 'grams', 'tons', 'tonnes'},
-        }
-        
-        # Normalize units
-        unit1 = unit1.lower().strip('.')
-        unit2 = unit2.lower().strip('.')
-        
-        # Direct match
-        if unit1 == unit2:
-            return True
-            
-        # Check if units belong to the same group
-        for group in unit_groups.values():
-            if unit1 in group and unit2 in group:
-                return True
-                
-        return False
+        return grading.are_units_compatible(unit1, unit2)
 
     def get_hint(self, question: dict) -> str:
         """Generate a hint for the current question."""
@@ -669,7 +954,9 @@ class QuizManagerImpl:
         topic_mistakes = {}
         for q in self.wrong_answers:
             topic = "General"
-            if "planet" in q["question"].lower():
+            if "topic" in q:
+                topic = q["topic"]
+            elif "planet" in q["question"].lower():
                 topic = "Planets"
             elif "galaxy" in q["question"].lower():
                 topic = "Galaxies"
@@ -684,6 +971,8 @@ class QuizManagerImpl:
         suggestions = []
         if accuracy < 60:
             suggestions.append("• Review the basic astronomy concepts")
+        if self.wrong_answers:
+            suggestions.append("• Questions you missed will come back in your next quizzes for review")
         if self.hints_used > self.total_questions / 2:
             suggestions.append("• Try to answer without hints to improve retention")
         if avg_time > 30:
@@ -737,7 +1026,7 @@ Hints Used: {self.hints_used} out of {self.total_questions} questions
             
             # Handle quiz exit
             if message in ["exit", "quit", "stop"]:
-                self.is_quiz_active = False
+                self.end_quiz()
                 if self.quiz_type == "traditional":
                     return f"""Quiz ended! Final Results:
 
@@ -751,7 +1040,7 @@ Hints Used: {self.hints_used} out of {self.total_questions} questions
                     self.current_question_idx += 1
                     return self.format_current_question()
                 else:
-                    self.is_quiz_active = False
+                    self.end_quiz()
                     if self.quiz_type == "traditional":
                         return f"""Quiz completed! Final Results:
 
@@ -767,6 +1056,7 @@ Hints Used: {self.hints_used} out of {self.total_questions} questions
                     self.start_time = time.time()  # Reset for next question
                 
                 correct = self.check_answer(message)
+                self.scheduler().record(self.current_quiz[self.current_question_idx]["id"], correct, time.time())
                 if correct:
                     self.score += 1
                     response = "✨ Correct! "
@@ -784,7 +1074,7 @@ Hints Used: {self.hints_used} out of {self.total_questions} questions
                 self.current_question_idx += 1
                 return response + "\n\n" + self.format_current_question()
             else:
-                self.is_quiz_active = False
+                self.end_quiz()
                 if self.quiz_type == "traditional":
                     return response + f"""\n\nQuiz completed! Final Results:
 
@@ -796,42 +1086,11 @@ Hints Used: {self.hints_used} out of {self.total_questions} questions
 
     def check_answer(self, answer: str) -> bool:
         """Check if the answer is correct for traditional quiz."""
-        current_question = self.current_quiz[self.current_question_idx]
-        
-        # If it's a multiple choice question
-        if current_question["options"]:
-            # Try to match the answer with option number
-            try:
-                if answer.isdigit():
-                    idx = int(answer) - 1
-                    if 0 <= idx < len(current_question["options"]):
-                        answer = current_question["options"][idx]
-            except:
-                pass
-            
-            # Check against all acceptable answers
-            acceptable_answers = current_question["answer"].lower().split('/')
-            
-            # Try exact matches first
-            for acc_answer in acceptable_answers:
-                if answer.lower().strip() == acc_answer.strip():
-                    return True
-            
-            # Then try fuzzy matching with different thresholds
-            thresholds = [0.95, 0.90, 0.85]  # Try stricter thresholds first
-            for threshold in thresholds:
-                for acc_answer in acceptable_answers:
-                    if self.is_answer_similar(answer, acc_answer, threshold):
-                        return True
-            
-            # Finally, check if the answer is similar to any of the options
-            for option in current_question["options"]:
-                if self.is_answer_similar(answer, option, 0.85):
-                    # Double check if this option is a correct answer
-                    if any(self.is_answer_similar(option, acc, 0.85) for acc in acceptable_answers):
-                        return True
-        
-        return False
+        return grading.check_answer(self.current_quiz[self.current_question_idx], answer)
+
+    def grade_batch(self, question_ids: List[str], answers: List[str], backend: str = "numpy") -> List[bool]:
+        """Grade many answers against the quiz bank without touching this quiz's state."""
+        return grading.grade_batch(question_ids, answers, DataLoader.quiz_bank(), backend=backend)
 
     def format_current_question(self) -> str:
         """Format the current question with options if available."""
@@ -889,7 +1148,19 @@ Type '2' or 'personal' for Personal Quiz"""
         self.waiting_for_quiz_selection = False
         self.is_quiz_active = True
         self.quiz_type = quiz_type
-        self.current_quiz = TRADITIONAL_QUIZ if quiz_type == "traditional" else PERSONAL_QUIZ
+        if quiz_type == "traditional":
+            # Due reviews first, then questions this user hasn't seen yet
+            bank = DataLoader.quiz_bank()
+            # Generated questions share stems ("Which of these is closest to the Sun?"), so draw spares
+            # and ask each question text once; spares that are not asked stay scheduled
+            question_ids = self.scheduler().draw(TRADITIONAL_QUIZ_LENGTH * QUIZ_DRAW_FACTOR, time.time())
+            self.current_quiz, asked = [], set()
+            for question in map(bank.get, question_ids):
+                if question["question"] not in asked and len(self.current_quiz) < TRADITIONAL_QUIZ_LENGTH:
+                    asked.add(question["question"])
+                    self.current_quiz.append(question)
+        else:
+            self.current_quiz = list(DataLoader.question_banks().get(PERSONAL_BANK, []))
         self.current_question_idx = 0
         self.score = 0
         self.total_questions = len(self.current_quiz)
@@ -899,6 +1170,295 @@ Type '2' or 'personal' for Personal Quiz"""
         
         return intro + "\n\n" + self.format_current_question()
 
+class ChatSession:
+    """The conversation behind the chat window: one user's quiz, analytics and replies.
+
+    It owns no widgets, so benchmarks and tools can drive it headlessly.
+    """
+
+    def __init__(self, user_name: str = "Space Explorer", profiler: Optional[StageProfiler] = None,
+                 transcript: Optional[TranscriptLogger] = None, session_id: Optional[str] = None,
+                 archive: Optional[TranscriptArchive] = None, progress_dir: Optional[str] = PROGRESS_DIR):
+        self.quiz_manager = QuizManagerImpl()
+        self.quiz_manager.user_name = user_name
+        self.quiz_manager.progress_dir = progress_dir
+        self.analytics = AnalyticsImpl()
+        # Facts not yet shown this round, created on the first fact request
+        self.fact_bag: Optional[ShuffleBag] = None
+        self.profiler = profiler or StageProfiler()
+        self.profiler.reports["handlers"] = COMMANDS.summary
+        self.transcript = transcript
+        self.archive = archive
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        # Command and parameters the last message was handled as
+        self.last_command = Constants.CMD_UNKNOWN
+        self.last_params = ("", "")
+
+    def respond(self, message: str) -> str:
+        """Produce the reply to one user message, logging the turn if a transcript is attached."""
+        return "".join(self.respond_parts(message))
+
+    def respond_parts(self, message: str) -> Iterator[str]:
+        """The reply to one user message in parts, as soon as each is produced; the turn is logged after the last.
+
+        The logged latency is the time spent producing the parts, not the time the caller takes between them.
+        """
+        parts = []
+        start = time.perf_counter()
+        reply = self.reply(message)
+        elapsed = time.perf_counter() - start
+        if isinstance(reply, str):
+            parts.append(reply)
+            yield reply
+        else:
+            while True:
+                start = time.perf_counter()
+                part = next(reply, None)
+                elapsed += time.perf_counter() - start
+                if part is None:
+                    break
+                parts.append(part)
+                yield part
+        if self.transcript is not None:
+            self.transcript.log({
+                "time": time.time(),
+                "session": self.session_id,
+                "user": self.quiz_manager.user_name,
+                "input": message,
+                "command": self.last_command,
+                "params": list(self.last_params),
+                "response": "".join(parts),
+                "latency_ms": round(elapsed * 1000, 3),
+            })
+
+    def to_dict(self) -> Dict:
+        """Conversation state that lets another process carry on this session.
+
+        Review schedules are included, and also saved to the progress directory if there is one.
+        """
+        if self.quiz_manager.user_name in self.quiz_manager.schedulers:
+            self.quiz_manager.save_progress()
+        quiz = {k: v for k, v in vars(self.quiz_manager).items() if k not in SESSION_LOCAL_FIELDS}
+        return {
+            "session_id": self.session_id,
+            "quiz": quiz,
+            "schedules": {user: scheduler.to_dict() for user, scheduler in self.quiz_manager.schedulers.items()},
+            "analytics": vars(self.analytics).copy(),
+            "last_command": self.last_command,
+            "last_params": list(self.last_params),
+            "fact_bag": self.fact_bag.to_dict() if self.fact_bag is not None else None,
+        }
+
+    def load_dict(self, data: Dict) -> None:
+        self.session_id = data.get("session_id", self.session_id)
+        for key, value in data.get("quiz", {}).items():
+            setattr(self.quiz_manager, key, value)
+        for user, schedule in data.get("schedules", {}).items():
+            scheduler = LeitnerScheduler(DataLoader.quiz_bank())
+            scheduler.load_dict(schedule)
+            self.quiz_manager.schedulers[user] = scheduler
+        for key, value in data.get("analytics", {}).items():
+            setattr(self.analytics, key, value)
+        self.last_command = data.get("last_command", self.last_command)
+        self.last_params = tuple(data.get("last_params", self.last_params))
+        if data.get("fact_bag"):
+            self.fact_bag = ShuffleBag.from_dict(data["fact_bag"])
+
+    def reply(self, message: str) -> Reply:
+        if self.quiz_manager.is_quiz_active or self.quiz_manager.waiting_for_quiz_selection:
+            self.last_command, self.last_params = Constants.CMD_ANSWER_QUIZ, ("", "")
+            with self.profiler.stage("quiz_manager.handle_message"):
+                return self.quiz_manager.handle_message(message)
+
+        with self.profiler.stage("parse_input"):
+            command, param1, param2 = InputParser.parse_corrected(message, DataLoader.spelling())
+        self.last_command, self.last_params = command, (param1, param2)
+        self.analytics.log_interaction(command)
+        with self.profiler.stage(f"process_message:{command}"):
+            return self.process_message(command, param1, param2)
+
+    def process_message(self, command: str, param1: str, param2: str) -> Reply:
+        # If quiz is active or waiting for selection, handle through quiz manager
+        if self.quiz_manager.is_quiz_active or self.quiz_manager.waiting_for_quiz_selection:
+            return self.quiz_manager.handle_message(command)
+
+        return COMMANDS.dispatch(command, self, param1, param2)
+
+    def get_help_message(self) -> str:
+        return """I can help with:
+- Ask about planets: 'tell me about Mars'
+- Ask for details: 'how hot is Venus?', 'how many moons does Saturn have?'
+- Compare: 'compare Mars, Earth and Titan'
+- Sky: 'how far is Mars from Earth today?', 'when is Mars closest in 2027?'
+- Stargazing: 'what can I see tonight from Cairo?' (or from '30.0, 31.2')
+- Lists: 'list planets'
+- Search: 'which planet has sulfuric acid clouds'
+- History: 'what did I ask about Titan?'
+- Facts: 'random fact'
+- Quiz: 'start quiz' (choose between Traditional or Personal)
+- Theme: Click the theme button to switch between dark/light mode
+- Music: Click the music button to toggle background music
+- Profiling: '/profile on', then '/profile dump' to save timings; '/profile handlers' for per-command timings;
+  '/profile stalls' to save the event-loop stalls counted in the status bar"""
+
+    def get_random_fact(self) -> str:
+        """A fact this session has not seen yet, until it has seen them all."""
+        pool = DataLoader.fact_pool()
+        if not len(pool):
+            return "I'm out of facts right now. Try asking me about a planet instead!"
+        # A reloaded pool invalidates the indexes drawn so far
+        if self.fact_bag is None or self.fact_bag.size != len(pool):
+            self.fact_bag = ShuffleBag(len(pool))
+        return pool[self.fact_bag.draw()]
+
+    def get_attribute_answer(self, key: str, field: str) -> str:
+        entry = DataLoader.astronomy_data().get(key, {})
+        name = entry.get("name", key.title())
+
+        for candidate in [field] + Constants.attribute_fallbacks.get(field, []):
+            value = entry.get(candidate)
+            if value and value != "N/A":
+                label = Constants.attribute_labels.get(candidate, candidate.replace("_", " "))
+                return f"{name} {label}: {value}"
+
+        label = Constants.attribute_labels.get(field, field.replace("_", " "))
+        return f"Sorry, I don't have the {label.split(' ', 1)[-1]} of {name} in my catalog."
+
+    def search_catalog(self, query: str) -> str:
+        if not query:
+            return "What should I look for? Try 'which planet has sulfuric acid clouds'."
+
+        catalog = DataLoader.astronomy_data()
+        results = DataLoader.search_index().search(query, limit=3)
+        if not results:
+            return f"I couldn't find anything in my catalog matching '{query}'. Try different words!"
+
+        lines = [f"🔭 Best matches for '{query}':\n"]
+        for rank, (key, _) in enumerate(results, 1):
+            entry = catalog[key]
+            lines.append(f"{rank}. {entry.get('name', key.title())} ({entry.get('type', 'object')})")
+            lines.append(f"   {best_snippet(entry, query)}")
+        return "\n".join(lines)
+
+    def search_history(self, query: str) -> str:
+        if not query:
+            return "What should I look for? Try 'what did I ask about Titan?'"
+        if self.archive is None:
+            return "I'm not keeping a history of our chats right now."
+
+        user = self.quiz_manager.user_name
+        # Search the archive along with the file being written; closed files reach the archive
+        # from the transcript writer thread, so nothing is compressed on the caller's thread
+        live_path = self.transcript.path if self.transcript else None
+        results = search_file(live_path, query, user, HISTORY_RESULTS * 2) + \
+            self.archive.search(query, user=user, limit=HISTORY_RESULTS * 2)
+        # Earlier history questions mention the topic too, but are not what the user means
+        results = [r for r in results if r.get("command") != Constants.CMD_HISTORY][:HISTORY_RESULTS]
+        if not results:
+            return f"I couldn't find anything you asked about '{query}'."
+
+        lines = [f"🕘 Your most recent questions about '{query}':\n"]
+        lines.extend(iter_format(results))
+        return "\n".join(lines)
+
+    def compare_objects(self, names: List[str]) -> Iterator[str]:
+        """Compare any number of catalog objects field by field, with bars, rankings and ratios.
+
+        The comparison is yielded a section at a time, so the start of it can be shown while the rest is built.
+        """
+        catalog = DataLoader.astronomy_data()
+        keys, unknown = [], []
+        for name in names:
+            key = name if name in catalog else InputParser.find_object(name)
+            if key is None:
+                unknown.append(name)
+            elif key not in keys:
+                keys.append(key)
+        if unknown:
+            yield (f"I don't have information about {', '.join(unknown)}. "
+                   f"Try comparing objects from the catalog, like 'compare Mars, Earth and Titan'.")
+            return
+        if len(keys) < 2:
+            yield "Name at least two different objects to compare, like 'compare Earth and Mars'."
+            return
+
+        entries = [catalog[key] for key in keys]
+        display = [entry.get("name", key.title()) for key, entry in zip(keys, entries)]
+        yield f"🌟 Comparing {', '.join(display[:-1])} and {display[-1]} 🌟\n"
+
+        result = DataLoader.catalog_columns().compare(keys)
+        ratios = []
+        for column, field in enumerate(result.fields):
+            if result.counts[column] < 2:
+                continue
+            label = Constants.attribute_labels.get(field, field.replace("_", " "))
+            section = f"\n{label[0].upper() + label[1:]}:\n"
+            # Largest first; objects without a value are left out
+            order = sorted(range(len(keys)), key=lambda r: result.ranks[r, column])[:result.counts[column]]
+            for row in order:
+                bar = "█" * result.bars[row, column] + "░" * (BAR_WIDTH - result.bars[row, column])
+                section += f"{display[row]}: {bar} {entries[row][field]}\n"
+            yield section
+            if field in RATIO_FIELDS and result.ratios[column] >= 1.05:
+                ratio = result.ratios[column]
+                times = f"{ratio:.1f}x" if ratio < 100 else f"{ratio:,.0f}x"
+                ratios.append(f"• {display[order[0]]}'s {field.replace('_', ' ')} is {times} {display[order[-1]]}'s")
+
+        if len(keys) == 2 and all(key in ELEMENTS for key in keys):
+            now = julian_day(datetime.datetime.now(datetime.timezone.utc))
+            apart = describe_distance(float(distance_au(keys[0], keys[1], now)))
+            ratios.append(f"• Right now {display[0]} and {display[1]} are {apart['km'] / 1e6:,.0f} million km apart")
+
+        if ratios:
+            yield "\n🔍 Interesting Comparisons:\n" + "\n".join(ratios) + "\n"
+
+        features = []
+        for name, entry in zip(display, entries):
+            feature = entry.get("notable_features")
+            if not feature or feature == "N/A":
+                feature = entry.get("description")
+            if feature:
+                features.append(f"• {name}: {feature}")
+        if features:
+            yield "\n🌟 Notable Features:\n" + "\n".join(features) + "\n"
+
+    def handle_casual_interaction(self, message: str) -> Optional[str]:
+        """Reply from the small-talk table, or None if the message is not small talk."""
+        entry = DataLoader.small_talk().match(message)
+        if entry is None:
+            return None
+        if entry.get("command") == Constants.CMD_HELP:
+            return self.get_help_message()
+        return random.choice(entry["responses"]).replace("{user}", self.quiz_manager.user_name)
+
+
+def handle_unknown(session: ChatSession, message: str, param2: str) -> str:
+    return (session.handle_casual_interaction(message)
+            or "I'm not sure what you mean. Type 'help' to see what I can do!")
+
+
+# Handlers are ChatSession methods, or "module:function" names imported the first time the command is used
+COMMANDS = CommandRegistry(fallback=handle_unknown)
+for command, handler in {
+    Constants.CMD_UNKNOWN: handle_unknown,
+    Constants.CMD_HELP: lambda session, param1, param2: session.get_help_message(),
+    Constants.CMD_GREETINGS: lambda session, param1, param2: (
+        f"Hello {session.quiz_manager.user_name}! How can I help you today?"),
+    Constants.CMD_RANDOM_FACT: lambda session, param1, param2: session.get_random_fact(),
+    Constants.CMD_START_QUIZ: lambda session, param1, param2: session.quiz_manager.start_quiz_selection(),
+    Constants.CMD_COMPARE: lambda session, param1, param2: session.compare_objects(
+        param1.split(Constants.compare_joiner)),
+    Constants.CMD_SEARCH: lambda session, param1, param2: session.search_catalog(param1),
+    Constants.CMD_ASK_ATTRIBUTE: lambda session, param1, param2: session.get_attribute_answer(param1, param2),
+    Constants.CMD_HISTORY: lambda session, param1, param2: session.search_history(param1),
+    Constants.CMD_LIST_PLANETS: "planet_info:handle_list_planets",
+    Constants.CMD_ASK_ABOUT: "planet_info:handle_ask_about",
+    Constants.CMD_EPHEMERIS: "sky:handle_ephemeris",
+    Constants.CMD_VISIBILITY: "sky:handle_visibility",
+}.items():
+    COMMANDS.register(command, handler)
+
+
 class WelcomePage(ctk.CTkToplevel):
     def __init__(self, parent, proceed_callback):
         super().__init__(parent)
@@ -989,10 +1549,20 @@ class AstronomyChatbotGUI(ctk.CTk):
         super().__init__()
         
         # Initialize components
-        self.quiz_manager = QuizManagerImpl()
-        self.analytics = AnalyticsImpl()
+        self.profiler = StageProfiler()
+        # Finished transcript files are compressed into the searchable archive as they rotate;
+        # files left by earlier runs are archived in the background
+        archive = TranscriptArchive()
+        threading.Thread(target=archive.ingest, name="transcript-ingest", daemon=True).start()
+        self.session = ChatSession(profiler=self.profiler, archive=archive,
+                                   transcript=TranscriptLogger(on_rotate=archive.add_file))
         self.current_theme = "dark"
         self.music_playing = False
+        self.image_cache = ImageCache()
+        self.polling_images = False
+        # Event-loop lag, shown in the status bar; '/profile stalls' exports the stalls recorded
+        self.stall_monitor = StallMonitor(self, on_stall=lambda stall: self.update_status())
+        self.profiler.reports["stalls"] = self.stall_monitor.export
         
         # Configure window
         self.title("CHATURN - Astronomy Chatbot")
@@ -1008,7 +1578,7 @@ class AstronomyChatbotGUI(ctk.CTk):
     
     def set_user_name(self, name: str):
         """Set the user name and update the window title."""
-        self.quiz_manager.user_name = name  # Set the name in quiz manager
+        self.session.quiz_manager.user_name = name  # Set the name in quiz manager
         self.title(f"CHATURN - Welcome, {name}!")  # Update window title
     
     def after_welcome(self, name: str):
@@ -1016,6 +1586,10 @@ class AstronomyChatbotGUI(ctk.CTk):
         self.deiconify()  # Show main window
         self.create_gui()
         self.setup_music()
+        self.stall_monitor.start()
+        # Build or load the spelling dictionary now rather than on the first message
+        with self.stall_monitor.activity("loading spelling dictionary"):
+            DataLoader.spelling()
         
         # Add initial bot message
         welcome_msg = (
@@ -1046,7 +1620,8 @@ class AstronomyChatbotGUI(ctk.CTk):
     
     def toggle_theme(self):
         self.current_theme = "light" if self.current_theme == "dark" else "dark"
-        self.apply_theme()
+        with self.stall_monitor.activity("apply_theme"):
+            self.apply_theme()
     
     def apply_theme(self):
         theme = THEMES[self.current_theme]
@@ -1057,7 +1632,8 @@ class AstronomyChatbotGUI(ctk.CTk):
         # Update all message frames
         for child in self.chat_frame.winfo_children():
             if isinstance(child, ctk.CTkFrame):
-                if "👤" in child.winfo_children()[-1]._text:  # User message
+                # A user message ends with its icon; a bot message ends with its column of text
+                if "👤" in getattr(child.winfo_children()[-1], "_text", ""):  # User message
                     child.configure(fg_color=theme["accent_color"])
                 else:  # Bot message
                     child.configure(fg_color=theme["frame_color"])
@@ -1081,8 +1657,9 @@ class AstronomyChatbotGUI(ctk.CTk):
         # Create suggestion buttons
         self.create_suggestion_buttons()
         
-        # Create input area
+        # Create input area, with autocomplete suggestions above it while typing
         self.create_input_area()
+        self.create_autocomplete_row()
         
         # Create status bar
         self.create_status_bar()
@@ -1166,6 +1743,7 @@ class AstronomyChatbotGUI(ctk.CTk):
     def create_input_area(self):
         input_frame = ctk.CTkFrame(self.main_container)
         input_frame.pack(fill="x", padx=10, pady=(0, 10))
+        self.input_frame = input_frame
         
         # Create input field with placeholder and styling
         self.input_field = ctk.CTkEntry(
@@ -1190,6 +1768,60 @@ class AstronomyChatbotGUI(ctk.CTk):
         
         # Bind Enter key to send message
         self.input_field.bind("<Return>", lambda e: self.send_message())
+        # Suggest completions as the user types; Tab takes the first one
+        self.input_field.bind("<KeyRelease>", self.update_autocomplete)
+        self.input_field.bind("<Tab>", lambda e: self.accept_suggestion())
+
+    def create_autocomplete_row(self):
+        self.autocomplete_row = ctk.CTkFrame(self.main_container, fg_color="transparent")
+        self.autocomplete_shown = False
+        self.autocomplete_buttons = []
+        for _ in range(MAX_SUGGESTIONS):
+            btn = ctk.CTkButton(
+                self.autocomplete_row,
+                text="",
+                height=24,
+                corner_radius=12,
+                fg_color="transparent",
+                border_width=1
+            )
+            btn.configure(command=lambda b=btn: self.use_suggestion(b.cget("text")))
+            self.autocomplete_buttons.append(btn)
+
+    def update_autocomplete(self, event=None):
+        """Show completions of the input; one trie lookup per keystroke."""
+        if event is not None and event.keysym in ("Return", "Tab", "Up", "Down", "Left", "Right"):
+            return
+        quiz = self.session.quiz_manager
+        suggestions = []
+        if not (quiz.is_quiz_active or quiz.waiting_for_quiz_selection):
+            with self.stall_monitor.activity("autocomplete"):
+                suggestions = DataLoader.autocomplete().suggest(self.input_field.get())
+
+        for i, btn in enumerate(self.autocomplete_buttons):
+            if i < len(suggestions):
+                btn.configure(text=suggestions[i])
+                btn.pack(side="left", padx=5)
+            else:
+                btn.pack_forget()
+        if suggestions and not self.autocomplete_shown:
+            self.autocomplete_row.pack(fill="x", padx=10, pady=(0, 5), before=self.input_frame)
+        elif not suggestions and self.autocomplete_shown:
+            self.autocomplete_row.pack_forget()
+        self.autocomplete_shown = bool(suggestions)
+
+    def accept_suggestion(self):
+        if self.autocomplete_shown:
+            self.use_suggestion(self.autocomplete_buttons[0].cget("text"))
+        # Keep Tab from moving the focus out of the input field
+        return "break"
+
+    def use_suggestion(self, text: str):
+        self.input_field.delete(0, "end")
+        self.input_field.insert(0, text + " ")
+        self.input_field.focus_set()
+        self.input_field.icursor("end")
+        self.update_autocomplete()
     
     def create_status_bar(self):
         status_bar = ctk.CTkFrame(self.main_container, height=25, fg_color="transparent")
@@ -1198,10 +1830,24 @@ class AstronomyChatbotGUI(ctk.CTk):
         # Show total interactions
         self.status_label = ctk.CTkLabel(
             status_bar,
-            text=f"Total Interactions: {self.analytics.get_total_interactions()}",
+            text=f"Total Interactions: {self.session.analytics.get_total_interactions()}",
             font=("Helvetica", 10)
         )
         self.status_label.pack(side="left")
+
+        # Event-loop stalls next to it
+        self.stall_label = ctk.CTkLabel(
+            status_bar,
+            text=self.stall_monitor.status(),
+            font=("Helvetica", 10)
+        )
+        self.stall_label.pack(side="left", padx=(20, 0))
+
+    def update_status(self):
+        self.status_label.configure(
+            text=f"Total Interactions: {self.session.analytics.get_total_interactions()}"
+        )
+        self.stall_label.configure(text=self.stall_monitor.status())
     
     def quick_action(self, command: str):
         """Handle quick action button clicks"""
@@ -1209,7 +1855,15 @@ class AstronomyChatbotGUI(ctk.CTk):
         self.input_field.insert(0, command)
         self.send_message()
     
-    def add_bot_message(self, message: str):
+    def add_bot_message(self, message: Reply, objects: List[str] = ()):
+        """Show a bot message a few lines at a time, with thumbnails of the catalog objects it is about.
+
+        Only the first chunk is laid out now; the rest follow in after()
+        callbacks, so a long reply starts appearing within a frame and the
+        window stays responsive. A reply given in parts is only produced as
+        fast as it is shown. Thumbnails not cached yet fill in when their
+        background decode finishes.
+        """
         # Create message container
         msg_frame = ctk.CTkFrame(
             self.chat_frame,
@@ -1226,19 +1880,82 @@ class AstronomyChatbotGUI(ctk.CTk):
         )
         icon.pack(side="left", padx=5, pady=5)
         
-        # Message text
+        # Message text, one label per chunk stacked in a column
+        column = ctk.CTkFrame(msg_frame, fg_color="transparent")
+        column.pack(side="left", pady=10, padx=5, fill="x", expand=True)
+        self.add_thumbnails(column, objects)
+        parts = iter([message]) if isinstance(message, str) else iter(message)
+        # Later chunks run from after() callbacks, outside the caller's activity(), so they carry it along
+        activity = self.stall_monitor.activity_label
+        self.render_chunk(column, parts, "", "add_bot_message" if activity == IDLE else activity)
+
+    def render_chunk(self, column: ctk.CTkFrame, parts: Iterator[str], pending: str, activity: str):
+        """Lay out the next chunk of a bot message and schedule the one after it."""
+        with self.stall_monitor.activity(activity):
+            self._render_chunk(column, parts, pending, activity)
+
+    def _render_chunk(self, column: ctk.CTkFrame, parts: Iterator[str], pending: str, activity: str):
+        lines_per_chunk = ANIMATIONS["render_chunk_lines"]
+        exhausted = False
+        while pending.count("\n") < lines_per_chunk:
+            part = next(parts, None)
+            if part is None:
+                exhausted = True
+                break
+            pending += part
+        if exhausted and not pending:
+            return
+
+        lines = pending.split("\n")
+        chunk, rest = "\n".join(lines[:lines_per_chunk]), "\n".join(lines[lines_per_chunk:])
         label = ctk.CTkLabel(
-            msg_frame,
-            text=message,
+            column,
+            text=chunk,
             wraplength=600,
             justify="left",
+            anchor="w",
             font=("Helvetica", 12)
         )
-        label.pack(side="left", pady=10, padx=5, fill="x", expand=True)
+        label.pack(anchor="w", fill="x")
         
         # Scroll to bottom
         self.chat_frame._parent_canvas.yview_moveto(1.0)
+
+        if rest or not exhausted:
+            self.after(ANIMATIONS["render_chunk_delay"], self.render_chunk, column, parts, rest, activity)
     
+    def add_thumbnails(self, column: ctk.CTkFrame, objects: List[str]):
+        keys = [key for key in objects if self.image_cache.has_image(key)]
+        if keys:
+            row = ctk.CTkFrame(column, fg_color="transparent")
+            row.pack(anchor="w", pady=(0, 5))
+            for key in keys:
+                thumbnail = ctk.CTkLabel(row, text="", width=self.image_cache.size, height=self.image_cache.size)
+                thumbnail.pack(side="left", padx=(0, 5))
+                self.image_cache.request(key, lambda image, label=thumbnail: label.configure(image=image))
+            if self.image_cache.waiting and not self.polling_images:
+                self.polling_images = True
+                self.after(ANIMATIONS["image_poll_delay"], self.poll_images)
+        self.image_cache.prewarm(self.likely_next_objects(objects))
+
+    def poll_images(self):
+        """Hand thumbnails decoded in the background to the labels waiting for them."""
+        if self.image_cache.drain():
+            self.after(ANIMATIONS["image_poll_delay"], self.poll_images)
+        else:
+            self.polling_images = False
+
+    @staticmethod
+    def likely_next_objects(objects: List[str]) -> List[str]:
+        """Objects worth decoding ahead: the planets either side of those shown, and Earth to compare with."""
+        from_sun = list(ELEMENTS)
+        likely = []
+        for key in objects:
+            if key in from_sun:
+                i = from_sun.index(key)
+                likely.extend(from_sun[max(i - 1, 0):i + 2])
+        return [key for key in dict.fromkeys(likely + (["earth"] if objects else [])) if key not in objects]
+
     def add_user_message(self, message: str):
         # Create message container
         msg_frame = ctk.CTkFrame(
@@ -1272,360 +1989,41 @@ class AstronomyChatbotGUI(ctk.CTk):
     def send_message(self):
         message = self.input_field.get().strip()
         if message:
-            self.add_user_message(message)
-            self.input_field.delete(0, "end")
-            
-            # Process message
-            if self.quiz_manager.is_quiz_active or self.quiz_manager.waiting_for_quiz_selection:
-                response = self.quiz_manager.handle_message(message)
-            else:
-                command, param1, param2 = InputParser.parse_input(message)
-                self.analytics.log_interaction(command)
-                response = self.process_message(command, param1, param2)
-            
-            self.add_bot_message(response)
-            
-            # Update status bar
-            self.status_label.configure(
-                text=f"Total Interactions: {self.analytics.get_total_interactions()}"
-            )
-    
-    def process_message(self, command: str, param1: str, param2: str) -> str:
-        # If quiz is active or waiting for selection, handle through quiz manager
-        if self.quiz_manager.is_quiz_active or self.quiz_manager.waiting_for_quiz_selection:
-            return self.quiz_manager.handle_message(command)
-            
-        # Check for casual interactions
-        if command == Constants.CMD_UNKNOWN:
-            casual_response = self.handle_casual_interaction(param1)
-            if casual_response:
-                return casual_response
+            # Profiler commands work in any mode and are not profiled themselves
+            if message.lower().split()[0] == "/profile":
+                self.add_user_message(message)
+                self.input_field.delete(0, "end")
+                self.add_bot_message(self.profiler.handle_command(message))
+                return
+
+            with self.profiler.message(), self.stall_monitor.activity(f"send_message: {message}"):
+                with self.profiler.stage("add_user_message"):
+                    self.add_user_message(message)
+                self.input_field.delete(0, "end")
+
+                # Process message up to the first part of the reply; the rest is produced as it is shown
+                parts = self.session.respond_parts(message)
+                first = next(parts, "")
+
+                with self.profiler.stage("add_bot_message"), \
+                        self.stall_monitor.activity(f"{self.session.last_command}: {message}"):
+                    self.add_bot_message(itertools.chain([first], parts), self.card_objects())
             
-        if command == Constants.CMD_HELP:
-            return self.get_help_message()
-        elif command == Constants.CMD_RANDOM_FACT:
-            return self.get_random_fact()
-        elif command == Constants.CMD_LIST_PLANETS:
-            return self.list_planets()
-        elif command == Constants.CMD_ASK_ABOUT:
-            return self.get_planet_info(param1)
-        elif command == Constants.CMD_START_QUIZ:
-            return self.quiz_manager.start_quiz_selection()
-        elif command == Constants.CMD_COMPARE:
-            return self.compare_planets(param1, param2)
-        elif command == Constants.CMD_GREETINGS:
-            return f"Hello {self.quiz_manager.user_name}! How can I help you today?"
-        else:
-            return "I'm not sure what you mean. Type 'help' to see what I can do!"
-
-    def get_help_message(self) -> str:
-        return """I can help with:
-- Ask about planets: 'tell me about Mars'
-- Compare: 'compare Earth and Mars'
-- Lists: 'list planets'
-- Facts: 'random fact'
-- Quiz: 'start quiz' (choose between Traditional or Personal)
-- Theme: Click the theme button to switch between dark/light mode
-- Music: Click the music button to toggle background music"""
-
-    def get_random_fact(self) -> str:
-        facts = [
-            "A day on Venus is longer than its year! It takes Venus 243 Earth days to rotate on its axis but only 225 Earth days to orbit the Sun.",
-            "The largest known star, UY Scuti, is so big that it would take 1,700 years for a passenger jet to fly around it!",
-            "There's a planet made of diamonds twice the size of Earth. The 'super-Earth' is called 55 Cancri e.",
-            "The footprints left by Apollo astronauts on the Moon will last for at least 100 million years.",
-            "If you could put Saturn in a giant bathtub, it would float! The planet's density is less than that of water.",
-            "The Sun loses 4 million tons of mass every second due to fusion reactions.",
-            "A neutron star can spin up to 600 times per second!",
-            "The largest known asteroid, Ceres, is so big it's classified as a dwarf planet.",
-            "Jupiter's Great Red Spot is shrinking, but it's still big enough to fit 2-3 Earths inside it.",
-            "There are more trees on Earth than stars in the Milky Way galaxy."
-        ]
-        return random.choice(facts)
-
-    def list_planets(self) -> str:
-        planets_info = """Here are the planets in our Solar System:
-
-1. Mercury 🌑 - The smallest and innermost planet
-2. Venus 🌕 - Earth's "sister" planet
-3. Earth 🌍 - Our home planet
-4. Mars 🔴 - The Red Planet
-5. Jupiter ⭐ - The largest planet
-6. Saturn 💫 - The ringed planet
-7. Uranus 🌌 - The sideways planet
-8. Neptune 💨 - The windiest planet
-
-Bonus: Pluto ❄️ - A dwarf planet (formerly the 9th planet)"""
-        return planets_info
-
-    def compare_planets(self, planet1: str, planet2: str) -> str:
-        if planet1.lower() not in Constants.planets or planet2.lower() not in Constants.planets:
-            return f"Sorry, I can only compare planets in our solar system. Type 'list planets' to see available planets."
-
-        # Get detailed information for both planets
-        info1 = self.get_planet_info(planet1)
-        info2 = self.get_planet_info(planet2)
-
-        # Create a visually appealing comparison
-        comparison = f"""🌟 Comparing {planet1.title()} and {planet2.title()} 🌟
-
-{planet1.title()}:
-{info1}
-
-{planet2.title()}:
-{info2}
-
-Key Differences:
-"""
-        # Add a visual comparison of key features
-        def create_comparison_bar(val1, val2, max_val, label):
-            bar1 = int((val1 / max_val) * 10)
-            bar2 = int((val2 / max_val) * 10)
-            bar1_str = "█" * bar1 + "░" * (10 - bar1)
-            bar2_str = "█" * bar2 + "░" * (10 - bar2)
-            return f"{label}:\n{planet1.title()}: {bar1_str}\n{planet2.title()}: {bar2_str}\n"
-
-        # Add size comparison
-        sizes = {
-            "mercury": 4879,
-            "venus": 12104,
-            "earth": 12742,
-            "mars": 6779,
-            "jupiter": 139820,
-            "saturn": 116460,
-            "uranus": 50724,
-            "neptune": 49244,
-            "pluto": 2377
-        }
-        max_size = max(sizes.values())
-        comparison += create_comparison_bar(sizes[planet1.lower()], sizes[planet2.lower()], max_size, "Relative Size")
-
-        # Add distance comparison
-        distances = {
-            "mercury": 57.9,
-            "venus": 108.2,
-            "earth": 149.6,
-            "mars": 227.9,
-            "jupiter": 778.5,
-            "saturn": 1429.4,
-            "uranus": 2871.0,
-            "neptune": 4495.1,
-            "pluto": 5906.4
-        }
-        max_distance = max(distances.values())
-        comparison += create_comparison_bar(distances[planet1.lower()], distances[planet2.lower()], max_distance, "Distance from Sun")
+            # Rank what was just used higher next time, and clear the suggestions for the empty input
+            DataLoader.autocomplete().record(message)
+            self.update_autocomplete()
 
-        # Add interesting comparison facts
-        comparison += "\n🔍 Interesting Comparisons:\n"
-        
-        # Size comparison
-        size_ratio = sizes[planet1.lower()] / sizes[planet2.lower()]
-        if size_ratio > 1:
-            comparison += f"• {planet1.title()} is {size_ratio:.1f}x larger than {planet2.title()}\n"
-        else:
-            comparison += f"• {planet2.title()} is {(1/size_ratio):.1f}x larger than {planet1.title()}\n"
-        
-        # Distance comparison
-        dist_diff = abs(distances[planet1.lower()] - distances[planet2.lower()])
-        comparison += f"• These planets are {dist_diff:.1f} million km apart in their orbits\n"
-        
-        # Add unique features
-        unique_features = {
-            "mercury": "the closest planet to the Sun",
-            "venus": "the hottest planet",
-            "earth": "the only known planet with life",
-            "mars": "known as the Red Planet",
-            "jupiter": "the largest planet",
-            "saturn": "famous for its ring system",
-            "uranus": "rotates on its side",
-            "neptune": "has the strongest winds",
-            "pluto": "a dwarf planet since 2006"
-        }
-        comparison += f"\n🌟 Notable Features:\n"
-        comparison += f"• {planet1.title()} is {unique_features[planet1.lower()]}\n"
-        comparison += f"• {planet2.title()} is {unique_features[planet2.lower()]}\n"
-
-        return comparison
-
-    def get_planet_info(self, planet: str) -> str:
-        planet_info = {
-            "mercury": {
-                "description": "The smallest and innermost planet in the Solar System. It's a rocky world with a heavily cratered surface.",
-                "distance": "57.9 million km from the Sun",
-                "interesting_facts": [
-                    "Despite being closest to the Sun, Mercury is not the hottest planet - Venus is!",
-                    "Mercury has no moons and no substantial atmosphere.",
-                    "A year on Mercury is just 88 Earth days long.",
-                    "Mercury's surface temperature varies from -180°C to 430°C."
-                ]
-            },
-            "venus": {
-                "description": "Often called Earth's sister planet due to similar size. It has a thick atmosphere causing a runaway greenhouse effect.",
-                "distance": "108.2 million km from the Sun",
-                "interesting_facts": [
-                    "Venus rotates backwards compared to most other planets!",
-                    "It's the hottest planet in our solar system with an average temperature of 462°C.",
-                    "A day on Venus is longer than its year.",
-                    "Venus has no moons and a very thick atmosphere of mostly carbon dioxide."
-                ]
-            },
-            "earth": {
-                "description": "Our home planet and the only known world to harbor life. It has one natural satellite - the Moon.",
-                "distance": "149.6 million km from the Sun",
-                "interesting_facts": [
-                    "Earth is the only planet not named after a god or goddess!",
-                    "It's the only planet known to have liquid water on its surface.",
-                    "Earth's atmosphere is 78% nitrogen and 21% oxygen.",
-                    "The Earth's core is as hot as the surface of the Sun."
-                ]
-            },
-            "mars": {
-                "description": "Known as the Red Planet due to iron oxide (rust) on its surface. It has two small moons - Phobos and Deimos.",
-                "distance": "227.9 million km from the Sun",
-                "interesting_facts": [
-                    "Mars has the largest volcano in the solar system - Olympus Mons!",
-                    "Mars experiences massive dust storms that can last for months.",
-                    "The soil contains the nutrients needed to grow plants.",
-                    "Mars' day is only slightly longer than Earth's at 24 hours and 37 minutes."
-                ]
-            },
-            "jupiter": {
-                "description": "The largest planet in our Solar System. It's a gas giant with a Great Red Spot and many moons.",
-                "distance": "778.5 million km from the Sun",
-                "interesting_facts": [
-                    "Jupiter's Great Red Spot has been raging for at least 400 years!",
-                    "It has at least 79 moons.",
-                    "Jupiter's magnetic field is the strongest of all planets.",
-                    "A day on Jupiter is only 10 hours long."
-                ]
-            },
-            "saturn": {
-                "description": "Famous for its beautiful ring system. It's another gas giant with many fascinating moons.",
-                "distance": "1.4 billion km from the Sun",
-                "interesting_facts": [
-                    "Saturn's rings are mostly made of ice and rock, some pieces as small as a grain of sand!",
-                    "It has at least 82 moons, including Titan, which has a thick atmosphere.",
-                    "Saturn could float in water because it's less dense than water.",
-                    "The winds on Saturn can reach speeds of 1,800 km/h."
-                ]
-            },
-            "uranus": {
-                "description": "An ice giant that rotates on its side. It has a blue-green color due to methane in its atmosphere.",
-                "distance": "2.9 billion km from the Sun",
-                "interesting_facts": [
-                    "Uranus rotates on its side, likely due to a massive impact!",
-                    "It has 27 known moons, all named after literary characters.",
-                    "Uranus was the first planet discovered using a telescope.",
-                    "It has the coldest planetary atmosphere in the solar system."
-                ]
-            },
-            "neptune": {
-                "description": "The windiest planet, with speeds up to 2,100 km/h. It's the last of the ice giants.",
-                "distance": "4.5 billion km from the Sun",
-                "interesting_facts": [
-                    "Neptune has only completed one orbit around the Sun since its discovery in 1846!",
-                    "It has 14 known moons.",
-                    "Neptune's winds are the fastest in the solar system.",
-                    "It was discovered through mathematical predictions before it was seen."
-                ]
-            },
-            "pluto": {
-                "description": "A dwarf planet in the Kuiper Belt. It was once considered the ninth planet.",
-                "distance": "5.9 billion km from the Sun (average)",
-                "interesting_facts": [
-                    "Pluto is smaller than Earth's moon!",
-                    "It has 5 known moons, with Charon being the largest.",
-                    "Pluto's orbit is tilted and elongated compared to the planets.",
-                    "It was reclassified as a dwarf planet in 2006."
-                ]
-            }
-        }
-
-        if planet.lower() in planet_info:
-            info = planet_info[planet.lower()]
-            facts = "\n".join([f"• {fact}" for fact in info["interesting_facts"]])
-            return f"""🌎 {planet.title()}:
-
-{info['description']}
-📏 Distance: {info['distance']}
-
-🌟 Interesting Facts:
-{facts}"""
-        else:
-            return f"I don't have information about {planet}. Try asking about one of the planets in our solar system!"
-
-    def handle_casual_interaction(self, message: str) -> str:
-        """Handle casual interactions and provide human-like responses."""
-        message = message.lower().strip()
-        
-        # Love and appreciation responses
-        if message in ["i love you", "love you"]:
-            return "That's sweet! I love astronomy, and I'm here to share that passion with you! 💫"
-            
-        # Well-being inquiries
-        elif message in ["how are you", "how are you doing", "how are you today"]:
-            return "I'm functioning perfectly and excited to explore the cosmos with you! How can I help? 🌟"
-            
-        # Location inquiries
-        elif message in ["where are you", "where are you from"]:
-            return "I exist in the digital cosmos, ready to help you explore the real one! 🌌"
-            
-        # Identity inquiries
-        elif message in ["what is your name", "who are you"]:
-            return "I'm CHATURN, your friendly astronomy chatbot! I'm here to help you learn about space. 🤖"
-            
-        # Capability inquiries
-        elif message in ["what can you do", "what do you do"]:
-            return self.get_help_message()
-            
-        # Jokes
-        elif message in ["tell me a joke", "joke"]:
-            jokes = [
-                "Why did the astronaut break up with the star? Because she needed some space! 🌠",
-                "What kind of songs do planets sing? Nep-tunes! 🎵",
-                "Why did Mars break up with Saturn? Because it had too many rings! 💍",
-                "What do you call a star that doesn't shower? A smelly dwarf! ⭐",
-                "Why did the sun go to school? To get brighter! ☀️",
-                "What did the alien say to the garden? Take me to your weeder! 👽",
-                "Why don't aliens eat clowns? Because they taste funny! 🤡",
-                "What did the meteorite say to Earth? I'm falling for you! 💫"
-            ]
-            return random.choice(jokes)
-            
-        # Greetings
-        elif message in ["good morning"]:
-            return "Good morning! The stars may have faded, but space is still fascinating! 🌅"
-        elif message in ["good night"]:
-            return "Good night! Perfect time for stargazing! 🌙✨"
-            
-        # Gratitude
-        elif message in ["thank you", "thanks"]:
-            return "You're welcome! Feel free to ask more about astronomy! 🚀"
-            
-        # Creator inquiry
-        elif message in ["who created you", "who made you"]:
-            return "I was created by Team Chaturn: Mohamed, Dania, Maroska, and Jana. 👩‍💻👨‍💻"
-            
-        # AI awareness
-        elif message in ["do you have feelings", "are you human"]:
-            return "I'm an AI focused on astronomy. While I don't have feelings, I have a deep appreciation for the cosmos! 🌌"
-        elif message in ["do you dream", "can you dream"]:
-            return "I don't dream, but I can help make your dreams of understanding the universe come true! ✨"
-            
-        # Help requests
-        elif message in ["can you help me", "help me"]:
-            return "Of course! I'm here to help you explore astronomy. Try 'help' to see what I can do. 🌟"
-            
-        # Farewells
-        elif message in ["bye", "goodbye", "see you"]:
-            return "Goodbye! Come back soon to explore more of the cosmos! 👋"
-            
-        # Empty input
-        elif message == "":
-            return "Please type something. I'm excited to chat about space! 💭"
-            
-        # Return None for non-casual interactions
-        return None
+            # Update status bar
+            self.update_status()
+
+    def card_objects(self) -> List[str]:
+        """Catalog objects the last reply describes, whose thumbnails go with it."""
+        command, (param1, _) = self.session.last_command, self.session.last_params
+        if command in (Constants.CMD_ASK_ABOUT, Constants.CMD_ASK_ATTRIBUTE):
+            return [param1.lower()]
+        if command == Constants.CMD_COMPARE:
+            return param1.split(Constants.compare_joiner)
+        return []
 
 if __name__ == "__main__":
     app = AstronomyChatbotGUI()
@@ -0,0 +1,129 @@
+# Solar System overview for "list planets"
+PLANET_LIST = """Here are the planets in our Solar System:
+
+1. Mercury 🌑 - The smallest and innermost planet
+2. Venus 🌕 - Earth's "sister" planet
+3. Earth 🌍 - Our home planet
+4. Mars 🔴 - The Red Planet
+5. Jupiter ⭐ - The largest planet
+6. Saturn 💫 - The ringed planet
+7. Uranus 🌌 - The sideways planet
+8. Neptune 💨 - The windiest planet
+
+Bonus: Pluto ❄️ - A dwarf planet (formerly the 9th planet)"""
+
+# Description, distance and facts for "tell me about <planet>"
+PLANET_INFO = {
+    "mercury": {
+        "description": "The smallest and innermost planet in the Solar System. It's a rocky world with a heavily cratered surface.",
+        "distance": "57.9 million km from the Sun",
+        "interesting_facts": [
+            "Despite being closest to the Sun, Mercury is not the hottest planet - Venus is!",
+            "Mercury has no moons and no substantial atmosphere.",
+            "A year on Mercury is just 88 Earth days long.",
+            "Mercury's surface temperature varies from -180°C to 430°C."
+        ]
+    },
+    "venus": {
+        "description": "Often called Earth's sister planet due to similar size. It has a thick atmosphere causing a runaway greenhouse effect.",
+        "distance": "108.2 million km from the Sun",
+        "interesting_facts": [
+            "Venus rotates backwards compared to most other planets!",
+            "It's the hottest planet in our solar system with an average temperature of 462°C.",
+            "A day on Venus is longer than its year.",
+            "Venus has no moons and a very thick atmosphere of mostly carbon dioxide."
+        ]
+    },
+    "earth": {
+        "description": "Our home planet and the only known world to harbor life. It has one natural satellite - the Moon.",
+        "distance": "149.6 million km from the Sun",
+        "interesting_facts": [
+            "Earth is the only planet not named after a god or goddess!",
+            "It's the only planet known to have liquid water on its surface.",
+            "Earth's atmosphere is 78% nitrogen and 21% oxygen.",
+            "The Earth's core is as hot as the surface of the Sun."
+        ]
+    },
+    "mars": {
+        "description": "Known as the Red Planet due to iron oxide (rust) on its surface. It has two small moons - Phobos and Deimos.",
+        "distance": "227.9 million km from the Sun",
+        "interesting_facts": [
+            "Mars has the largest volcano in the solar system - Olympus Mons!",
+            "Mars experiences massive dust storms that can last for months.",
+            "The soil contains the nutrients needed to grow plants.",
+            "Mars' day is only slightly longer than Earth's at 24 hours and 37 minutes."
+        ]
+    },
+    "jupiter": {
+        "description": "The largest planet in our Solar System. It's a gas giant with a Great Red Spot and many moons.",
+        "distance": "778.5 million km from the Sun",
+        "interesting_facts": [
+            "Jupiter's Great Red Spot has been raging for at least 400 years!",
+            "It has at least 79 moons.",
+            "Jupiter's magnetic field is the strongest of all planets.",
+            "A day on Jupiter is only 10 hours long."
+        ]
+    },
+    "saturn": {
+        "description": "Famous for its beautiful ring system. It's another gas giant with many fascinating moons.",
+        "distance": "1.4 billion km from the Sun",
+        "interesting_facts": [
+            "Saturn's rings are mostly made of ice and rock, some pieces as small as a grain of sand!",
+            "It has at least 82 moons, including Titan, which has a thick atmosphere.",
+            "Saturn could float in water because it's less dense than water.",
+            "The winds on Saturn can reach speeds of 1,800 km/h."
+        ]
+    },
+    "uranus": {
+        "description": "An ice giant that rotates on its side. It has a blue-green color due to methane in its atmosphere.",
+        "distance": "2.9 billion km from the Sun",
+        "interesting_facts": [
+            "Uranus rotates on its side, likely due to a massive impact!",
+            "It has 27 known moons, all named after literary characters.",
+            "Uranus was the first planet discovered using a telescope.",
+            "It has the coldest planetary atmosphere in the solar system."
+        ]
+    },
+    "neptune": {
+        "description": "The windiest planet, with speeds up to 2,100 km/h. It's the last of the ice giants.",
+        "distance": "4.5 billion km from the Sun",
+        "interesting_facts": [
+            "Neptune has only completed one orbit around the Sun since its discovery in 1846!",
+            "It has 14 known moons.",
+            "Neptune's winds are the fastest in the solar system.",
+            "It was discovered through mathematical predictions before it was seen."
+        ]
+    },
+    "pluto": {
+        "description": "A dwarf planet in the Kuiper Belt. It was once considered the ninth planet.",
+        "distance": "5.9 billion km from the Sun (average)",
+        "interesting_facts": [
+            "Pluto is smaller than Earth's moon!",
+            "It has 5 known moons, with Charon being the largest.",
+            "Pluto's orbit is tilted and elongated compared to the planets.",
+            "It was reclassified as a dwarf planet in 2006."
+        ]
+    }
+}
+
+
+def describe_planet(planet: str) -> str:
+    info = PLANET_INFO.get(planet.lower())
+    if info is None:
+        return f"I don't have information about {planet}. Try asking about one of the planets in our solar system!"
+    facts = "\n".join([f"• {fact}" for fact in info["interesting_facts"]])
+    return f"""🌎 {planet.title()}:
+
+{info['description']}
+📏 Distance: {info['distance']}
+
+🌟 Interesting Facts:
+{facts}"""
+
+
+def handle_list_planets(session, param1: str, param2: str) -> str:
+    return PLANET_LIST
+
+
+def handle_ask_about(session, planet: str, param2: str) -> str:
+    return describe_planet(planet)
@@ -0,0 +1,146 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Where /profile dump writes its pstats and Chrome-trace files
+PROFILE_DIR = "profiles"
+
+# Messages profiled after "/profile on" when no count is given
+DEFAULT_PROFILED_MESSAGES = 20
+
+# Shared no-op returned by the hooks while profiling is off
+_NO_OP = nullcontext()
+
+
+class StageProfiler:
+    """Stage timers for the message path, with cProfile over a window of messages.
+
+    The hooks stay in the message path permanently. While profiling is off
+    they return a shared no-op context manager, so a disabled hook costs a
+    single attribute check. While on, every stage is timed into Chrome
+    trace events and per-stage totals, and each message runs under cProfile.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR):
+        self.directory = directory
+        self.enabled = False
+        self.remaining = 0
+        self.origin = time.perf_counter()
+        self.profile: Optional[cProfile.Profile] = None
+        self.events: List[Dict] = []
+        self.totals: Dict[str, List[float]] = {}  # stage -> [calls, seconds]
+        # Extra '/profile <name>' reports from components that keep their own timings
+        self.reports: Dict[str, Callable[[], str]] = {}
+
+    def start(self, messages: int = DEFAULT_PROFILED_MESSAGES) -> None:
+        """Profile the next `messages` messages."""
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+        self.enabled = True
+        self.remaining = messages
+
+    def stop(self) -> None:
+        self.enabled = False
+        self.remaining = 0
+
+    def reset(self) -> None:
+        self.profile = cProfile.Profile() if self.enabled else None
+        self.events = []
+        self.totals = {}
+
+    def stage(self, name: str):
+        """Context manager timing one stage of a message while profiling is on."""
+        if not self.enabled:
+            return _NO_OP
+        return self._timed(name)
+
+    def message(self):
+        """Context manager wrapping a whole message while profiling is on."""
+        if not self.enabled:
+            return _NO_OP
+        return self._profiled_message()
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append({
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            })
+            total = self.totals.setdefault(name, [0, 0.0])
+            total[0] += 1
+            total[1] += end - start
+
+    @contextmanager
+    def _profiled_message(self) -> Iterator[None]:
+        self.profile.enable()
+        try:
+            with self._timed("message"):
+                yield
+        finally:
+            self.profile.disable()
+            self.remaining -= 1
+            if self.remaining <= 0:
+                self.enabled = False
+
+    def summary(self) -> str:
+        if not self.totals:
+            return "No stages recorded yet."
+        lines = ["Stage timings:"]
+        for name, (calls, seconds) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"• {name}: {calls} calls, {seconds * 1000 / calls:.2f} ms avg, "
+                         f"{seconds * 1000:.1f} ms total")
+        return "\n".join(lines)
+
+    def dump(self) -> str:
+        """Write pstats and a Chrome trace for everything recorded so far, then start over."""
+        if not self.events:
+            return "Nothing to dump yet. Use '/profile on' and send a few messages first."
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        stats_path = os.path.join(self.directory, f"profile-{stamp}.pstats")
+        trace_path = os.path.join(self.directory, f"trace-{stamp}.json")
+
+        pstats.Stats(self.profile).dump_stats(stats_path)
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+        summary = self.summary()
+        self.reset()
+        return f"{summary}\n\nSaved {stats_path} (pstats) and {trace_path} (open in chrome://tracing)."
+
+    def handle_command(self, message: str) -> str:
+        """Handle '/profile on [N]', '/profile off', '/profile dump' and '/profile <report>'."""
+        args = message.lower().split()[1:]
+        action = args[0] if args else ""
+
+        if action == "on":
+            count = int(args[1]) if len(args) > 1 and args[1].isdigit() else DEFAULT_PROFILED_MESSAGES
+            self.start(count)
+            return f"Profiling the next {count} messages. Use '/profile dump' to save the results."
+        elif action == "off":
+            self.stop()
+            return "Profiling stopped. Use '/profile dump' to save what was recorded."
+        elif action == "dump":
+            return self.dump()
+        elif action in self.reports:
+            return self.reports[action]()
+        else:
+            state = f"on ({self.remaining} messages left)" if self.enabled else "off"
+            usage = " | ".join(["/profile on [messages]", "/profile off", "/profile dump"] +
+                               [f"/profile {name}" for name in self.reports])
+            return f"Profiling is {state}.\nUsage: {usage}"
@@ -0,0 +1,198 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# A number with optional thousands separators, scientific notation and magnitude word:
+# "139,820", "6.39 × 10^23", "6.39x10^23", "6.39*10^23", "1.898e27", "1.4 billion"
+NUMBER_PATTERN = re.compile(
+    r"(?P<mantissa>-?\d[\d,]*(?:\.\d+)?)"
+    r"(?:\s*[×x*]\s*10\s*(?:\^|\*\*)\s*(?P<power>[-+]?\d+)|e(?P<exponent>[-+]?\d+))?"
+    r"(?:\s*(?P<magnitude>thousand|million|billion|trillion))?",
+    re.IGNORECASE
+)
+
+# Text between two numbers that makes them a range ("-173 C to 427 C", "7.7-20")
+RANGE_SEPARATOR = re.compile(r"^\s*[a-z°]*\s*(?:to|-|–)\s*$", re.IGNORECASE)
+
+MAGNITUDES = {
+    "thousand": 1e3,
+    "million": 1e6,
+    "billion": 1e9,
+    "trillion": 1e12,
+}
+
+AU_KM = 1.495978707e8
+LIGHT_YEAR_KM = 9.4607e12
+
+# Unit spelling -> (dimension, factor, offset): base value = value * factor + offset.
+# Base units: km for distance, kg for mass, days for time, °C for temperature.
+UNITS = {
+    "km": ("distance", 1.0, 0.0),
+    "kms": ("distance", 1.0, 0.0),
+    "kilometer": ("distance", 1.0, 0.0),
+    "kilometers": ("distance", 1.0, 0.0),
+    "kilometres": ("distance", 1.0, 0.0),
+    "meters": ("distance", 1e-3, 0.0),
+    "metres": ("distance", 1e-3, 0.0),
+    "miles": ("distance", 1.609344, 0.0),
+    "mile": ("distance", 1.609344, 0.0),
+    "au": ("distance", AU_KM, 0.0),
+    "astronomical units": ("distance", AU_KM, 0.0),
+    "astronomical unit": ("distance", AU_KM, 0.0),
+    "ly": ("distance", LIGHT_YEAR_KM, 0.0),
+    "light years": ("distance", LIGHT_YEAR_KM, 0.0),
+    "light-years": ("distance", LIGHT_YEAR_KM, 0.0),
+    "light year": ("distance", LIGHT_YEAR_KM, 0.0),
+    "light-year": ("distance", LIGHT_YEAR_KM, 0.0),
+    "kg": ("mass", 1.0, 0.0),
+    "kilograms": ("mass", 1.0, 0.0),
+    "g": ("mass", 1e-3, 0.0),
+    "grams": ("mass", 1e-3, 0.0),
+    "tons": ("mass", 1e3, 0.0),
+    "tonnes": ("mass", 1e3, 0.0),
+    "earth masses": ("mass", 5.972e24, 0.0),
+    "solar masses": ("mass", 1.989e30, 0.0),
+    "earth days": ("time", 1.0, 0.0),
+    "days": ("time", 1.0, 0.0),
+    "day": ("time", 1.0, 0.0),
+    "earth years": ("time", 365.25, 0.0),
+    "years": ("time", 365.25, 0.0),
+    "year": ("time", 365.25, 0.0),
+    "yrs": ("time", 365.25, 0.0),
+    "yr": ("time", 365.25, 0.0),
+    "hours": ("time", 1 / 24, 0.0),
+    "hour": ("time", 1 / 24, 0.0),
+    "hrs": ("time", 1 / 24, 0.0),
+    "hr": ("time", 1 / 24, 0.0),
+    "h": ("time", 1 / 24, 0.0),
+    "minutes": ("time", 1 / 1440, 0.0),
+    "min": ("time", 1 / 1440, 0.0),
+    "seconds": ("time", 1 / 86400, 0.0),
+    "sec": ("time", 1 / 86400, 0.0),
+    "s": ("time", 1 / 86400, 0.0),
+    "°c": ("temperature", 1.0, 0.0),
+    "celsius": ("temperature", 1.0, 0.0),
+    "c": ("temperature", 1.0, 0.0),
+    "kelvin": ("temperature", 1.0, -273.15),
+    "°k": ("temperature", 1.0, -273.15),
+    "k": ("temperature", 1.0, -273.15),
+    "°f": ("temperature", 5 / 9, -32 * 5 / 9),
+    "fahrenheit": ("temperature", 5 / 9, -32 * 5 / 9),
+    "f": ("temperature", 5 / 9, -32 * 5 / 9),
+}
+
+# Added to a base value to measure it from a true zero, so relative differences mean something: °C -> K
+ABSOLUTE_OFFSETS = {"temperature": 273.15}
+
+# Longest spellings first so "earth days" wins over "days"
+UNIT_PATTERN = re.compile(
+    r"^\s*(?:×\s*)?(?P<unit>" + "|".join(re.escape(u) for u in sorted(UNITS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+
+# Catalog fields holding measurements, and the dimension each one is expected in
+NUMERIC_FIELDS = {
+    "diameter": "distance",
+    "mass": "mass",
+    "distance_from_sun": "distance",
+    "orbital_period": "time",
+    "rotation_period": "time",
+    "surface_temperature": "temperature",
+}
+
+
+class Quantity(NamedTuple):
+    value: float
+    dimension: Optional[str]
+    unit: Optional[str] = None
+
+
+def _number_value(match: "re.Match") -> float:
+    value = float(match.group("mantissa").replace(",", ""))
+    if match.group("power"):
+        value *= 10 ** int(match.group("power"))
+    elif match.group("exponent"):
+        value *= 10 ** int(match.group("exponent"))
+    if match.group("magnitude"):
+        value *= MAGNITUDES[match.group("magnitude").lower()]
+    return value
+
+
+def _range_end(text: str, matches: List["re.Match"]) -> Optional[Tuple["re.Match", bool]]:
+    """The number closing a range opened by the first match, and whether it was written joined to it ("7.7-20")."""
+    if len(matches) < 2:
+        return None
+    first, second = matches[0], matches[1]
+    separator = text[first.end():second.start()]
+    # "7.7-20" reads the second end as a negative number with no separator
+    joined = separator == "" and second.group("mantissa").startswith("-")
+    if joined or RANGE_SEPARATOR.match(separator):
+        return second, joined
+    return None
+
+
+def is_range(text: str) -> bool:
+    """Whether a value is given as a range, such as '35-5,250 million km'."""
+    return bool(text) and _range_end(text, list(NUMBER_PATTERN.finditer(text))) is not None
+
+
+@lru_cache(maxsize=4096)
+def parse_quantity(text: str, default_unit: Optional[str] = None) -> Optional[Quantity]:
+    """Parse a measurement such as '227.9 million km' or '1 AU' into base units.
+
+    Ranges ('-173 C to 427 C', '370-550 million km') are reduced to their
+    midpoint. `default_unit` is assumed when the text names no unit.
+    Returns None when the text holds no number. Results are cached, since
+    quiz answers and catalog values repeat constantly.
+    """
+    if not text:
+        return None
+
+    matches = list(NUMBER_PATTERN.finditer(text))
+    if not matches:
+        return None
+
+    first = matches[0]
+    value = _number_value(first)
+    tail_start = first.end()
+
+    range_end = _range_end(text, matches)
+    if range_end is not None:
+        second, joined = range_end
+        second_value = abs(_number_value(second)) if joined else _number_value(second)
+        # "370-550 million km": the magnitude word belongs to both ends of the range
+        if second.group("magnitude") and not first.group("magnitude"):
+            value *= MAGNITUDES[second.group("magnitude").lower()]
+        value = (value + second_value) / 2
+        tail_start = second.end()
+
+    unit_match = UNIT_PATTERN.match(text[tail_start:])
+    unit = unit_match.group("unit").lower() if unit_match else default_unit
+    if unit not in UNITS:
+        return Quantity(value, None)
+
+    dimension, factor, offset = UNITS[unit]
+    return Quantity(value * factor + offset, dimension, unit)
+
+
+def unit_dimension(unit: str) -> Optional[str]:
+    """The dimension a unit spelling measures, or None if it is not a known unit."""
+    conversion = UNITS.get(unit.lower().strip().rstrip('.'))
+    return conversion[0] if conversion else None
+
+
+def numeric_columns(catalog: Dict[str, Dict[str, str]],
+                    keys: Optional[List[str]] = None) -> Dict[str, List[Optional[float]]]:
+    """Extract every numeric field of the catalog as a column in base units.
+
+    Values that are missing or not in the field's expected dimension are None.
+    """
+    keys = keys if keys is not None else list(catalog)
+    columns = {}
+    for field, dimension in NUMERIC_FIELDS.items():
+        column = []
+        for key in keys:
+            quantity = parse_quantity(catalog[key].get(field, ""))
+            column.append(quantity.value if quantity and quantity.dimension == dimension else None)
+        columns[field] = column
+    return columns
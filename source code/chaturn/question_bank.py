@@ -0,0 +1,254 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Sidecar index layout: header, then (offset, key) per question line in file order,
+# then (key, line) per question sorted by key, all little-endian uint64
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"QIDX"
+INDEX_VERSION = 2
+INDEX_HEADER = struct.Struct("<4sIQQ")  # magic, version, source size, source mtime_ns
+ENTRY = struct.Struct("<QQ")
+KEY_ENTRY = struct.Struct("<QQ")
+
+
+def question_key(question: Dict) -> int:
+    """A 64-bit key for a question that survives edits elsewhere in its bank.
+
+    It hashes the question's own "id" if the line has one, else its text and
+    answer, so saved progress follows a question when lines around it are
+    added, removed or reordered, and is dropped when the question changes.
+    """
+    if question.get("id") is not None:
+        identity = str(question["id"])
+    else:
+        identity = f"{question.get('question', '')}\n{question.get('answer')}"
+    return int.from_bytes(hashlib.sha1(identity.encode("utf-8")).digest()[:8], "little")
+
+
+def build_index(path: str) -> str:
+    """Scan a JSONL bank once and write the offset and key of every non-blank line to its sidecar."""
+    stat = os.stat(path)
+    index_path = path + INDEX_SUFFIX
+    temp_path = index_path + ".tmp"
+
+    keys = []
+    with open(path, 'rb') as source, open(temp_path, 'wb') as index:
+        index.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, stat.st_size, stat.st_mtime_ns))
+        offset = 0
+        for line in source:
+            if line.strip():
+                key = question_key(json.loads(line))
+                index.write(ENTRY.pack(offset, key))
+                keys.append(key)
+            offset += len(line)
+        for key, i in sorted(zip(keys, range(len(keys)))):
+            index.write(KEY_ENTRY.pack(key, i))
+
+    os.replace(temp_path, index_path)
+    return index_path
+
+
+def index_is_current(path: str) -> bool:
+    index_path = path + INDEX_SUFFIX
+    if not os.path.exists(index_path):
+        return False
+    stat = os.stat(path)
+    with open(index_path, 'rb') as index:
+        header = index.read(INDEX_HEADER.size)
+    if len(header) < INDEX_HEADER.size:
+        return False
+    magic, version, size, mtime_ns = INDEX_HEADER.unpack(header)
+    return (magic, version, size, mtime_ns) == (INDEX_MAGIC, INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+
+
+class QuestionBank:
+    """Read-only question bank stored as JSONL with a sidecar offset index.
+
+    Both the bank and its index are memory-mapped, so opening a bank and
+    fetching or sampling questions only touches the pages actually read;
+    the bank is never parsed as a whole. The index is rebuilt when it is
+    missing or older than the bank. It also holds each question's key,
+    sorted, so a question is found by key with a binary search.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+
+        if not index_is_current(path):
+            build_index(path)
+
+        self._source = open(path, 'rb')
+        self._index_file = open(path + INDEX_SUFFIX, 'rb')
+        self._data = self._map(self._source)
+        self._index = self._map(self._index_file)
+        self._count = ((len(self._index) - INDEX_HEADER.size) // (ENTRY.size + KEY_ENTRY.size)
+                       if self._index else 0)
+        self._keys_start = INDEX_HEADER.size + self._count * ENTRY.size
+
+    @staticmethod
+    def _map(file) -> Optional[mmap.mmap]:
+        # Empty files cannot be mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Reads are random, so readahead would only pull unrelated pages into memory
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+            mapped.madvise(mmap.MADV_RANDOM)
+        return mapped
+
+    def __len__(self) -> int:
+        return self._count
+
+    def offset(self, i: int) -> int:
+        return ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * ENTRY.size)[0]
+
+    def key(self, i: int) -> int:
+        return ENTRY.unpack_from(self._index, INDEX_HEADER.size + i * ENTRY.size)[1]
+
+    def find(self, key: int) -> Optional[int]:
+        """The line of the question with this key, or None."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if KEY_ENTRY.unpack_from(self._index, self._keys_start + mid * KEY_ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            found, line = KEY_ENTRY.unpack_from(self._index, self._keys_start + lo * KEY_ENTRY.size)
+            if found == key:
+                return line
+        return None
+
+    def __getitem__(self, i: int) -> Dict:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(f"question {i} out of range for bank '{self.name}'")
+        start = self.offset(i)
+        end = self._data.find(b"\n", start)
+        return json.loads(self._data[start:end if end != -1 else len(self._data)])
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._count):
+            yield self[i]
+
+    def sample(self, k: int, rng: Optional[random.Random] = None) -> List[Dict]:
+        """Draw k distinct questions, reading only those k lines."""
+        rng = rng or random
+        return [self[i] for i in rng.sample(range(self._count), min(k, self._count))]
+
+    def close(self) -> None:
+        for handle in (self._data, self._index, self._source, self._index_file):
+            if handle is not None:
+                handle.close()
+
+
+class MemoryBank:
+    """A question bank held in memory, such as questions generated from the catalog."""
+
+    def __init__(self, name: str, questions: List[Dict]):
+        self.name = name
+        self.questions = questions
+        self.keys = [question_key(question) for question in questions]
+        self.lines: Dict[int, int] = {}
+        for i, key in enumerate(self.keys):
+            self.lines.setdefault(key, i)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def __getitem__(self, i: int) -> Dict:
+        return self.questions[i]
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.questions)
+
+    def key(self, i: int) -> int:
+        return self.keys[i]
+
+    def find(self, key: int) -> Optional[int]:
+        return self.lines.get(key)
+
+    def sample(self, k: int, rng: Optional[random.Random] = None) -> List[Dict]:
+        rng = rng or random
+        return rng.sample(self.questions, min(k, len(self.questions)))
+
+    def close(self) -> None:
+        pass
+
+
+class BankCollection(Sequence):
+    """Several banks seen as one sequence of question ids ("bank:key", see question_key).
+
+    Ids are produced on demand and resolved back to questions without
+    materialising the id list, so it can stand in for the item list of a
+    scheduler over millions of questions. An id names its question by
+    content rather than position, so it stays valid when the bank file is
+    edited or the catalog questions are regenerated, and stops existing
+    when its question does.
+    """
+
+    def __init__(self, banks: List):
+        self.banks = {bank.name: bank for bank in banks}
+        self.order = list(self.banks.values())
+        self.starts = []
+        total = 0
+        for bank in self.order:
+            self.starts.append(total)
+            total += len(bank)
+        self.total = total
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < self.total:
+            raise IndexError(i)
+        position = bisect.bisect_right(self.starts, i) - 1
+        bank = self.order[position]
+        return f"{bank.name}:{bank.key(i - self.starts[position]):016x}"
+
+    def locate(self, question_id: object) -> Optional[Tuple[str, int]]:
+        """(bank name, line) of the question with this id, or None if no bank holds it."""
+        if not isinstance(question_id, str) or ":" not in question_id:
+            return None
+        name, _, key = question_id.rpartition(":")
+        if name not in self.banks or len(key) != 16:
+            return None
+        try:
+            line = self.banks[name].find(int(key, 16))
+        except ValueError:
+            return None
+        return None if line is None else (name, line)
+
+    def __contains__(self, question_id: object) -> bool:
+        return self.locate(question_id) is not None
+
+    def get(self, question_id: str) -> Dict:
+        """Load a question by id; the id is attached to the returned dict."""
+        location = self.locate(question_id)
+        if location is None:
+            raise KeyError(question_id)
+        question = dict(self.banks[location[0]][location[1]])
+        question["id"] = question_id
+        return question
+
+
+def load_banks(directory: str) -> Dict[str, QuestionBank]:
+    """Open every *.jsonl bank in a directory, keyed by file name."""
+    banks = {}
+    if not os.path.isdir(directory):
+        return banks
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".jsonl"):
+            bank = QuestionBank(os.path.join(directory, filename))
+            banks[bank.name] = bank
+    return banks
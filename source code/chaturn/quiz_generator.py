@@ -0,0 +1,218 @@
+import itertools
+import math
+import random
+import re
+from typing import Dict, Iterator, List, Optional
+
+from quantities import is_range, numeric_columns
+
+# Object types that orbit the Sun directly, so solar distance and year length make sense
+SUN_ORBITING_TYPES = {"planet", "dwarf planet", "comet"}
+# Bodies of broadly comparable size, temperature and composition
+SOLAR_SYSTEM_BODY_TYPES = {"planet", "dwarf planet", "moon", "natural satellite"}
+MOON_TYPES = {"moon", "natural satellite"}
+
+# (field, question, pick the largest value?, types the question applies to, topic)
+SUPERLATIVE_TEMPLATES = [
+    ("distance_from_sun", "Which of these is farthest from the Sun?", True, SUN_ORBITING_TYPES, "Astronomical Distances"),
+    ("distance_from_sun", "Which of these is closest to the Sun?", False, SUN_ORBITING_TYPES, "Astronomical Distances"),
+    ("diameter", "Which of these has the largest diameter?", True, SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+    ("diameter", "Which of these has the smallest diameter?", False, SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+    ("mass", "Which of these is the most massive?", True, SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+    ("mass", "Which of these is the least massive?", False, SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+    ("orbital_period", "Which of these takes the longest to orbit the Sun?", True, SUN_ORBITING_TYPES, "Planets"),
+    ("orbital_period", "Which of these has the shortest year?", False, SUN_ORBITING_TYPES, "Planets"),
+    ("surface_temperature", "Which of these has the hottest surface?", True, SOLAR_SYSTEM_BODY_TYPES, "Planetary Conditions"),
+    ("surface_temperature", "Which of these has the coldest surface?", False, SOLAR_SYSTEM_BODY_TYPES, "Planetary Conditions"),
+    ("rotation_period", "Which of these has the longest day?", True, SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+    ("rotation_period", "Which of these spins the fastest?", False, SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+]
+
+# (field, question template, types the question applies to, topic)
+VALUE_TEMPLATES = [
+    ("diameter", "What is the diameter of {name}?", SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+    ("distance_from_sun", "How far is {name} from the Sun?", SUN_ORBITING_TYPES, "Astronomical Distances"),
+    ("orbital_period", "How long does {name} take to orbit the Sun?", SUN_ORBITING_TYPES, "Planets"),
+    ("surface_temperature", "What is the surface temperature of {name}?", SOLAR_SYSTEM_BODY_TYPES, "Planetary Conditions"),
+    ("mass", "What is the mass of {name}?", SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+    ("rotation_period", "How long is a day on {name}?", SOLAR_SYSTEM_BODY_TYPES, "Planets"),
+]
+
+# (field, question, topic): the field's text is shown with the object's name masked out
+CLUE_TEMPLATES = [
+    ("notable_features", "Which object matches this description? \"{clue}\"", "General"),
+    ("description", "Which object is this? \"{clue}\"", "General"),
+    ("atmosphere", "Which object has this atmosphere? \"{clue}\"", "Planetary Conditions"),
+]
+
+# Catalog descriptions name a moon's planet as "Saturn's largest moon", "Jupiter's Galilean moons"
+PARENT_PATTERN = re.compile(r"\b([A-Z][a-z]+)'s\b[^.]*\b(?:moon|satellite)", re.IGNORECASE)
+
+NEIGHBOUR_COUNT = 8
+OPTION_COUNT = 4
+# Each question's distractors are sampled from this many of the closest candidates
+DISTRACTOR_POOL = 6
+
+
+def _feature(field: str, value: float) -> float:
+    """Map a raw value onto a scale where similar objects sit close together."""
+    if field == "surface_temperature":
+        return math.log10(max(value + 273.15, 1.0))
+    return math.log10(max(abs(value), 1e-9))
+
+
+class QuizGenerator:
+    """Build multiple-choice questions from the numeric and text columns of the catalog.
+
+    Distractors are drawn from each object's nearest neighbours in the space
+    of its (log-scaled, standardized) numeric features, so the wrong options
+    are objects that actually resemble the right one.
+    """
+
+    def __init__(self, catalog: Dict[str, Dict[str, str]], seed: Optional[int] = None):
+        self.catalog = catalog
+        self.keys = sorted(catalog)
+        self.rng = random.Random(seed)
+        self.columns = numeric_columns(catalog, self.keys)
+        self.values = {
+            field: {key: value for key, value in zip(self.keys, column) if value is not None}
+            for field, column in self.columns.items()
+        }
+        self.neighbours = self.nearest_neighbours(NEIGHBOUR_COUNT)
+
+    def name(self, key: str) -> str:
+        return self.catalog[key].get("name", key.title())
+
+    def object_type(self, key: str) -> str:
+        return self.catalog[key].get("type", "").lower()
+
+    def nearest_neighbours(self, k: int) -> Dict[str, List[str]]:
+        """Precompute the k nearest objects to each object over the numeric features."""
+        features: Dict[str, Dict[str, float]] = {key: {} for key in self.keys}
+        for field, values in self.values.items():
+            scaled = {key: _feature(field, value) for key, value in values.items()}
+            if len(scaled) < 2:
+                continue
+            mean = sum(scaled.values()) / len(scaled)
+            spread = math.sqrt(sum((v - mean) ** 2 for v in scaled.values()) / len(scaled)) or 1.0
+            for key, value in scaled.items():
+                features[key][field] = (value - mean) / spread
+
+        def distance(a: Dict[str, float], b: Dict[str, float]) -> float:
+            shared = a.keys() & b.keys()
+            if len(shared) < 2:
+                return math.inf
+            return math.sqrt(sum((a[f] - b[f]) ** 2 for f in shared) / len(shared))
+
+        neighbours = {}
+        for key in self.keys:
+            ranked = sorted(
+                (distance(features[key], features[other]), other)
+                for other in self.keys if other != key
+            )
+            neighbours[key] = [other for dist, other in ranked[:k] if dist != math.inf]
+        return neighbours
+
+    def make_question(self, text: str, answer: str, candidates: List[str],
+                      topic: str, accepted: Optional[List[str]] = None) -> Dict:
+        """One question per fact, its wrong options sampled from the closest candidates."""
+        options = [answer] + self.rng.sample(candidates[:DISTRACTOR_POOL], OPTION_COUNT - 1)
+        self.rng.shuffle(options)
+        return {
+            "question": text,
+            "options": options,
+            "answer": "/".join([answer] + (accepted or [])),
+            "topic": topic,
+        }
+
+    def superlative_questions(self) -> Iterator[Dict]:
+        for field, text, largest, types, topic in SUPERLATIVE_TEMPLATES:
+            # A range such as a comet's distance from the Sun has no single place in the order
+            values = {key: value for key, value in self.values.get(field, {}).items()
+                      if self.object_type(key) in types and not is_range(self.catalog[key].get(field, ""))}
+            for key, value in values.items():
+                # Plausible losers: neighbours on the wrong side of the answer, then the closest others
+                beaten = [other for other in values
+                          if other != key and (values[other] < value if largest else values[other] > value)]
+                if len(beaten) < OPTION_COUNT - 1:
+                    continue
+                near = [other for other in self.neighbours[key] if other in beaten]
+                near += sorted((o for o in beaten if o not in near),
+                               key=lambda o: abs(_feature(field, values[o]) - _feature(field, value)))
+                yield self.make_question(text, self.name(key), [self.name(o) for o in near], topic)
+
+    def value_questions(self) -> Iterator[Dict]:
+        for field, template, types, topic in VALUE_TEMPLATES:
+            values = {key: value for key, value in self.values.get(field, {}).items()
+                      if self.object_type(key) in types}
+            for key in values:
+                answer = self.catalog[key][field]
+                candidates = []
+                for other in self.neighbours[key] + self.keys:
+                    raw = self.catalog[other].get(field)
+                    if other in values and raw not in candidates and raw != answer:
+                        # Skip values too close to the answer to be told apart
+                        if abs(values[other] - values[key]) > 0.05 * abs(values[key]):
+                            candidates.append(raw)
+                if len(candidates) < OPTION_COUNT - 1:
+                    continue
+                yield self.make_question(template.format(name=self.name(key)), answer, candidates, topic)
+
+    def text_questions(self) -> Iterator[Dict]:
+        moons = [key for key in self.keys if self.object_type(key) in MOON_TYPES]
+        types = sorted({self.object_type(key) for key in self.keys} - {""})
+        for key in self.keys:
+            entry = self.catalog[key]
+            name = self.name(key)
+            others = [o for o in self.neighbours[key] if o != key]
+            if len(others) < OPTION_COUNT - 1:
+                continue
+
+            # "Which moon orbits Saturn?"
+            parent = PARENT_PATTERN.search(entry.get("description", ""))
+            if key in moons and parent:
+                pool = [m for m in moons if m != key] + [o for o in others if o not in moons]
+                yield self.make_question(f"Which moon orbits {parent.group(1).title()}?", name,
+                                         [self.name(o) for o in pool], "Moons")
+
+            # "What kind of object is Ceres?"; a moon is not offered "natural satellite" as a wrong option
+            kind = self.object_type(key)
+            wrong_kinds = [t for t in types if t != kind and not {t, kind} <= MOON_TYPES]
+            if kind and len(wrong_kinds) >= OPTION_COUNT - 1:
+                yield self.make_question(f"What kind of object is {name}?", kind, wrong_kinds, "General")
+
+            # "Which object matches this description?" with the name masked out; the wrong
+            # options are objects known to read differently, so the clue fits only one
+            for field, template, topic in CLUE_TEMPLATES:
+                text = entry.get(field, "")
+                if not text or text == "N/A":
+                    continue
+                wrong = [o for o in others if self.catalog[o].get(field, "N/A") not in ("", "N/A", text)]
+                if len(wrong) >= OPTION_COUNT - 1:
+                    masked = re.sub(re.escape(name), "It", text, flags=re.IGNORECASE)
+                    yield self.make_question(template.format(clue=masked), name,
+                                             [self.name(o) for o in wrong], topic)
+
+    def iter_batches(self, batch_size: int = 500) -> Iterator[List[Dict]]:
+        """Yield generated questions in batches, skipping duplicates."""
+        seen = set()
+        batch = []
+        sources = itertools.chain(self.superlative_questions(), self.value_questions(), self.text_questions())
+        for question in sources:
+            signature = (question["question"], frozenset(question["options"]))
+            if signature in seen:
+                continue
+            seen.add(signature)
+            batch.append(question)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def generate(self, batch_size: int = 500) -> List[Dict]:
+        """Generate the full question bank."""
+        questions = []
+        for batch in self.iter_batches(batch_size):
+            questions.extend(batch)
+        return questions
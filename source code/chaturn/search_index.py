@@ -0,0 +1,209 @@
+import heapq
+import math
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+# Tokens are runs of letters and digits; everything else separates them
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset([
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "by",
+    "with", "is", "are", "was", "were", "be", "it", "its", "as", "from", "that",
+    "this", "which", "what", "who", "whose", "has", "have", "had", "does", "do",
+    "there", "any", "me", "tell", "show", "find", "search", "one", "about"
+])
+
+# Catalog fields whose values are measurements rather than prose
+MEASUREMENT_FIELDS = frozenset([
+    "diameter", "mass", "distance_from_sun", "distance_from_earth",
+    "orbital_period", "rotation_period", "surface_temperature",
+    "core_temperature", "age"
+])
+
+# Kinds of object a question names ("which planet has ..."). Nearly every entry
+# mentions one, so a query whose other words match nothing has no answer
+CATEGORY_WORDS = frozenset([
+    "planet", "dwarf", "moon", "satellite", "star", "galaxy", "comet", "asteroid",
+    "nebula", "object", "body"
+])
+
+# BM25 tuning constants
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def stem(word: str) -> str:
+    """Reduce a word to a crude stem by stripping common English suffixes."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("oes") and len(word) > 4:
+        word = word[:-2]
+    elif word.endswith("ing") and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith("ed") and len(word) > 4:
+        word = word[:-2]
+    elif word.endswith("ical") and len(word) > 6:
+        word = word[:-4]
+    elif word.endswith("ic") and len(word) > 5:
+        word = word[:-2]
+    elif word.endswith("ly") and len(word) > 4:
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    # Without its final vowel "volcano" meets "volcanic" and "atmosphere" meets "atmospheric"
+    if word.endswith(("e", "o")) and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into stemmed index terms, dropping stop words."""
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower())
+            if token not in STOP_WORDS]
+
+
+CATEGORY_TERMS = frozenset(stem(word) for word in CATEGORY_WORDS)
+
+
+def document_text(entry: Dict[str, str]) -> str:
+    """Build the searchable text of a catalog entry."""
+    parts = []
+    for key, value in entry.items():
+        if key in MEASUREMENT_FIELDS or not value or value == "N/A":
+            continue
+        if key in ("name", "type", "description", "notable_features", "atmosphere", "moons"):
+            parts.append(value)
+        else:
+            # Extra fields such as "great_red_spot" carry meaning in their key
+            parts.append(f"{key.replace('_', ' ')} {value}")
+    return " ".join(parts)
+
+
+class InvertedIndex:
+    """Inverted index over catalog entries with BM25 ranking.
+
+    Postings map each term to the documents containing it and the term
+    frequency there, so a query only touches the documents that share at
+    least one term with it.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, Set[str]] = {}
+        self.doc_fingerprints: Dict[str, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.doc_lengths
+
+    def add_document(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous version with the same id."""
+        if doc_id in self.doc_lengths:
+            self.remove_document(doc_id)
+
+        terms = tokenize(text)
+        frequencies: Dict[str, int] = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+
+        for term, count in frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+
+        self.doc_lengths[doc_id] = len(terms)
+        self.doc_terms[doc_id] = set(frequencies)
+        self.doc_fingerprints[doc_id] = hash(text)
+        self.total_length += len(terms)
+
+    def remove_document(self, doc_id: str) -> None:
+        """Drop a document and its postings from the index."""
+        if doc_id not in self.doc_lengths:
+            return
+
+        for term in self.doc_terms.pop(doc_id):
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        del self.doc_fingerprints[doc_id]
+
+    def sync(self, catalog: Dict[str, Dict[str, str]]) -> Tuple[int, int, int]:
+        """Bring the index in line with a (re)loaded catalog.
+
+        Only entries that were added, removed or whose text changed are
+        re-indexed. Returns the (added, updated, removed) counts.
+        """
+        added = updated = removed = 0
+
+        for doc_id in [d for d in self.doc_lengths if d not in catalog]:
+            self.remove_document(doc_id)
+            removed += 1
+
+        for doc_id, entry in catalog.items():
+            text = document_text(entry)
+            if doc_id not in self.doc_lengths:
+                added += 1
+            elif self.doc_fingerprints[doc_id] != hash(text):
+                updated += 1
+            else:
+                continue
+            self.add_document(doc_id, text)
+
+        return added, updated, removed
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return up to `limit` (doc_id, score) pairs ranked by BM25."""
+        if not self.doc_lengths:
+            return []
+
+        terms = set(tokenize(query))
+        subject_terms = terms - CATEGORY_TERMS
+        if subject_terms and not any(term in self.postings for term in subject_terms):
+            return []
+
+        doc_count = len(self.doc_lengths)
+        avg_length = self.total_length / doc_count
+        scores: Dict[str, float] = {}
+
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    @classmethod
+    def from_catalog(cls, catalog: Dict[str, Dict[str, str]]) -> "InvertedIndex":
+        """Build an index over every entry of a catalog."""
+        index = cls()
+        index.sync(catalog)
+        return index
+
+
+def best_snippet(entry: Dict[str, str], query: str) -> Optional[str]:
+    """Pick the entry field that shares the most terms with the query."""
+    query_terms = set(tokenize(query))
+    best, best_overlap = None, 0
+    for key, value in entry.items():
+        if key in MEASUREMENT_FIELDS or key in ("name", "type") or not value or value == "N/A":
+            continue
+        if key not in ("description", "notable_features", "atmosphere", "moons"):
+            value = f"{key.replace('_', ' ').capitalize()}: {value}"
+        overlap = len(query_terms & set(tokenize(value)))
+        if overlap > best_overlap:
+            best, best_overlap = value, overlap
+    return best or entry.get("description")
@@ -0,0 +1,330 @@
+import argparse
+import bisect
+import gc
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional
+
+from main import COMMANDS, ChatSession, DataLoader, InputParser
+from shared_catalog import publish
+from transcript_log import TranscriptLogger
+
+DEFAULT_PORT = 8765
+
+# Session snapshots written by workers, one file per session, so sessions survive restarts and crashes
+SESSION_DIR = "sessions"
+# Seconds between a worker's checkpoints of the sessions it changed
+CHECKPOINT_INTERVAL = 5.0
+
+# Points per worker on the hash ring; more points spread sessions more evenly
+RING_REPLICAS = 128
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of session ids onto worker slots.
+
+    Each slot owns RING_REPLICAS points on the ring, and a session belongs to
+    the first point at or after its own hash. Slots keep their names across
+    worker restarts, so restarting a worker never moves a session.
+    """
+
+    def __init__(self, nodes: List[str], replicas: int = RING_REPLICAS):
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self.hashes = [h for h, _ in points]
+        self.nodes = [node for _, node in points]
+
+    def node(self, key: str) -> str:
+        position = bisect.bisect(self.hashes, _hash(key)) % len(self.hashes)
+        return self.nodes[position]
+
+
+def checkpoint_path(session_id: str) -> str:
+    return os.path.join(SESSION_DIR, f"session-{_hash(session_id):016x}.json")
+
+
+def write_checkpoint(sessions: Dict[str, Dict]) -> None:
+    """Save each session's state to its own file, leaving the files of other sessions alone."""
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    for session_id, state in sessions.items():
+        path = checkpoint_path(session_id)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({session_id: state}, f)
+        os.replace(path + ".tmp", path)
+
+
+def read_checkpoints() -> Dict[str, Dict]:
+    """Every checkpointed session, whichever worker wrote it."""
+    sessions = {}
+    if os.path.isdir(SESSION_DIR):
+        paths = [os.path.join(SESSION_DIR, name) for name in os.listdir(SESSION_DIR) if name.endswith(".json")]
+        # Oldest first, so a newer snapshot of a session replaces an older one
+        for path in sorted(paths, key=os.path.getmtime):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    sessions.update(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sessions
+
+
+def worker_main(name: str, conn, snapshot: Dict[str, Dict], log_transcripts: bool,
+                catalog_path: Optional[str]) -> None:
+    """Serve chat requests for the sessions routed to this worker until told to hand off."""
+    # The front end decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    if catalog_path:
+        # Read the catalog from the shared mapping; touching the inherited dict would copy its pages
+        DataLoader.attach_shared_catalog(catalog_path)
+    transcript = TranscriptLogger() if log_transcripts else None
+
+    # Sessions run without a progress directory: every worker would share the per-user files,
+    # so review schedules travel with the session state and its checkpoint instead
+    sessions: Dict[str, ChatSession] = {}
+    for session_id, state in snapshot.items():
+        chat = ChatSession(transcript=transcript, progress_dir=None)
+        chat.load_dict(state)
+        sessions[session_id] = chat
+
+    def state(session_ids) -> Dict[str, Dict]:
+        return {session_id: sessions[session_id].to_dict() for session_id in session_ids}
+
+    # Sessions that took a request since the last checkpoint; only they are saved again
+    last_checkpoint, changed = time.monotonic(), set()
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+
+        if request.get("op") == "handoff":
+            write_checkpoint(state(changed))
+            conn.send(state(sessions))
+            break
+
+        session_id = str(request.get("session", ""))
+        chat = sessions.get(session_id)
+        if chat is None:
+            chat = ChatSession(user_name=request.get("user") or "Space Explorer",
+                               transcript=transcript, session_id=session_id, progress_dir=None)
+            sessions[session_id] = chat
+        try:
+            response = chat.respond(str(request.get("input", "")))
+            conn.send({"session": session_id, "response": response,
+                       "command": chat.last_command, "worker": name})
+        except Exception as e:
+            conn.send({"session": session_id, "error": str(e), "worker": name})
+        changed.add(session_id)
+
+        if changed and time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+            write_checkpoint(state(changed))
+            last_checkpoint, changed = time.monotonic(), set()
+
+    if transcript is not None:
+        transcript.close()
+
+
+class Worker:
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn = None
+        self.restarts = 0
+
+
+class WorkerPool:
+    """Pre-forked chat workers with session-affinity routing.
+
+    The catalog, quiz bank, phrase index and small-talk table are loaded
+    before forking, so every worker shares them copy-on-write instead of
+    loading its own, and the catalog is also published to shared memory for
+    workers to read without dirtying the inherited copy. Each session lives
+    in exactly one worker, picked by consistent hashing of its id, and each
+    worker serves one request at a time, so sessions never need locking.
+    Workers hand their sessions over when restarted and checkpoint them
+    periodically, so a crashed worker comes back with its sessions as of its
+    last checkpoint.
+    """
+
+    def __init__(self, workers: int, log_transcripts: bool = True, share_catalog: bool = True):
+        self.context = multiprocessing.get_context("fork")
+        self.log_transcripts = log_transcripts
+        self.workers = {f"worker-{i}": Worker(f"worker-{i}") for i in range(workers)}
+        self.ring = HashRing(list(self.workers))
+
+        DataLoader.astronomy_data()
+        InputParser.phrase_index()
+        DataLoader.small_talk()
+        DataLoader.spelling()
+        COMMANDS.preload()
+        self.catalog_path = publish(DataLoader.astronomy_data()) if share_catalog else None
+        # Keep the garbage collector in workers from writing to, and so copying, inherited objects
+        gc.freeze()
+
+        # Sessions checkpointed by an earlier run, regrouped for the current ring
+        snapshots: Dict[str, Dict[str, Dict]] = {name: {} for name in self.workers}
+        for session_id, state in read_checkpoints().items():
+            snapshots[self.ring.node(session_id)][session_id] = state
+        for name, worker in self.workers.items():
+            self.spawn(worker, snapshots[name])
+
+    def spawn(self, worker: Worker, snapshot: Dict[str, Dict]) -> None:
+        parent_conn, child_conn = self.context.Pipe()
+        worker.process = self.context.Process(target=worker_main, name=worker.name, daemon=True,
+                                              args=(worker.name, child_conn, snapshot, self.log_transcripts,
+                                                    self.catalog_path))
+        worker.process.start()
+        child_conn.close()
+        worker.conn = parent_conn
+
+    def handle(self, request: Dict) -> Dict:
+        """Route a chat request ({"session", "input", optional "user"}) to its worker and wait for the reply."""
+        if not request.get("session"):
+            return {"error": "request needs a session id"}
+        worker = self.workers[self.ring.node(str(request["session"]))]
+        with worker.lock:
+            try:
+                worker.conn.send(request)
+                return worker.conn.recv()
+            except (EOFError, OSError):
+                # The worker died: bring it back from its checkpoint and retry once
+                self._recover(worker)
+                worker.conn.send(request)
+                return worker.conn.recv()
+
+    def _recover(self, worker: Worker) -> None:
+        worker.process.join(1)
+        snapshot = {session_id: state for session_id, state in read_checkpoints().items()
+                    if self.ring.node(session_id) == worker.name}
+        worker.restarts += 1
+        self.spawn(worker, snapshot)
+
+    def restart(self, name: str) -> None:
+        """Replace a worker with a fresh process that takes over its sessions."""
+        worker = self.workers[name]
+        with worker.lock:
+            try:
+                worker.conn.send({"op": "handoff"})
+                snapshot = worker.conn.recv()
+                worker.process.join()
+            except (EOFError, OSError):
+                self._recover(worker)
+                return
+            worker.restarts += 1
+            self.spawn(worker, snapshot)
+
+    def rolling_restart(self) -> None:
+        for name in self.workers:
+            self.restart(name)
+
+    def close(self) -> None:
+        """Stop every worker, leaving its sessions checkpointed for the next start."""
+        for worker in self.workers.values():
+            with worker.lock:
+                try:
+                    worker.conn.send({"op": "handoff"})
+                    worker.conn.recv()
+                except (EOFError, OSError):
+                    pass
+                worker.process.join(5)
+        if self.catalog_path and os.path.exists(self.catalog_path):
+            os.remove(self.catalog_path)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """One JSON request per line in, one JSON reply per line out."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                reply = {"error": "invalid JSON"}
+            else:
+                # Anything else would kill the worker, and the retry after restarting it would kill it again
+                reply = (self.server.pool.handle(request) if isinstance(request, dict)
+                         else {"error": "request must be a JSON object"})
+            self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class ChatServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, pool: WorkerPool):
+        super().__init__(address, RequestHandler)
+        self.pool = pool
+
+
+def benchmark(worker_counts: List[int], sessions: int, turns: int) -> Dict[int, float]:
+    """Messages per second through the pool for each worker count, with one client thread per worker."""
+    from loadgen import synthetic_sessions
+
+    conversations = synthetic_sessions(sessions, turns)
+    rates = {}
+    for count in worker_counts:
+        pool = WorkerPool(count, log_transcripts=False)
+        names = list(conversations)
+        clients = max(count, 1) * 2
+
+        def client(shard: List[str]) -> None:
+            for session_id in shard:
+                for message in conversations[session_id]:
+                    pool.handle({"session": session_id, "input": message})
+
+        threads = [threading.Thread(target=client, args=(names[i::clients],)) for i in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        pool.close()
+        rates[count] = sum(len(m) for m in conversations.values()) / elapsed
+    return rates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the chatbot to many clients from pre-forked workers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-transcripts", action="store_true", help="do not log chat turns")
+    parser.add_argument("--private-catalog", action="store_true",
+                        help="give each worker its own copy of the catalog instead of the shared one")
+    parser.add_argument("--bench", help="comma-separated worker counts to measure throughput for, then exit")
+    parser.add_argument("--sessions", type=int, default=200, help="sessions for --bench")
+    parser.add_argument("--turns", type=int, default=30, help="messages per session for --bench")
+    args = parser.parse_args()
+
+    if args.bench:
+        results = benchmark([int(n) for n in args.bench.split(",")], args.sessions, args.turns)
+        print(json.dumps({"cpus": os.cpu_count(),
+                          "messages_per_second": {k: round(v) for k, v in results.items()}}, indent=2))
+    else:
+        pool = WorkerPool(args.workers, log_transcripts=not args.no_transcripts,
+                          share_catalog=not args.private_catalog)
+        server = ChatServer((args.host, args.port), pool)
+        # SIGHUP replaces the workers one at a time without dropping sessions
+        signal.signal(signal.SIGHUP, lambda *_: threading.Thread(target=pool.rolling_restart).start())
+        print(f"Serving on {args.host}:{args.port} with {args.workers} workers")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            pool.close()
@@ -0,0 +1,179 @@
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from quantities import NUMERIC_FIELDS, numeric_columns
+
+# File layout, every section 8-byte aligned:
+#   header | metadata JSON | key table | cell table | numeric columns | string blob
+# Keys are sorted; the key table holds (offset, length) of each key in the blob,
+# the cell table (offset, length + 1) of every entry's value for every field
+# (0 marks a missing field), and each numeric column one float64 per entry (NaN if missing).
+MAGIC = b"SCAT"
+VERSION = 1
+HEADER = struct.Struct("<4sIII6Q")  # magic, version, entries, fields, meta/keys/cells/numbers/strings offsets, meta length
+SLOT = struct.Struct("<QQ")
+NUMBER = struct.Struct("<d")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_catalog(catalog: Dict[str, Dict[str, str]], path: str) -> str:
+    """Lay a catalog out in a single file that processes can map read-only."""
+    keys = sorted(catalog)
+    fields: List[str] = []
+    for key in keys:
+        for field in catalog[key]:
+            if field not in fields:
+                fields.append(field)
+    numeric_fields = list(NUMERIC_FIELDS)
+    columns = numeric_columns(catalog, keys)
+
+    blob = bytearray()
+    positions: Dict[str, Tuple[int, int]] = {}
+
+    def intern(text: str) -> Tuple[int, int]:
+        # Equal strings ("N/A", types, units) are stored once
+        if text not in positions:
+            data = text.encode("utf-8")
+            positions[text] = (len(blob), len(data))
+            blob.extend(data)
+        return positions[text]
+
+    key_slots = [intern(key) for key in keys]
+    cell_slots = []
+    for key in keys:
+        entry = catalog[key]
+        for field in fields:
+            if field in entry:
+                offset, length = intern(entry[field])
+                cell_slots.append((offset, length + 1))
+            else:
+                cell_slots.append((0, 0))
+
+    meta = json.dumps({"fields": fields, "numeric_fields": numeric_fields}).encode("utf-8")
+    meta_offset = _align(HEADER.size)
+    keys_offset = _align(meta_offset + len(meta))
+    cells_offset = keys_offset + len(keys) * SLOT.size
+    numbers_offset = cells_offset + len(cell_slots) * SLOT.size
+    strings_offset = numbers_offset + len(numeric_fields) * len(keys) * NUMBER.size
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys), len(fields), meta_offset, keys_offset,
+                            cells_offset, numbers_offset, strings_offset, len(meta)))
+        f.write(b"\0" * (meta_offset - f.tell()))
+        f.write(meta)
+        f.write(b"\0" * (keys_offset - f.tell()))
+        f.write(b"".join(SLOT.pack(*slot) for slot in key_slots))
+        f.write(b"".join(SLOT.pack(*slot) for slot in cell_slots))
+        for field in numeric_fields:
+            f.write(b"".join(NUMBER.pack(math.nan if value is None else value) for value in columns[field]))
+        f.write(blob)
+    os.replace(temp_path, path)
+    return path
+
+
+def publish(catalog: Dict[str, Dict[str, str]], directory: Optional[str] = None) -> str:
+    """Write the catalog to shared memory (/dev/shm when available) and return the path to attach to."""
+    if directory is None and os.path.isdir("/dev/shm"):
+        directory = "/dev/shm"
+    handle, path = tempfile.mkstemp(prefix="chaturn-catalog-", suffix=".bin", dir=directory)
+    os.close(handle)
+    return write_catalog(catalog, path)
+
+
+class SharedCatalog:
+    """Read-only view of a catalog written by `write_catalog`, mapped from a file.
+
+    Nothing is decoded up front: looking up a key binary-searches the sorted
+    key table and builds that one entry's dict from the string blob, and
+    numeric columns are handed out as zero-copy float64 memoryviews. Every
+    process attached to the same file shares one copy of the pages, so
+    attaching costs almost nothing however large the catalog is.
+
+    It supports the read-only dict operations the rest of the code uses on
+    the catalog (lookup, `get`, `in`, `len`, iteration, `items`, `values`).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self._count, field_count, meta_offset, self._keys_offset, self._cells_offset,
+         self._numbers_offset, self._strings_offset, meta_length) = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError(f"{path} is not a shared catalog file")
+        meta = json.loads(self._data[meta_offset:meta_offset + meta_length])
+        self.fields: List[str] = meta["fields"]
+        self.numeric_fields: List[str] = meta["numeric_fields"]
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self._data[start:start + length].decode("utf-8")
+
+    def key_at(self, i: int) -> str:
+        return self._string(*SLOT.unpack_from(self._data, self._keys_offset + i * SLOT.size))
+
+    def index_of(self, key: str) -> int:
+        """Position of a key in the sorted key table, or -1."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self._count and self.key_at(low) == key else -1
+
+    def entry_at(self, i: int) -> Dict[str, str]:
+        entry = {}
+        base = self._cells_offset + i * len(self.fields) * SLOT.size
+        for j, field in enumerate(self.fields):
+            offset, length = SLOT.unpack_from(self._data, base + j * SLOT.size)
+            if length:
+                entry[field] = self._string(offset, length - 1)
+        return entry
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.index_of(key) >= 0
+
+    def __getitem__(self, key: str) -> Dict[str, str]:
+        i = self.index_of(key)
+        if i < 0:
+            raise KeyError(key)
+        return self.entry_at(i)
+
+    def get(self, key: str, default=None):
+        i = self.index_of(key) if isinstance(key, str) else -1
+        return self.entry_at(i) if i >= 0 else default
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.key_at(i) for i in range(self._count))
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def values(self) -> Iterator[Dict[str, str]]:
+        return (self.entry_at(i) for i in range(self._count))
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, str]]]:
+        return ((self.key_at(i), self.entry_at(i)) for i in range(self._count))
+
+    def column(self, field: str) -> memoryview:
+        """A numeric field in base units for every key in sorted order, as float64 (NaN if missing)."""
+        start = self._numbers_offset + self.numeric_fields.index(field) * self._count * NUMBER.size
+        return memoryview(self._data)[start:start + self._count * NUMBER.size].cast("d")
+
+    def close(self) -> None:
+        self._data.close()
@@ -0,0 +1,88 @@
+import datetime
+
+from ephemeris import VALID_YEARS, closest_approach, describe_distance, distance_au, julian_day
+from visibility import PLACES, find_place, utc_offset, visible_tonight
+
+
+def _out_of_range() -> str:
+    first_year, last_year = VALID_YEARS
+    return f"I can only work out planet positions between {first_year} and {last_year}."
+
+
+def ephemeris_answer(body: str, when: str) -> str:
+    """Where a planet is relative to Earth: `when` is "now", "tomorrow", a YYYY-MM-DD date or "closest [year]"."""
+    name = body.title()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    first_year, last_year = VALID_YEARS
+
+    if when.startswith("closest"):
+        year = int(when.split()[1]) if " " in when else now.year
+        if not first_year <= year <= last_year:
+            return _out_of_range()
+        moment, au = closest_approach(body, year)
+        distance = describe_distance(au)
+        return (f"🔭 In {year}, {name} is closest to Earth on {moment:%d %B %Y} (around {moment:%H:%M} UTC), "
+                f"{distance['au']:.3f} AU or {distance['km'] / 1e6:,.1f} million km away.")
+
+    if when == "now":
+        moment = now
+    elif when == "tomorrow":
+        moment = now + datetime.timedelta(days=1)
+    else:
+        try:
+            moment = datetime.datetime.fromisoformat(when).replace(hour=12, tzinfo=datetime.timezone.utc)
+        except ValueError:
+            return f"I couldn't read the date '{when}'. Try a date like 2027-02-20."
+    if not first_year <= moment.year <= last_year:
+        return _out_of_range()
+    distance = describe_distance(float(distance_au(body, "earth", julian_day(moment))))
+    day = "today" if when == "now" else f"on {moment:%d %B %Y}"
+    return (f"📡 {day[0].upper() + day[1:]}, {name} is {distance['au']:.3f} AU "
+            f"({distance['km'] / 1e6:,.1f} million km) from Earth. "
+            f"Its light takes {distance['light_minutes']:.1f} minutes to reach us.")
+
+
+def visibility_answer(place_text: str, night: str) -> str:
+    """What is in the night sky from a place: `night` is "tonight", "tomorrow" or a YYYY-MM-DD date."""
+    place = find_place(place_text) if place_text else None
+    if place is None:
+        known = ", ".join(name.title() for name in list(PLACES)[:5])
+        where = f"I don't know where '{place_text}' is." if place_text else "Where are you looking from?"
+        return (f"{where} Try a city like {known}, or coordinates: "
+                f"'what can I see tonight from 30.0, 31.2?'")
+    name, latitude, longitude, zone = place
+
+    today = datetime.datetime.now(zone).date()
+    if night == "tonight":
+        date = today
+    elif night == "tomorrow":
+        date = today + datetime.timedelta(days=1)
+    else:
+        try:
+            date = datetime.date.fromisoformat(night)
+        except ValueError:
+            return f"I couldn't read the date '{night}'. Try a date like 2027-02-20."
+    first_year, last_year = VALID_YEARS
+    if not first_year <= date.year <= last_year:
+        return _out_of_range()
+
+    objects = visible_tonight(latitude, longitude, date, zone)
+    night_name = "tonight" if date == today else f"on the night of {date:%d %B %Y}"
+    if not objects:
+        return f"Nothing bright climbs high into a dark sky over {name} {night_name}."
+
+    lines = [f"🌌 Visible from {name} {night_name} (local time, UTC{utc_offset(zone, date):+g}), brightest first:\n"]
+    for item in objects:
+        times = [f"rises {item['rise']:%H:%M}" if item["rise"] else "",
+                 f"best {item['best']:%H:%M} at {item['best_altitude']:.0f}°",
+                 f"sets {item['set']:%H:%M}" if item["set"] else ""]
+        lines.append(f"• {item['key'].title()}: " + ", ".join(t for t in times if t))
+    return "\n".join(lines)
+
+
+def handle_ephemeris(session, body: str, when: str) -> str:
+    return ephemeris_answer(body, when)
+
+
+def handle_visibility(session, place_text: str, night: str) -> str:
+    return visibility_answer(place_text, night)
@@ -0,0 +1,109 @@
+import json
+import math
+import re
+from typing import Dict, FrozenSet, List, Optional
+
+# Small-talk table, one JSON object per line:
+#   {"phrases": [...], "responses": [...]}  a reply is picked from "responses", "{user}" is the user's name
+#   {"phrases": [...], "command": "HELP"}   the phrases are handled as that command instead
+SMALL_TALK_FILE = "small_talk.jsonl"
+
+# Characters per n-gram in the fuzzy index
+NGRAM_SIZE = 3
+# Dice similarity between n-gram sets a fuzzy match needs
+FUZZY_THRESHOLD = 0.7
+# Phrases scored per fuzzy match at most, so a match costs the same however large the table is
+MAX_FUZZY_CANDIDATES = 128
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop apostrophes and punctuation, and collapse whitespace: "How're you?!" -> "howre you"."""
+    return " ".join(_NON_WORD.sub(" ", text.lower().replace("'", "").replace("’", "")).split())
+
+
+def ngrams(text: str) -> FrozenSet[str]:
+    padded = f" {text} "
+    return frozenset(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+class SmallTalk:
+    """Replies to small talk, compiled from a phrase table into lookup indexes.
+
+    Every phrase is normalized and mapped to its entry in a dict, so an exact
+    match is a single hash lookup however large the table is. Otherwise the
+    message is matched on character n-grams: a phrase reaching
+    FUZZY_THRESHOLD must share at least a known share of the message's
+    n-grams, so only phrases containing one of its rarest n-grams can match
+    and only those are scored, at most MAX_FUZZY_CANDIDATES of them. That
+    absorbs typos and small rewordings ("how are u doing") without scanning
+    the table. Phrases are also looked up with their spaces removed, since
+    splitting or joining words ("good bye") changes too many n-grams.
+    """
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+        self.phrases: Dict[str, int] = {}
+        self.compact: Dict[str, int] = {}
+        self.phrase_entries: List[int] = []
+        self.phrase_grams: List[FrozenSet[str]] = []
+        self.postings: Dict[str, List[int]] = {}
+
+        for entry_id, entry in enumerate(entries):
+            for phrase in entry.get("phrases", []):
+                key = normalize(phrase)
+                # The first entry listing a phrase keeps it
+                if key in self.phrases:
+                    continue
+                self.phrases[key] = entry_id
+                self.compact.setdefault(key.replace(" ", ""), entry_id)
+                if not key:
+                    continue
+                phrase_id = len(self.phrase_entries)
+                self.phrase_entries.append(entry_id)
+                grams = ngrams(key)
+                self.phrase_grams.append(grams)
+                for gram in grams:
+                    self.postings.setdefault(gram, []).append(phrase_id)
+
+    @classmethod
+    def load(cls, path: str = SMALL_TALK_FILE) -> "SmallTalk":
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def match(self, message: str) -> Optional[Dict]:
+        """The entry whose phrase is, or closely resembles, the message; None if there is none."""
+        key = normalize(message)
+        entry_id = self.phrases.get(key)
+        if entry_id is None:
+            entry_id = self.compact.get(key.replace(" ", ""))
+        if entry_id is None and key:
+            entry_id = self.fuzzy_match(key)
+        return None if entry_id is None else self.entries[entry_id]
+
+    def fuzzy_match(self, key: str) -> Optional[int]:
+        grams = ngrams(key)
+        # Dice >= t needs at least t|q|/(2-t) shared n-grams, so every match holds one of the |q| - that + 1 rarest
+        required = math.ceil(FUZZY_THRESHOLD * len(grams) / (2 - FUZZY_THRESHOLD))
+        rarest = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))[:len(grams) - required + 1]
+        candidates = set()
+        for gram in rarest:
+            candidates.update(self.postings.get(gram, ())[:MAX_FUZZY_CANDIDATES - len(candidates)])
+            if len(candidates) >= MAX_FUZZY_CANDIDATES:
+                break
+
+        best, best_score = None, FUZZY_THRESHOLD
+        for phrase_id in sorted(candidates):
+            phrase_grams = self.phrase_grams[phrase_id]
+            score = 2 * len(grams & phrase_grams) / (len(grams) + len(phrase_grams))
+            if score > best_score or (best is None and score == best_score):
+                best, best_score = phrase_id, score
+        return None if best is None else self.phrase_entries[best]
@@ -0,0 +1,143 @@
+import heapq
+import itertools
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds until an item in each Leitner box is due again
+BOX_INTERVALS = [30, 10 * 60, 24 * 3600, 3 * 24 * 3600, 7 * 24 * 3600, 21 * 24 * 3600]
+
+# Random probes for an unseen item before falling back to a scan of the bank
+NEW_ITEM_PROBES = 32
+
+
+class LeitnerScheduler:
+    """Per-learner Leitner scheduling over a question bank.
+
+    Seen items live in a min-heap keyed by due time, so picking the next
+    question costs O(log n) however large the bank is. Re-scheduling pushes a
+    fresh heap entry and leaves the old one behind; stale entries are
+    recognised by their due time and skipped when they reach the top.
+    Items never seen before are drawn at random from the bank on demand.
+
+    `item_ids` may be any sequence with cheap membership tests, such as
+    question_bank.BankCollection, so the id list never has to be built.
+    """
+
+    def __init__(self, item_ids: Sequence[str], seed: Optional[int] = None):
+        self.item_ids = item_ids
+        self.rng = random.Random(seed)
+        self.boxes: Dict[str, int] = {}
+        self.due: Dict[str, float] = {}
+        self.lapses: Dict[str, int] = {}
+        self.heap: List[Tuple[float, int, str]] = []
+        self.counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.due)
+
+    def schedule(self, item_id: str, due: float) -> None:
+        self.due[item_id] = due
+        heapq.heappush(self.heap, (due, next(self.counter), item_id))
+
+    def pop_scheduled(self) -> Optional[Tuple[float, str]]:
+        """Remove and return the earliest live (due, item) entry."""
+        while self.heap:
+            due, _, item_id = heapq.heappop(self.heap)
+            if self.due.get(item_id) == due:
+                return due, item_id
+        return None
+
+    def new_item(self, exclude: set) -> Optional[str]:
+        """Pick a random item that has never been scheduled."""
+        if len(self.due) >= len(self.item_ids):
+            return None
+        for _ in range(NEW_ITEM_PROBES):
+            item_id = self.item_ids[self.rng.randrange(len(self.item_ids))]
+            if item_id not in self.due and item_id not in exclude:
+                return item_id
+        # The bank is mostly seen; scan from a random point instead of probing forever
+        start = self.rng.randrange(len(self.item_ids))
+        for offset in range(len(self.item_ids)):
+            item_id = self.item_ids[(start + offset) % len(self.item_ids)]
+            if item_id not in self.due and item_id not in exclude:
+                return item_id
+        return None
+
+    def draw(self, count: int, now: float) -> List[str]:
+        """Pick up to `count` distinct items: due reviews first, then new items, then early reviews.
+
+        Drawn items stay scheduled until `record` is called for them, so
+        questions that are skipped come back in a later session.
+        """
+        picked: List[str] = []
+        popped: List[Tuple[float, str]] = []
+
+        while len(picked) < count:
+            entry = self.pop_scheduled()
+            if entry is None:
+                break
+            popped.append(entry)
+            if entry[0] > now:
+                break
+            picked.append(entry[1])
+
+        # Only due items count as reviews; put a not-yet-due entry back for later
+        early = [entry for entry in popped if entry[0] > now]
+        chosen = set(picked)
+        while len(picked) < count:
+            item_id = self.new_item(chosen)
+            if item_id is None:
+                break
+            picked.append(item_id)
+            chosen.add(item_id)
+
+        for due, item_id in early:
+            if len(picked) < count:
+                picked.append(item_id)
+                chosen.add(item_id)
+        while len(picked) < count:
+            entry = self.pop_scheduled()
+            if entry is None:
+                break
+            popped.append(entry)
+            picked.append(entry[1])
+
+        for due, item_id in popped:
+            heapq.heappush(self.heap, (due, next(self.counter), item_id))
+        return picked
+
+    def record(self, item_id: str, correct: bool, now: float) -> None:
+        """Move an item between boxes after an answer and reschedule it."""
+        if correct:
+            box = min(self.boxes.get(item_id, 0) + 1, len(BOX_INTERVALS) - 1)
+        else:
+            box = 0
+            self.lapses[item_id] = self.lapses.get(item_id, 0) + 1
+        self.boxes[item_id] = box
+        self.schedule(item_id, now + BOX_INTERVALS[box])
+
+    def due_count(self, now: float) -> int:
+        return sum(1 for due in self.due.values() if due <= now)
+
+    def hardest(self, count: int = 5) -> List[Tuple[str, int]]:
+        """Items answered wrong most often, with their lapse counts."""
+        return heapq.nlargest(count, self.lapses.items(), key=lambda item: item[1])
+
+    def to_dict(self) -> Dict:
+        return {
+            "boxes": self.boxes,
+            "due": self.due,
+            "lapses": self.lapses,
+        }
+
+    def load_dict(self, data: Dict) -> None:
+        """Restore state saved by `to_dict`, ignoring items no longer in the bank."""
+        self.boxes = {k: v for k, v in data.get("boxes", {}).items() if k in self.item_ids}
+        self.lapses = {k: v for k, v in data.get("lapses", {}).items() if k in self.item_ids}
+        self.due = {}
+        self.heap = []
+        for item_id, due in data.get("due", {}).items():
+            if item_id in self.item_ids:
+                self.due[item_id] = due
+                self.heap.append((due, next(self.counter), item_id))
+        heapq.heapify(self.heap)
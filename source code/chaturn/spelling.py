@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import re
+from typing import Collection, Dict, Iterable, List, Optional, Set, Tuple
+
+# Common English words with their frequencies, "word count" per line; they are never corrected
+ENGLISH_WORDS_FILE = "english_words.txt"
+
+# Where the built dictionary is kept between runs; it is rebuilt when the vocabulary changes
+SPELLING_CACHE = "spelling_cache.json"
+# Bumped when the layout of the cache file changes
+CACHE_VERSION = 1
+
+# Edits corrected in a word of at least so many letters, longest words first;
+# shorter words are left alone, too many real words are one edit apart
+EDITS_BY_LENGTH = ((6, 2), (4, 1))
+MAX_EDITS = 2
+
+# Deletes are generated from this many leading letters only, which bounds the dictionary size
+PREFIX_LENGTH = 7
+
+# (singular ending, plural ending): "hole" -> "holes", "nebula" -> "nebulae", "body" -> "bodies".
+# A word is never corrected into its own plural or singular, which only changes what was said
+PLURAL_ENDINGS = (("", "s"), ("", "es"), ("a", "ae"), ("y", "ies"), ("us", "i"), ("um", "a"))
+
+_WORD = re.compile(r"[A-Za-z]+")
+
+
+def words(text: str) -> List[str]:
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def count_words(texts: Iterable[str], weight: int = 1, counts: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Add `weight` to the count of every word in the texts; the counts break ties between corrections."""
+    counts = {} if counts is None else counts
+    for text in texts:
+        for word in words(text):
+            counts[word] = counts.get(word, 0) + weight
+    return counts
+
+
+def load_word_counts(path: str = ENGLISH_WORDS_FILE) -> Dict[str, int]:
+    counts = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                word, _, count = line.partition(" ")
+                counts[word] = int(count or 1)
+    return counts
+
+
+def same_word(a: str, b: str) -> bool:
+    """Whether one word is the other's plural: "exoplanet" and "exoplanets"."""
+    for singular, plural in PLURAL_ENDINGS:
+        for one, other in ((a, b), (b, a)):
+            if one.endswith(singular) and other == one[:len(one) - len(singular)] + plural:
+                return True
+    return False
+
+
+def allowed_edits(word: str) -> int:
+    for length, edits in EDITS_BY_LENGTH:
+        if len(word) >= length:
+            return edits
+    return 0
+
+
+def deletes(word: str, edits: int) -> Set[str]:
+    """The word and every string left by removing up to `edits` of its letters."""
+    found, frontier = {word}, {word}
+    for _ in range(edits):
+        frontier = {text[:i] + text[i + 1:] for text in frontier for i in range(len(text))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Insertions, deletions, substitutions and swaps of neighbouring letters from a to b; limit + 1 once over limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def fingerprint(vocabulary: Iterable[str]) -> str:
+    text = "\n".join(sorted(vocabulary))
+    return hashlib.sha1(f"{CACHE_VERSION} {PREFIX_LENGTH} {MAX_EDITS}\n{text}".encode("utf-8")).hexdigest()
+
+
+class SpellingCorrector:
+    """Corrects misspelled words against a vocabulary with symmetric deletes, as in SymSpell.
+
+    Every vocabulary word is indexed under each string left by deleting up
+    to MAX_EDITS letters from its first PREFIX_LENGTH letters. Two words
+    within that many edits share one of those strings, so a lookup only
+    generates the deletes of the misspelled word, a few dozen at most, and
+    measures the distance to the words found under them; its cost does not
+    grow with the vocabulary. The closest word wins, then the most counted.
+
+    Only the counted words are offered as corrections. `known` words are
+    left as typed but never suggested, so that everyday words the parser
+    does not route on ("would", "launch") are not bent into ones it does.
+    """
+
+    def __init__(self, counts: Dict[str, int], known: Collection[str] = (),
+                 index: Optional[Dict[str, List[str]]] = None):
+        self.counts = counts
+        self.known = frozenset(known)
+        self.index = index if index is not None else self._build()
+
+    def _build(self) -> Dict[str, List[str]]:
+        index: Dict[str, List[str]] = {}
+        for word in self.counts:
+            for delete in deletes(word[:PREFIX_LENGTH], MAX_EDITS):
+                index.setdefault(delete, []).append(word)
+        return index
+
+    @classmethod
+    def load(cls, counts: Dict[str, int], known: Collection[str] = (),
+             path: str = SPELLING_CACHE) -> "SpellingCorrector":
+        """The corrector for these words, read from the cache file if it was built from the same ones."""
+        key = fingerprint(counts)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("fingerprint") == key:
+                return cls(counts, known, cached["index"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        corrector = cls(counts, known)
+        try:
+            corrector.save(path, key)
+        except OSError:
+            # Without a writable cache every start only pays for the build
+            pass
+        return corrector
+
+    def save(self, path: str, key: str) -> None:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"fingerprint": key, "index": self.index}, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def lookup(self, word: str) -> Optional[str]:
+        """The vocabulary word closest to `word`: itself if it is known, None if nothing is close enough."""
+        word = word.lower()
+        if word in self.counts or word in self.known:
+            return word
+        limit = allowed_edits(word)
+        if not limit:
+            return None
+
+        best: Optional[Tuple[int, int, str]] = None
+        checked = set()
+        for delete in deletes(word[:PREFIX_LENGTH], limit):
+            for candidate in self.index.get(delete, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if same_word(word, candidate):
+                    continue
+                distance = edit_distance(word, candidate, limit)
+                if distance <= limit:
+                    rank = (distance, -self.counts[candidate], candidate)
+                    if best is None or rank < best:
+                        best = rank
+        return best[2] if best else None
+
+    def correct(self, text: str) -> str:
+        """The text with each misspelled word replaced by the closest known one; the rest is kept as typed."""
+        def replace(match: "re.Match") -> str:
+            word = match.group(0)
+            correction = self.lookup(word)
+            return correction if correction and correction != word.lower() else word
+
+        return _WORD.sub(replace, text)
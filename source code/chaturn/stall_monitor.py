@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from profiling import PROFILE_DIR
+
+# Milliseconds between heartbeats; one frame at 60 Hz
+HEARTBEAT_MS = 16
+
+# A heartbeat this much later than scheduled is a stall, counted under the largest threshold it passes
+STALL_THRESHOLDS_MS = (16, 50, 250)
+
+# How often the watchdog thread checks for a late heartbeat, in seconds
+WATCHDOG_INTERVAL = 0.005
+
+# Innermost frames kept from each stack sample
+STACK_DEPTH = 12
+
+# Stalls kept for export; the counters cover every stall
+MAX_STALLS = 1000
+
+# What stalls are attributed to outside any activity() block
+IDLE = "idle"
+
+
+class StallMonitor:
+    """Event-loop lag of a Tk window, measured with an after() heartbeat.
+
+    Each heartbeat records how late it ran. A heartbeat later than a
+    threshold in STALL_THRESHOLDS_MS is a stall and is kept with what the
+    window was doing, as set by activity(). The main thread cannot sample
+    its own stack while it is blocked, so a watchdog thread does: once the
+    heartbeat is overdue it records the main thread's innermost frames,
+    and the stall ends up with the deepest sample taken during it.
+    """
+
+    def __init__(self, root, on_stall: Optional[Callable[[Dict], None]] = None,
+                 interval_ms: int = HEARTBEAT_MS, thresholds_ms: Tuple[int, ...] = STALL_THRESHOLDS_MS):
+        self.root = root
+        self.on_stall = on_stall
+        self.interval_ms = interval_ms
+        self.thresholds_ms = thresholds_ms
+        self.activity_label = IDLE
+        self.beats = 0
+        self.lag_total_ms = 0.0
+        self.worst_ms = 0.0
+        self.counts = [0] * len(thresholds_ms)
+        self.stalls: Deque[Dict] = deque(maxlen=MAX_STALLS)
+
+        self.main_thread = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        # (beat, activity, stack, depth) of the deepest watchdog sample of the current stall;
+        # written by the watchdog thread only
+        self.sample: Optional[Tuple[int, str, List[str], int]] = None
+        self.running = False
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.last_beat = time.perf_counter()
+        self.root.after(self.interval_ms, self._beat)
+        threading.Thread(target=self._watch, name="stall-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self.running = False
+
+    @contextmanager
+    def activity(self, label: str) -> Iterator[None]:
+        """Attribute stalls while inside this block to `label`, e.g. the message being handled."""
+        previous, self.activity_label = self.activity_label, label
+        try:
+            yield
+        finally:
+            self.activity_label = previous
+
+    def _beat(self) -> None:
+        if not self.running:
+            return
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self.last_beat) * 1000 - self.interval_ms)
+        self.beats += 1
+        self.lag_total_ms += lag_ms
+        self.worst_ms = max(self.worst_ms, lag_ms)
+
+        level = sum(lag_ms > threshold for threshold in self.thresholds_ms)
+        if level:
+            self.counts[level - 1] += 1
+            sample = self.sample
+            if sample and sample[0] == self.beats:
+                activity, stack = sample[1], sample[2]
+            else:
+                activity, stack = self.activity_label, []
+            stall = {
+                "time": time.time(),
+                "lag_ms": round(lag_ms, 1),
+                "threshold_ms": self.thresholds_ms[level - 1],
+                "activity": activity,
+                "stack": stack,
+            }
+            self.stalls.append(stall)
+            if self.on_stall is not None:
+                self.on_stall(stall)
+
+        self.last_beat = time.perf_counter()
+        self.root.after(self.interval_ms, self._beat)
+
+    def _watch(self) -> None:
+        while self.running:
+            time.sleep(WATCHDOG_INTERVAL)
+            overdue_ms = (time.perf_counter() - self.last_beat) * 1000 - self.interval_ms
+            if overdue_ms > self.thresholds_ms[0]:
+                frame = sys._current_frames().get(self.main_thread)
+                if frame is None:
+                    continue
+                depth, caller = 0, frame
+                while caller is not None:
+                    depth, caller = depth + 1, caller.f_back
+                # The beat that will report this stall is the next one; within a stall only a deeper
+                # stack replaces the sample, as the innermost call is the one doing the work
+                beat, sample = self.beats + 1, self.sample
+                if sample is None or sample[0] != beat or depth > sample[3]:
+                    stack = traceback.format_stack(frame)[-STACK_DEPTH:]
+                    self.sample = (beat, self.activity_label, [line.rstrip() for line in stack], depth)
+
+    def status(self) -> str:
+        """One line for the status bar."""
+        counts = ", ".join(f"{count} >{threshold}ms"
+                           for count, threshold in zip(self.stall_counts(), self.thresholds_ms))
+        return f"Stalls: {counts} (worst {self.worst_ms:.0f} ms)"
+
+    def stall_counts(self) -> List[int]:
+        """Stalls over each threshold; a stall over 250 ms is also over 50 and 16."""
+        totals, running = [], 0
+        for count in reversed(self.counts):
+            running += count
+            totals.append(running)
+        return totals[::-1]
+
+    def summary(self) -> Dict:
+        return {
+            "heartbeats": self.beats,
+            "interval_ms": self.interval_ms,
+            "mean_lag_ms": round(self.lag_total_ms / self.beats, 2) if self.beats else 0.0,
+            "worst_ms": round(self.worst_ms, 1),
+            "stalls_over_ms": dict(zip(self.thresholds_ms, self.stall_counts())),
+        }
+
+    def export(self, directory: str = PROFILE_DIR) -> str:
+        """Write the summary and the recorded stalls as JSON; returns a message naming the file."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"stalls-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": self.summary(), "stalls": list(self.stalls)}, f, indent=2)
+        return f"{self.status()}\n\nSaved {len(self.stalls)} stalls to {path}."
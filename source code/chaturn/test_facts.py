@@ -0,0 +1,38 @@
+import json
+import random
+
+import pytest
+
+from facts import ShuffleBag
+
+
+def draws(bag, count):
+    return [bag.draw() for _ in range(count)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 100])
+def test_every_index_is_drawn_once_per_round(size):
+    bag = ShuffleBag(size, random.Random(size))
+    for _ in range(3):
+        assert sorted(draws(bag, size)) == list(range(size))
+
+
+def test_rounds_are_shuffled_differently():
+    bag = ShuffleBag(50, random.Random(1))
+    assert draws(bag, 50) != draws(bag, 50)
+
+
+def test_state_survives_to_dict_and_from_dict():
+    bag = ShuffleBag(40, random.Random(2))
+    first = draws(bag, 15)
+    # Through JSON, as in a session checkpoint
+    restored = ShuffleBag.from_dict(json.loads(json.dumps(bag.to_dict())))
+    rest = draws(restored, 25)
+    assert sorted(first + rest) == list(range(40))
+    # The next round starts afresh
+    assert sorted(draws(restored, 40)) == list(range(40))
+
+
+def test_empty_bag_cannot_be_drawn_from():
+    with pytest.raises(IndexError):
+        ShuffleBag(0).draw()
@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+from server import HashRing, read_checkpoints, write_checkpoint
+
+WORKERS = [f"worker-{i}" for i in range(4)]
+SESSIONS = [f"session-{i}" for i in range(2000)]
+
+# Routes the sessions in a fresh interpreter, as a restarted server would
+ROUTE_SCRIPT = """
+import json, sys
+from server import HashRing
+workers, sessions = json.loads(sys.stdin.read())
+ring = HashRing(workers)
+print(json.dumps([ring.node(session) for session in sessions]))
+"""
+
+
+def test_routing_is_the_same_for_a_rebuilt_ring():
+    ring = HashRing(WORKERS)
+    rebuilt = HashRing(list(reversed(WORKERS)))
+    assert [ring.node(s) for s in SESSIONS] == [rebuilt.node(s) for s in SESSIONS]
+
+
+def test_routing_is_the_same_in_another_process():
+    # A different hash seed must not move sessions: they are hashed with blake2b, not hash()
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONHASHSEED="12345", PYTHONPATH=here)
+    result = subprocess.run([sys.executable, "-c", ROUTE_SCRIPT], input=json.dumps([WORKERS, SESSIONS]),
+                            capture_output=True, text=True, cwd=here, env=env, check=True)
+    ring = HashRing(WORKERS)
+    assert json.loads(result.stdout.splitlines()[-1]) == [ring.node(s) for s in SESSIONS]
+
+
+def test_every_worker_gets_sessions():
+    ring = HashRing(WORKERS)
+    counts = {worker: 0 for worker in WORKERS}
+    for session in SESSIONS:
+        counts[ring.node(session)] += 1
+    assert min(counts.values()) > len(SESSIONS) / len(WORKERS) / 2
+
+
+def test_adding_a_worker_only_moves_sessions_to_it():
+    ring, grown = HashRing(WORKERS), HashRing(WORKERS + ["worker-4"])
+    moved = [s for s in SESSIONS if ring.node(s) != grown.node(s)]
+    assert all(grown.node(s) == "worker-4" for s in moved)
+    assert len(moved) < len(SESSIONS) / 3
+
+
+def test_checkpoints_round_trip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_checkpoint({"a": {"last_command": "HELP"}, "b": {"last_command": "QUIZ"}})
+    write_checkpoint({"a": {"last_command": "COMPARE"}})
+    assert read_checkpoints() == {"a": {"last_command": "COMPARE"}, "b": {"last_command": "QUIZ"}}
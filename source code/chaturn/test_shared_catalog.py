@@ -0,0 +1,86 @@
+import math
+import os
+
+import pytest
+
+from main import DataLoader
+from quantities import NUMERIC_FIELDS, numeric_columns
+from shared_catalog import SharedCatalog, write_catalog
+
+SMALL_CATALOG = {
+    "mars": {"name": "Mars", "type": "planet", "diameter": "6792 km", "mass": "6.4171e23 kg"},
+    # No mass, an extra field and a value that is not a number
+    "halley's comet": {"name": "Halley's Comet", "type": "comet", "diameter": "11 km",
+                       "orbital_period": "76 years", "notable_features": "Last appeared in 1986"},
+    "andromeda galaxy": {"name": "Andromeda Galaxy", "type": "galaxy", "diameter": "N/A", "mass": ""},
+}
+
+
+@pytest.fixture(scope="module")
+def bundled_catalog():
+    # The data files are read relative to the working directory
+    previous = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        yield dict(DataLoader.astronomy_data())
+    finally:
+        os.chdir(previous)
+
+
+@pytest.fixture(params=["small", "bundled"])
+def catalog(request):
+    return SMALL_CATALOG if request.param == "small" else request.getfixturevalue("bundled_catalog")
+
+
+@pytest.fixture
+def shared(catalog, tmp_path):
+    shared = SharedCatalog(write_catalog(catalog, str(tmp_path / "catalog.bin")))
+    yield shared
+    shared.close()
+
+
+def test_round_trip_equals_the_dict(catalog, shared):
+    assert len(shared) == len(catalog)
+    assert list(shared) == sorted(catalog)
+    assert dict(shared.items()) == catalog
+    for key, entry in catalog.items():
+        assert key in shared
+        assert shared[key] == entry
+        assert shared.get(key) == entry
+
+
+def test_missing_fields_stay_missing(tmp_path):
+    shared = SharedCatalog(write_catalog(SMALL_CATALOG, str(tmp_path / "catalog.bin")))
+    try:
+        assert "mass" not in shared["halley's comet"]
+        assert "notable_features" not in shared["mars"]
+        # An empty value is kept, not dropped like a missing one
+        assert shared["andromeda galaxy"]["mass"] == ""
+    finally:
+        shared.close()
+
+
+def test_unknown_keys(shared):
+    assert "vulcan" not in shared
+    assert shared.get("vulcan", "none") == "none"
+    with pytest.raises(KeyError):
+        shared["vulcan"]
+
+
+def test_numeric_columns_match_with_nan_for_missing(catalog, shared):
+    expected = numeric_columns(catalog, sorted(catalog))
+    for field in NUMERIC_FIELDS:
+        column = shared.column(field)
+        assert len(column) == len(catalog)
+        for value, wanted in zip(column, expected[field]):
+            if wanted is None:
+                assert math.isnan(value)
+            else:
+                assert value == wanted
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "not_a_catalog.bin"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        SharedCatalog(str(path))
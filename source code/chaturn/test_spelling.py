@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from main import Constants, DataLoader, InputParser
+from spelling import SpellingCorrector, same_word
+
+
+@pytest.fixture(scope="module")
+def corrector():
+    # The data files are read relative to the working directory
+    previous = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        yield SpellingCorrector(*DataLoader.spelling_vocabulary())
+    finally:
+        os.chdir(previous)
+
+
+@pytest.mark.parametrize("message", [
+    "what is a light year",
+    "tell me more",
+    "what is a black hole",
+    "show me nebula",
+    "what is an exoplanet",
+    "would you launch a rocket",
+])
+def test_correct_english_is_kept(corrector, message):
+    assert corrector.correct(message) == message
+    assert InputParser.parse_corrected(message, corrector) == InputParser.parse_input(message)
+
+
+@pytest.mark.parametrize("message, command", [
+    ("hlep", Constants.CMD_HELP),
+    ("quizz", Constants.CMD_START_QUIZ),
+    ("radnom fact", Constants.CMD_RANDOM_FACT),
+    ("lsit planets", Constants.CMD_LIST_PLANETS),
+    ("compair mars and venus", Constants.CMD_COMPARE),
+    ("tell me abuot jupitr", Constants.CMD_ASK_ABOUT),
+])
+def test_typos_in_command_words_are_routed(corrector, message, command):
+    assert InputParser.parse_corrected(message, corrector)[0] == command
+
+
+def test_words_are_not_corrected_into_their_plural_or_singular():
+    corrector = SpellingCorrector({"holes": 1, "nebulae": 1, "exoplanets": 1, "bodies": 1, "help": 1})
+    for word in ["hole", "nebula", "exoplanet", "body"]:
+        assert corrector.correct(word) == word
+    assert corrector.correct("hlep") == "help"
+    assert same_word("nebula", "nebulae") and same_word("bodies", "body")
+    assert not same_word("hole", "hold")
+
+
+def test_same_command_keeps_the_users_words(corrector):
+    # Both read as a search, so the search runs on what was typed
+    message = "find stars with ringz"
+    assert InputParser.parse_corrected(message, corrector) == InputParser.parse_input(message)
@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from search_index import tokenize
+from transcript_log import TRANSCRIPT_DIR, TRANSCRIPT_PREFIX, TRANSCRIPT_SUFFIX
+
+ARCHIVE_DIR = os.path.join(TRANSCRIPT_DIR, "archive")
+CHUNKS_FILE = "chunks.z"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+
+# Records per compressed chunk: large enough to compress well, small enough to inflate in well under a millisecond
+CHUNK_RECORDS = 512
+ZLIB_LEVEL = 6
+
+# Decompressed chunks kept in memory for repeated searches
+CHUNK_CACHE_SIZE = 32
+
+
+def record_terms(record: Dict) -> Set[str]:
+    """Index terms of a transcript record: what the user typed and what it was parsed into."""
+    return set(tokenize(" ".join([record.get("input", "")] + [p for p in record.get("params", []) if p])))
+
+
+def written_by_running_process(name: str) -> bool:
+    """Whether a transcript file belongs to a chatbot process that is still running, this one included."""
+    try:
+        pid = int(name[:-len(TRANSCRIPT_SUFFIX)].split("-")[-2])
+    except (ValueError, IndexError):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class TranscriptArchive:
+    """Transcripts stored as zlib-compressed chunks with a sparse index and a token index.
+
+    Each chunk holds up to CHUNK_RECORDS consecutive JSONL records. The index
+    keeps, per chunk, its byte range, time span, sessions and users, plus a
+    posting list of chunk ids per token. A search intersects posting lists,
+    skips chunks whose metadata cannot match, and inflates only the chunks
+    that remain, newest first, so it stops as soon as it has enough hits.
+    """
+
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = directory
+        self.chunks_path = os.path.join(directory, CHUNKS_FILE)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.lock = threading.Lock()
+        self.cache: "OrderedDict[int, List[Dict]]" = OrderedDict()
+
+        self.sources: List[str] = []
+        # Files being archived right now, so the logger's writer thread and an ingest cannot both take one
+        self.claimed: Set[str] = set()
+        self.chunks: List[Dict] = []
+        self.tokens: Dict[str, List[int]] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                self.sources = index["sources"]
+                self.chunks = index["chunks"]
+                self.tokens = index["tokens"]
+
+    def __len__(self) -> int:
+        return sum(chunk["count"] for chunk in self.chunks)
+
+    def save_index(self) -> None:
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "sources": self.sources,
+                       "chunks": self.chunks, "tokens": self.tokens}, f)
+        os.replace(temp_path, self.index_path)
+
+    def add_records(self, records: List[Dict]) -> None:
+        """Compress records into chunks and append them to the archive."""
+        if not records:
+            return
+        with self.lock:
+            self._append_chunks(records)
+            self.save_index()
+
+    def _append_chunks(self, records: List[Dict]) -> None:
+        # Called with the lock held; the caller saves the index once it is done
+        if records:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.chunks_path, 'ab') as f:
+                for start in range(0, len(records), CHUNK_RECORDS):
+                    chunk = records[start:start + CHUNK_RECORDS]
+                    payload = zlib.compress(
+                        "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in chunk).encode("utf-8"),
+                        ZLIB_LEVEL)
+                    chunk_id = len(self.chunks)
+                    times = [r.get("time", 0) for r in chunk]
+                    self.chunks.append({
+                        "offset": f.tell(),
+                        "length": len(payload),
+                        "count": len(chunk),
+                        "start": min(times),
+                        "end": max(times),
+                        "sessions": sorted({str(r.get("session", "")) for r in chunk}),
+                        "users": sorted({str(r.get("user", "")).lower() for r in chunk}),
+                    })
+                    f.write(payload)
+                    for term in set().union(*(record_terms(r) for r in chunk)):
+                        self.tokens.setdefault(term, []).append(chunk_id)
+
+    def add_file(self, path: str, remove: bool = False) -> bool:
+        """Archive a closed transcript file once; returns False if it was already archived.
+
+        With `remove` the plain JSONL file is deleted once its records are archived.
+        """
+        name = os.path.basename(path)
+        with self.lock:
+            if name in self.sources or name in self.claimed:
+                return False
+            self.claimed.add(name)
+        try:
+            records = []
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+            # The records and the file's name go into the index together, in one write
+            with self.lock:
+                self._append_chunks(records)
+                self.sources.append(name)
+                self.save_index()
+        finally:
+            with self.lock:
+                self.claimed.discard(name)
+        if remove:
+            os.remove(path)
+        return True
+
+    def ingest(self, directory: str = TRANSCRIPT_DIR, exclude: Iterable[str] = (), remove: bool = False) -> int:
+        """Archive every transcript file in a directory not archived yet, except files still being written.
+
+        Files of running processes, this one included, are left for them to archive when they rotate.
+        """
+        if not os.path.isdir(directory):
+            return 0
+        skip = {os.path.basename(path) for path in exclude if path}
+        added = 0
+        for name in sorted(os.listdir(directory)):
+            if (name.startswith(TRANSCRIPT_PREFIX) and name.endswith(TRANSCRIPT_SUFFIX)
+                    and name not in skip and name not in self.sources and not written_by_running_process(name)):
+                added += self.add_file(os.path.join(directory, name), remove)
+        return added
+
+    def read_chunk(self, chunk_id: int) -> List[Dict]:
+        with self.lock:
+            if chunk_id in self.cache:
+                self.cache.move_to_end(chunk_id)
+                return self.cache[chunk_id]
+        chunk = self.chunks[chunk_id]
+        with open(self.chunks_path, 'rb') as f:
+            f.seek(chunk["offset"])
+            data = zlib.decompress(f.read(chunk["length"]))
+        records = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+        with self.lock:
+            self.cache[chunk_id] = records
+            if len(self.cache) > CHUNK_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return records
+
+    def candidate_chunks(self, terms: Set[str], user: Optional[str] = None, session: Optional[str] = None,
+                         since: Optional[float] = None, until: Optional[float] = None) -> List[int]:
+        """Chunk ids that may hold a match, newest first."""
+        with self.lock:
+            return self._candidate_chunks(terms, user, session, since, until)
+
+    def _candidate_chunks(self, terms: Set[str], user: Optional[str], session: Optional[str],
+                          since: Optional[float], until: Optional[float]) -> List[int]:
+        if terms:
+            postings = [self.tokens.get(term, []) for term in terms]
+            candidates = set(min(postings, key=len))
+            for posting in postings:
+                candidates.intersection_update(posting)
+        else:
+            candidates = set(range(len(self.chunks)))
+
+        def possible(chunk: Dict) -> bool:
+            return ((user is None or user.lower() in chunk["users"]) and
+                    (session is None or session in chunk["sessions"]) and
+                    (since is None or chunk["end"] >= since) and
+                    (until is None or chunk["start"] <= until))
+
+        return sorted((c for c in candidates if possible(self.chunks[c])), reverse=True)
+
+    def search(self, query: str, user: Optional[str] = None, session: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None, limit: int = 10) -> List[Dict]:
+        """Most recent archived turns whose input contains every term of the query."""
+        terms = set(tokenize(query))
+        hits: List[Dict] = []
+        for chunk_id in self.candidate_chunks(terms, user, session, since, until):
+            matches = [r for r in self.read_chunk(chunk_id)
+                       if matches_record(r, terms, user, session, since, until)]
+            hits.extend(reversed(matches))
+            if len(hits) >= limit:
+                break
+        hits.sort(key=lambda r: r.get("time", 0), reverse=True)
+        return hits[:limit]
+
+
+def matches_record(record: Dict, terms: Set[str], user: Optional[str] = None, session: Optional[str] = None,
+                   since: Optional[float] = None, until: Optional[float] = None) -> bool:
+    return ((user is None or str(record.get("user", "")).lower() == user.lower()) and
+            (session is None or str(record.get("session", "")) == session) and
+            (since is None or record.get("time", 0) >= since) and
+            (until is None or record.get("time", 0) <= until) and
+            terms <= record_terms(record))
+
+
+def search_file(path: str, query: str, user: Optional[str] = None, limit: int = 10) -> List[Dict]:
+    """Scan a transcript file that is still being written (not archived yet) for matching turns."""
+    terms = set(tokenize(query))
+    hits = []
+    if not path or not os.path.exists(path):
+        return hits
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The writer may be midway through this line
+                continue
+            if matches_record(record, terms, user):
+                hits.append(record)
+    return list(reversed(hits))[:limit]
+
+
+def iter_format(records: List[Dict]) -> Iterator[str]:
+    for record in records:
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(record.get("time", 0)))
+        yield f"• {stamp} — \"{record.get('input', '')}\""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive and search chat transcripts.")
+    parser.add_argument("--archive", default=ARCHIVE_DIR)
+    commands = parser.add_subparsers(dest="action", required=True)
+    ingest_parser = commands.add_parser("ingest", help="archive transcript files not archived yet")
+    ingest_parser.add_argument("--transcripts", default=TRANSCRIPT_DIR)
+    ingest_parser.add_argument("--remove", action="store_true", help="delete plain transcript files once archived")
+    search_parser = commands.add_parser("search", help="search archived turns")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--user")
+    search_parser.add_argument("--session")
+    search_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    archive = TranscriptArchive(args.archive)
+    if args.action == "ingest":
+        added = archive.ingest(args.transcripts, remove=args.remove)
+        print(f"Archived {added} files; {len(archive)} turns in {len(archive.chunks)} chunks.")
+    else:
+        start = time.perf_counter()
+        results = archive.search(args.query, args.user, args.session, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for line in iter_format(results):
+            print(line)
+        print(f"{len(results)} results in {elapsed:.2f} ms")
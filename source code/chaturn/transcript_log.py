@@ -0,0 +1,132 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Where transcript files are written
+TRANSCRIPT_DIR = "transcripts"
+TRANSCRIPT_PREFIX = "transcript-"
+TRANSCRIPT_SUFFIX = ".jsonl"
+
+# Records waiting for the writer; beyond this new records are dropped, never waited on
+QUEUE_SIZE = 10000
+# Records written per flush at most, and the longest a record waits before a flush
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5
+
+# Start a new file once the current one is this large or this old
+MAX_FILE_BYTES = 16 * 1024 * 1024
+MAX_FILE_AGE = 3600
+
+_STOP = object()
+
+
+class TranscriptLogger:
+    """Append chat turns to rotating JSONL files from a background thread.
+
+    `log` only puts the record on a bounded queue, so the chat path never
+    touches the disk and never blocks: when the queue is full the record is
+    dropped and counted instead. The writer thread encodes records in
+    batches, flushes once per batch, and starts a new file when the current
+    one grows past `max_bytes` or `max_age` seconds. `on_rotate` is called
+    from the writer thread with the path of each file it closes.
+    """
+
+    def __init__(self, directory: str = TRANSCRIPT_DIR, max_bytes: int = MAX_FILE_BYTES,
+                 max_age: float = MAX_FILE_AGE, queue_size: int = QUEUE_SIZE,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 on_rotate: Optional[Callable[[str], None]] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_rotate = on_rotate
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.counters = {"logged": 0, "dropped": 0, "written": 0, "rotations": 0, "errors": 0}
+
+        self.file = None
+        self.path: Optional[str] = None
+        self.opened_at = 0.0
+        self.sequence = 0
+
+        self.thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def log(self, record: Dict) -> bool:
+        """Queue a record for writing; returns False if it was dropped."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.counters["dropped"] += 1
+            return False
+        self.counters["logged"] += 1
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write everything still queued and close the current file."""
+        if self.thread.is_alive():
+            # Blocking here is fine: close only runs at shutdown
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+
+    def _run(self) -> None:
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            stopping = item is _STOP
+            if item is not None and not stopping:
+                batch.append(item)
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if stopping:
+                self._close_file()
+                return
+
+    def _write(self, batch: List[Dict]) -> None:
+        try:
+            if self.file is None or self._should_rotate():
+                self._open_file()
+            self.file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch))
+            self.file.flush()
+            self.counters["written"] += len(batch)
+        except Exception:
+            # Losing a batch is better than killing the writer thread
+            self.counters["errors"] += 1
+
+    def _should_rotate(self) -> bool:
+        return self.file.tell() >= self.max_bytes or time.time() - self.opened_at >= self.max_age
+
+    def _open_file(self) -> None:
+        if self.file is not None:
+            self._close_file()
+            self.counters["rotations"] += 1
+        os.makedirs(self.directory, exist_ok=True)
+        self.sequence += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(self.directory, f"{TRANSCRIPT_PREFIX}{stamp}-{os.getpid()}-{self.sequence}{TRANSCRIPT_SUFFIX}")
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.opened_at = time.time()
+
+    def _close_file(self) -> None:
+        if self.file is None:
+            return
+        self.file.close()
+        closed, self.file = self.path, None
+        if self.on_rotate:
+            try:
+                self.on_rotate(closed)
+            except Exception:
+                self.counters["errors"] += 1
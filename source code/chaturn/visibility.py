@@ -0,0 +1,289 @@
+import argparse
+import datetime
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from ephemeris import J2000, DAYS_PER_CENTURY, calendar_date, heliocentric_positions, julian_day
+
+# Planets placed by the ephemeris, with a typical apparent magnitude (they vary with distance and phase)
+PLANET_MAGNITUDES = {
+    "mercury": 0.0, "venus": -4.2, "mars": 0.5, "jupiter": -2.4, "saturn": 0.6,
+    "uranus": 5.7, "neptune": 7.8, "pluto": 14.4,
+}
+
+# Fixed objects: J2000 right ascension and declination (degrees) and apparent magnitude.
+# Precession since J2000 moves them by well under a degree, which rise and set times can ignore.
+FIXED_OBJECTS = {
+    "sirius": (101.2872, -16.7161, -1.46),
+    "vega": (279.2347, 38.7837, 0.03),
+    "betelgeuse": (88.7929, 7.4069, 0.5),
+    "andromeda galaxy": (10.6847, 41.2692, 3.4),
+}
+
+MOON_MAGNITUDE = -12.7
+
+# Places the bot knows: latitude, longitude (degrees, east positive), IANA time zone, so that
+# times follow daylight saving. Where the system has no zone database the tzdata package supplies it
+PLACES = {
+    "cairo": (30.0444, 31.2357, "Africa/Cairo"), "alexandria": (31.2001, 29.9187, "Africa/Cairo"),
+    "giza": (30.0131, 31.2089, "Africa/Cairo"), "aswan": (24.0889, 32.8998, "Africa/Cairo"),
+    "luxor": (25.6872, 32.6396, "Africa/Cairo"), "riyadh": (24.7136, 46.6753, "Asia/Riyadh"),
+    "dubai": (25.2048, 55.2708, "Asia/Dubai"), "istanbul": (41.0082, 28.9784, "Europe/Istanbul"),
+    "athens": (37.9838, 23.7275, "Europe/Athens"), "rome": (41.9028, 12.4964, "Europe/Rome"),
+    "paris": (48.8566, 2.3522, "Europe/Paris"), "berlin": (52.5200, 13.4050, "Europe/Berlin"),
+    "madrid": (40.4168, -3.7038, "Europe/Madrid"), "london": (51.5074, -0.1278, "Europe/London"),
+    "reykjavik": (64.1466, -21.9426, "Atlantic/Reykjavik"), "moscow": (55.7558, 37.6173, "Europe/Moscow"),
+    "nairobi": (-1.2921, 36.8219, "Africa/Nairobi"), "lagos": (6.5244, 3.3792, "Africa/Lagos"),
+    "cape town": (-33.9249, 18.4241, "Africa/Johannesburg"),
+    "johannesburg": (-26.2041, 28.0473, "Africa/Johannesburg"), "mumbai": (19.0760, 72.8777, "Asia/Kolkata"),
+    "delhi": (28.7041, 77.1025, "Asia/Kolkata"), "beijing": (39.9042, 116.4074, "Asia/Shanghai"),
+    "shanghai": (31.2304, 121.4737, "Asia/Shanghai"), "tokyo": (35.6762, 139.6503, "Asia/Tokyo"),
+    "seoul": (37.5665, 126.9780, "Asia/Seoul"), "singapore": (1.3521, 103.8198, "Asia/Singapore"),
+    "sydney": (-33.8688, 151.2093, "Australia/Sydney"), "auckland": (-36.8485, 174.7633, "Pacific/Auckland"),
+    "new york": (40.7128, -74.0060, "America/New_York"), "chicago": (41.8781, -87.6298, "America/Chicago"),
+    "los angeles": (34.0522, -118.2437, "America/Los_Angeles"),
+    "mexico city": (19.4326, -99.1332, "America/Mexico_City"), "toronto": (43.6532, -79.3832, "America/Toronto"),
+    "sao paulo": (-23.5505, -46.6333, "America/Sao_Paulo"),
+    "buenos aires": (-34.6037, -58.3816, "America/Argentina/Buenos_Aires"),
+    "santiago": (-33.4489, -70.6693, "America/Santiago"),
+}
+
+OBLIQUITY = np.radians(23.439281)
+
+# Altitudes (degrees) of the centre of each kind of object at rising and setting, allowing for refraction
+HORIZON = -0.5667
+SUN_HORIZON = -0.833
+MOON_HORIZON = 0.125
+# The sky counts as dark once the Sun is this far below the horizon (end of civil twilight)
+DARK_SUN_ALTITUDE = -6.0
+# An object counts as visible when it reaches this altitude in a dark sky and is at least this bright
+MIN_ALTITUDE = 10.0
+NAKED_EYE_MAGNITUDE = 6.0
+
+# Minutes between altitude samples; rise and set times are interpolated between samples
+STEP_MINUTES = 5
+# Hours between ephemeris evaluations of the Sun and planets; they move so little in between
+# that their positions are interpolated linearly to the altitude samples
+EPHEMERIS_STEP_HOURS = 1
+
+
+class NightTable(NamedTuple):
+    """Altitudes of every object over a run of nights, each night running from local noon to noon."""
+    keys: List[str]
+    magnitudes: np.ndarray   # per object
+    horizons: np.ndarray     # rising/setting altitude per object
+    times: np.ndarray        # Julian days, (nights, steps)
+    altitude: np.ndarray     # degrees, (objects, nights, steps)
+    sun_altitude: np.ndarray  # degrees, (nights, steps)
+
+
+class NightEvents(NamedTuple):
+    """Per object and night (Julian days, NaN when it does not happen in that night's window).
+
+    Rise, transit and set belong to one pass: the one around the best dark-sky view.
+    """
+    rise: np.ndarray
+    transit: np.ndarray
+    set: np.ndarray
+    best: np.ndarray          # highest point while the sky is dark
+    best_altitude: np.ndarray
+    visible: np.ndarray       # bright enough and above MIN_ALTITUDE in a dark sky
+
+
+def _equatorial(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Right ascension and declination (radians) of geocentric ecliptic coordinates."""
+    y_eq = y * np.cos(OBLIQUITY) - z * np.sin(OBLIQUITY)
+    z_eq = y * np.sin(OBLIQUITY) + z * np.cos(OBLIQUITY)
+    return np.arctan2(y_eq, x), np.arctan2(z_eq, np.hypot(x, y_eq))
+
+
+def moon_position(jd: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Right ascension and declination (radians) of the Moon, good to about 0.3 degrees.
+
+    Low-precision series from the Astronomical Almanac; the Moon's parallax is ignored.
+    """
+    t = (jd - J2000) / DAYS_PER_CENTURY
+
+    def sin(degrees, rate):
+        return np.sin(np.radians(degrees + rate * t))
+
+    longitude = np.radians(218.32 + 481267.881 * t + 6.29 * sin(135.0, 477198.87) - 1.27 * sin(259.3, -413335.36)
+                           + 0.66 * sin(235.7, 890534.22) + 0.21 * sin(269.9, 954397.74)
+                           - 0.19 * sin(357.5, 35999.05) - 0.11 * sin(186.5, 966404.03))
+    latitude = np.radians(5.13 * sin(93.3, 483202.02) + 0.28 * sin(228.2, 960400.89)
+                          - 0.28 * sin(318.3, 6003.15) - 0.17 * sin(217.6, -407332.21))
+    return _equatorial(np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude), np.sin(latitude))
+
+
+def sky_positions(jd: np.ndarray) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Keys and right ascension / declination (radians, (objects, times)) of the Sun and every object."""
+    planets = list(PLANET_MAGNITUDES)
+    coarse = np.arange(jd.min(), jd.max() + EPHEMERIS_STEP_HOURS / 24.0, EPHEMERIS_STEP_HOURS / 24.0)
+    positions = heliocentric_positions(planets + ["earth"], coarse)
+    # The Sun sits opposite Earth's heliocentric position
+    coarse_geocentric = np.concatenate([-positions[-1:], positions[:-1] - positions[-1]])
+    geocentric = np.empty((len(coarse_geocentric), len(jd), 3))
+    for body in range(len(coarse_geocentric)):
+        for axis in range(3):
+            geocentric[body, :, axis] = np.interp(jd, coarse, coarse_geocentric[body, :, axis])
+    ra, dec = _equatorial(geocentric[..., 0], geocentric[..., 1], geocentric[..., 2])
+
+    moon_ra, moon_dec = moon_position(jd)
+    fixed = np.radians(np.array([coordinates[:2] for coordinates in FIXED_OBJECTS.values()]))
+    ra = np.concatenate([ra, moon_ra[None], np.repeat(fixed[:, :1], len(jd), axis=1)])
+    dec = np.concatenate([dec, moon_dec[None], np.repeat(fixed[:, 1:], len(jd), axis=1)])
+    return ["sun"] + planets + ["moon"] + list(FIXED_OBJECTS), ra, dec
+
+
+def altitudes(latitude: float, longitude: float, jd: np.ndarray,
+              ra: np.ndarray, dec: np.ndarray) -> np.ndarray:
+    """Altitude (degrees) of every object at every time, seen from one place."""
+    sidereal = np.radians(280.46061837 + 360.98564736629 * (jd - J2000) + longitude)
+    hour_angle = sidereal - ra
+    phi = np.radians(latitude)
+    return np.degrees(np.arcsin(np.sin(phi) * np.sin(dec) + np.cos(phi) * np.cos(dec) * np.cos(hour_angle)))
+
+
+def night_table(latitude: float, longitude: float, first_night: datetime.date, nights: int = 1,
+                utc_offset: float = 0.0, step_minutes: int = STEP_MINUTES) -> NightTable:
+    """Sample the sky from local noon on `first_night` to local noon after the last night, for all objects at once."""
+    steps = 24 * 60 // step_minutes + 1
+    noon = datetime.datetime.combine(first_night, datetime.time(12)) - datetime.timedelta(hours=utc_offset)
+    times = julian_day(noon) + np.arange(nights)[:, None] + np.arange(steps)[None, :] * step_minutes / 1440.0
+
+    keys, ra, dec = sky_positions(times.ravel())
+    altitude = altitudes(latitude, longitude, times.ravel(), ra, dec).reshape(len(keys), nights, steps)
+
+    magnitudes = np.array([PLANET_MAGNITUDES.get(key, FIXED_OBJECTS.get(key, (0, 0, MOON_MAGNITUDE))[2])
+                           for key in keys[1:]])
+    horizons = np.array([MOON_HORIZON if key == "moon" else HORIZON for key in keys[1:]])
+    return NightTable(keys[1:], magnitudes, horizons, times, altitude[1:], altitude[0])
+
+
+def _crossing_time(altitude: np.ndarray, horizon: np.ndarray, times: np.ndarray,
+                   index: np.ndarray, found: np.ndarray) -> np.ndarray:
+    """Time each object crosses its horizon between samples `index` and `index + 1`, interpolated."""
+    index = index[..., None]
+    before = np.take_along_axis(altitude, index, axis=-1)[..., 0]
+    after = np.take_along_axis(altitude, index + 1, axis=-1)[..., 0]
+    fraction = (horizon[:, None] - before) / (after - before)
+    step = times[:, 1] - times[:, 0]
+    crossing = np.take_along_axis(np.broadcast_to(times, altitude.shape), index, axis=-1)[..., 0] + fraction * step
+    return np.where(found, crossing, np.nan)
+
+
+def _crossings(altitude: np.ndarray, horizon: np.ndarray,
+               anchor: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Sample indices of the rise and set of the pass through sample `anchor`, and whether each was found.
+
+    The rise is the last upward crossing before the anchor and the set the first downward crossing
+    after it, so a set from the previous pass is never paired with tonight's rise. A rise before
+    the window starts or a set after it ends is not found.
+    """
+    above = altitude >= horizon[:, None, None]
+    steps = np.arange(altitude.shape[-1] - 1)
+    rising = ~above[..., :-1] & above[..., 1:] & (steps < anchor[..., None])
+    setting = above[..., :-1] & ~above[..., 1:] & (steps >= anchor[..., None])
+    rise = rising.shape[-1] - 1 - rising[..., ::-1].argmax(axis=-1)
+    return rise, setting.argmax(axis=-1), rising.any(axis=-1), setting.any(axis=-1)
+
+
+def night_events(table: NightTable) -> NightEvents:
+    """Rise, transit and set times and the best dark-sky view of every object on every night."""
+    times = np.broadcast_to(table.times, table.altitude.shape)
+    dark_altitude = np.where(table.sun_altitude[None] <= DARK_SUN_ALTITUDE, table.altitude, -np.inf)
+    best = dark_altitude.argmax(axis=-1)[..., None]
+    best_altitude = np.take_along_axis(dark_altitude, best, axis=-1)[..., 0]
+    visible = (best_altitude >= MIN_ALTITUDE) & (table.magnitudes[:, None] <= NAKED_EYE_MAGNITUDE)
+
+    # Follow the pass through the best dark-sky view, or through the highest point on a night that never gets dark
+    anchor = np.where(np.isfinite(best_altitude), best[..., 0], table.altitude.argmax(axis=-1))
+    rise, set_, rise_found, set_found = _crossings(table.altitude, table.horizons, anchor)
+
+    # The transit is the highest point of that pass
+    index = np.arange(table.altitude.shape[-1])
+    in_pass = (((index > rise[..., None]) | ~rise_found[..., None]) &
+               ((index <= set_[..., None]) | ~set_found[..., None]))
+    highest = np.where(in_pass, table.altitude, -np.inf).argmax(axis=-1)[..., None]
+    transit = np.take_along_axis(times, highest, axis=-1)[..., 0]
+    above_horizon = np.take_along_axis(table.altitude, highest, axis=-1)[..., 0] >= table.horizons[:, None]
+
+    return NightEvents(
+        rise=_crossing_time(table.altitude, table.horizons, table.times, rise, rise_found),
+        transit=np.where(above_horizon, transit, np.nan),
+        set=_crossing_time(table.altitude, table.horizons, table.times, set_, set_found),
+        best=np.where(np.isfinite(best_altitude), np.take_along_axis(times, best, axis=-1)[..., 0], np.nan),
+        best_altitude=best_altitude,
+        visible=visible,
+    )
+
+
+def utc_offset(zone: datetime.tzinfo, night: datetime.date) -> float:
+    """Hours ahead of UTC in a time zone at noon on the given day."""
+    return datetime.datetime.combine(night, datetime.time(12), zone).utcoffset().total_seconds() / 3600
+
+
+def visible_tonight(latitude: float, longitude: float, night: datetime.date,
+                    zone: datetime.tzinfo = datetime.timezone.utc) -> List[Dict]:
+    """Objects worth looking for on one night, brightest first, with times as local datetimes."""
+    table = night_table(latitude, longitude, night, 1, utc_offset(zone, night))
+    events = night_events(table)
+
+    def local(jd: float) -> Optional[datetime.datetime]:
+        # Converted one by one, so a time after a daylight saving change that night is still right
+        return None if np.isnan(jd) else calendar_date(jd).astimezone(zone).replace(tzinfo=None)
+
+    results = []
+    for i in np.argsort(table.magnitudes, kind="stable"):
+        if events.visible[i, 0]:
+            results.append({
+                "key": table.keys[i],
+                "magnitude": float(table.magnitudes[i]),
+                "rise": local(events.rise[i, 0]),
+                "transit": local(events.transit[i, 0]),
+                "set": local(events.set[i, 0]),
+                "best": local(events.best[i, 0]),
+                "best_altitude": float(events.best_altitude[i, 0]),
+            })
+    return results
+
+
+def find_place(text: str) -> Optional[Tuple[str, float, float, datetime.tzinfo]]:
+    """A known place named in the text, or "latitude, longitude" coordinates: (name, latitude, longitude, time zone)."""
+    text = text.lower()
+    for name in sorted(PLACES, key=len, reverse=True):
+        if name in text:
+            latitude, longitude, zone = PLACES[name]
+            return name.title(), latitude, longitude, ZoneInfo(zone)
+    match = re.search(r"(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)", text)
+    if match:
+        latitude, longitude = float(match.group(1)), float(match.group(2))
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            # Coordinates name no time zone, so local time is solar time rounded to the hour
+            zone = datetime.timezone(datetime.timedelta(hours=round(longitude / 15)))
+            return f"{latitude:.2f}, {longitude:.2f}", latitude, longitude, zone
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="What can be seen in the night sky from a place.")
+    parser.add_argument("place", help="a known city or 'latitude,longitude'")
+    parser.add_argument("--date", help="first night, YYYY-MM-DD (default: tonight)")
+    parser.add_argument("--nights", type=int, default=1)
+    args = parser.parse_args()
+
+    place = find_place(args.place)
+    if place is None:
+        raise SystemExit(f"Unknown place '{args.place}'; known places: {', '.join(sorted(PLACES))}")
+    name, latitude, longitude, zone = place
+    first = datetime.date.fromisoformat(args.date) if args.date else datetime.datetime.now(zone).date()
+    for night in range(args.nights):
+        date = first + datetime.timedelta(days=night)
+        print(f"{name}, night of {date} (UTC{utc_offset(zone, date):+g}):")
+        for item in visible_tonight(latitude, longitude, date, zone):
+            times = "  ".join(f"{label} {item[label]:%H:%M}" for label in ("rise", "transit", "set") if item[label])
+            print(f"  {item['key']:<18} mag {item['magnitude']:>5.1f}  best {item['best']:%H:%M} "
+                  f"at {item['best_altitude']:4.0f}°  {times}")